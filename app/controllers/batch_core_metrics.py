@@ -0,0 +1,131 @@
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import numpy as np
+from fastapi import HTTPException
+from app.models.schemas import (
+    BatchCoreMetricsQueryParams, BatchCoreMetricsResponse, BatchCoreMetrics
+)
+from app.helpers.guards import validate_interval, validate_symbol_list
+from app.services.financial_data import get_close_matrix_for_symbols
+from app.services.analysis import calculate_return_matrix, calculate_volatility_matrix, calculate_rsi_matrix
+from app.services.price_store import period_start
+from app.services.series_planner import bars_lookback
+from app.services.ticker_index import get_ticker_index
+from app.services.executor import run_cpu_bound
+from app.services.logging_service import LoggingService
+from app.services.cache import get_cache_entry, set_cache, set_negative_cache, is_negative
+from app.services.response_cache import recompute, refresh_in_background
+
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "50"))
+NO_DATA_DETAIL = "No price data found for symbol."
+
+
+def _cache_key(symbol: str, params: BatchCoreMetricsQueryParams) -> str:
+    return f"batchcoremetrics:{symbol}:{params.period_months}:{params.interval}:{params.rsi_period}"
+
+
+def _to_optional(value) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+def _batch_metrics(main: np.ndarray, prices_1m: np.ndarray, prices_3m: np.ndarray, daily: np.ndarray, rsi_period: int) -> Dict[str, np.ndarray]:
+    return {
+        "return_": calculate_return_matrix(main),
+        "volatility": calculate_volatility_matrix(main),
+        "rsi": calculate_rsi_matrix(daily, rsi_period),
+        "return_1m": calculate_return_matrix(prices_1m),
+        "return_3m": calculate_return_matrix(prices_3m),
+    }
+
+
+def _compute(symbols: List[str], params: BatchCoreMetricsQueryParams) -> Dict[str, Dict]:
+    main_start = period_start(f"{params.period_months}mo")
+    start_1m = period_start("1mo")
+    start_3m = period_start("3mo")
+    start = min(main_start, start_3m)
+    matrix = get_close_matrix_for_symbols(symbols, start, params.interval)
+
+    # RSI always uses the last rsi_period + 1 daily closes
+    rsi_start = datetime.now(timezone.utc) - bars_lookback(params.rsi_period + 1, "1d")
+    if params.interval == "1d" and start <= rsi_start:
+        daily = matrix
+    else:
+        daily = get_close_matrix_for_symbols(symbols, rsi_start, "1d")
+
+    ts = matrix.index.to_numpy()
+    values = matrix.to_numpy(dtype=float)
+    metrics = run_cpu_bound(
+        _batch_metrics,
+        values[ts >= int(main_start.timestamp())],
+        values[ts >= int(start_1m.timestamp())],
+        values[ts >= int(start_3m.timestamp())],
+        daily.to_numpy(dtype=float),
+        params.rsi_period,
+    )
+    has_data = ~np.isnan(values[ts >= int(main_start.timestamp())]).all(axis=0)
+    return {
+        symbol: {name: _to_optional(column[i]) for name, column in metrics.items()}
+        for i, symbol in enumerate(symbols) if has_data[i]
+    }
+
+
+def _store(symbols: List[str], params: BatchCoreMetricsQueryParams, computed: Dict[str, Dict]):
+    for symbol in symbols:
+        if symbol in computed:
+            set_cache(_cache_key(symbol, params), computed[symbol])
+        else:
+            set_negative_cache(_cache_key(symbol, params))
+
+
+def _refresh(symbols: List[str], params: BatchCoreMetricsQueryParams):
+    _store(symbols, params, recompute(_compute, symbols, params))
+
+
+def batch_core_metrics_controller(params: BatchCoreMetricsQueryParams):
+    logger = LoggingService.get_logger("batch_core_metrics_controller")
+    validate_interval(params.interval)
+    symbols = validate_symbol_list(params.symbols, MAX_BATCH_SIZE)
+    index = get_ticker_index()
+
+    results, errors, pending, stale = {}, {}, [], []
+    for symbol in symbols:
+        if symbol not in index:
+            errors[symbol] = f"Symbol '{symbol}' is not a valid/allowed ticker."
+            continue
+        data, is_stale = get_cache_entry(_cache_key(symbol, params))
+        if data is None:
+            pending.append(symbol)
+            continue
+        if is_stale:
+            stale.append(symbol)
+        if is_negative(data):
+            errors[symbol] = NO_DATA_DETAIL
+        else:
+            results[symbol] = BatchCoreMetrics(**data)
+    if results:
+        logger.info(f"{len(results)} of {len(symbols)} symbols for /batch/core-metrics retrieved from cache.")
+    if stale:
+        # Stale symbols are answered now and recomputed together in one background bulk fetch
+        refresh_key = f"batchcoremetrics-refresh:{','.join(stale)}:{params.period_months}:{params.interval}:{params.rsi_period}"
+        refresh_in_background(refresh_key, _refresh, stale, params)
+
+    if pending:
+        try:
+            computed = _compute(pending, params)
+        except Exception as e:
+            logger.exception(f"Error in batch core metrics calculation: {e}")
+            if not results:
+                raise HTTPException(status_code=500, detail="Internal server error in batch core metrics calculation.")
+            computed = None
+        if computed is not None:
+            _store(pending, params, computed)
+        for symbol in pending:
+            if computed is None:
+                errors[symbol] = "Internal server error in core metrics calculation."
+            elif symbol not in computed:
+                errors[symbol] = NO_DATA_DETAIL
+            else:
+                results[symbol] = BatchCoreMetrics(**computed[symbol])
+
+    return BatchCoreMetricsResponse(results=results, errors=errors)
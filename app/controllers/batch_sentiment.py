@@ -0,0 +1,63 @@
+import os
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException
+from app.models.schemas import BatchSentimentQueryParams, BatchSentimentResponse, SentimentAnalysisResult
+from app.helpers.guards import validate_symbol_list
+from app.services.analysis import summarize_sentiment
+from app.services.financial_data import get_financial_news_for_symbol
+from app.services import news_store
+from app.services.ticker_index import get_ticker_index
+from app.services.executor import submit_io_bound
+from app.services.logging_service import LoggingService
+from app.services.cache import get_cache, set_cache
+
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "50"))
+
+
+def batch_sentiment_controller(params: BatchSentimentQueryParams):
+    logger = LoggingService.get_logger("batch_sentiment_controller")
+    symbols = validate_symbol_list(params.symbols, MAX_BATCH_SIZE)
+    index = get_ticker_index()
+
+    results, errors, pending = {}, {}, []
+    for symbol in symbols:
+        if symbol not in index:
+            errors[symbol] = f"Symbol '{symbol}' is not a valid/allowed ticker."
+            continue
+        # Same entries as /sentiment, so both endpoints warm each other
+        data = get_cache(f"sentiment:{symbol}")
+        if data is None:
+            pending.append(symbol)
+        else:
+            results[symbol] = SentimentAnalysisResult(**data)
+    if results:
+        logger.info(f"{len(results)} of {len(symbols)} symbols for /sentiment/batch retrieved from cache.")
+    if not pending:
+        return BatchSentimentResponse(results=results, errors=errors)
+
+    # Only symbols whose stored news is out of date go upstream, all of them concurrently
+    fetches = {symbol: submit_io_bound(get_financial_news_for_symbol, symbol) for symbol in news_store.stale_symbols(pending)}
+    fetched = {}
+    for symbol, future in fetches.items():
+        try:
+            fetched[symbol] = future.result()
+        except Exception as e:
+            logger.warning(f"Fetching news for {symbol} failed: {e}")
+            errors[symbol] = "Internal server error in sentiment analysis."
+
+    try:
+        # New articles of all symbols are scored together, so syndicated ones are scored once
+        if fetched:
+            news_store.ingest_news(fetched)
+        since = datetime.now(timezone.utc) - timedelta(days=1)
+        for symbol in pending:
+            if symbol in errors:
+                continue
+            response = SentimentAnalysisResult(**summarize_sentiment(news_store.read_articles(symbol, since)))
+            set_cache(f"sentiment:{symbol}", response.model_dump())
+            results[symbol] = response
+    except Exception as e:
+        logger.exception(f"Error in batch sentiment analysis: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error in sentiment analysis.")
+
+    return BatchSentimentResponse(results=results, errors=errors)
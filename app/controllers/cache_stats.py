@@ -0,0 +1,6 @@
+from app.services.cache import get_cache_stats
+from app.services.response_cache import response_store
+
+
+def cache_stats_controller():
+    return {**get_cache_stats(), "responses": response_store.usage()}
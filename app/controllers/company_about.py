@@ -1,12 +1,11 @@
 
-import yfinance as yf
 from fastapi import HTTPException
 from ..models.schemas import CompanyInfoResponse, CompanyInfoQueryParams
+from ..services.fundamentals import get_fundamentals
 
 def get_company_about(params: CompanyInfoQueryParams) -> CompanyInfoResponse:
     try:
-        ticker_obj = yf.Ticker(params.symbol)
-        info = ticker_obj.info
+        info = get_fundamentals(params.symbol)
         if not info:
             raise ValueError('No company info found')
         return CompanyInfoResponse(
@@ -18,5 +17,7 @@ def get_company_about(params: CompanyInfoQueryParams) -> CompanyInfoResponse:
             description=info.get('longBusinessSummary'),
             market_cap=info.get('marketCap')
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=404, detail=f"Company info not found: {e}")
@@ -1,15 +1,14 @@
 from fastapi import HTTPException
 from app.models.schemas import CompanyInfoQueryParams, CompanyInfoResponse
 from app.helpers.guards import validate_symbol
+from app.services.fundamentals import get_fundamentals
 from app.services.logging_service import LoggingService
-import yfinance as yf
 
 def company_info_controller(params: CompanyInfoQueryParams):
     logger = LoggingService.get_logger("company_info_controller")
     validate_symbol(params.symbol)
     try:
-        ticker = yf.Ticker(params.symbol)
-        info = ticker.info
+        info = get_fundamentals(params.symbol)
         if not info:
             raise HTTPException(status_code=404, detail="No company info found for symbol.")
         response = CompanyInfoResponse(
@@ -22,6 +21,8 @@ def company_info_controller(params: CompanyInfoQueryParams):
             market_cap=info.get("marketCap")
         )
         return response
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception(f"Error fetching company info: {e}")
         raise HTTPException(status_code=500, detail="Internal server error fetching company info.")
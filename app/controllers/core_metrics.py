@@ -3,10 +3,13 @@ from app.models.schemas import (
     CoreMetricsQueryParams, CoreMetricsResponse
 )
 from app.helpers.guards import validate_symbol, validate_interval
-from app.services.financial_data import get_close_prices_for_symbol, get_pe_ratio_for_symbol
+from app.services.financial_data import get_pe_ratio_for_symbol
+from app.services.series_planner import SeriesPlanner
 from app.services.analysis import calculate_return, calculate_volatility, calculate_rsi
 from app.services.logging_service import LoggingService
-from app.services.cache import get_cache, set_cache
+from app.services.cache import get_cache, set_cache, set_negative_cache, is_negative
+
+NO_DATA_DETAIL = "No price data found for symbol."
 
 
 def core_metrics_controller(params: CoreMetricsQueryParams):
@@ -15,31 +18,35 @@ def core_metrics_controller(params: CoreMetricsQueryParams):
     validate_interval(params.interval)
     cache_key = f"coremetrics:{params.symbol}:{params.period_months}:{params.interval}:{params.rsi_period}"
     data = get_cache(cache_key)
-    if data:
+    if data is not None:
+        if is_negative(data):
+            raise HTTPException(status_code=404, detail=NO_DATA_DETAIL)
         logger.info("Information for /core-metrics retrieved from cache.")
         return CoreMetricsResponse(**data)
     try:
-        period = f"{params.period_months}mo"
-        prices_dict = get_close_prices_for_symbol(params.symbol, period, params.interval)
-        if not prices_dict:
-            raise HTTPException(status_code=404, detail="No price data found for symbol.")
+        # Every window this endpoint needs is planned up front and fetched once per interval
+        planner = SeriesPlanner(params.symbol)
+        planner.add_period("main", f"{params.period_months}mo", params.interval)
+        planner.add_period("1m", "1mo", params.interval)
+        planner.add_period("3m", "3mo", params.interval)
+        # RSI always uses the last rsi_period + 1 daily closes
+        planner.add_bars("rsi", params.rsi_period + 1, "1d")
+        planner.fetch()
 
-        prices = [p["price"] for p in prices_dict]
+        prices = planner.prices("main")
+        if not prices:
+            set_negative_cache(cache_key)
+            raise HTTPException(status_code=404, detail=NO_DATA_DETAIL)
 
-        prices_1m_dict = get_close_prices_for_symbol(params.symbol, "1mo", params.interval)
-        prices_3m_dict = get_close_prices_for_symbol(params.symbol, "3mo", params.interval)
-        prices_1m = [p["price"] for p in prices_1m_dict] if prices_1m_dict else None
-        prices_3m = [p["price"] for p in prices_3m_dict] if prices_3m_dict else None
+        prices_1m = planner.prices("1m")
+        prices_3m = planner.prices("3m")
 
         return_1m = calculate_return(prices_1m) if prices_1m else None
         return_3m = calculate_return(prices_3m) if prices_3m else None
 
         pe_ratio = get_pe_ratio_for_symbol(params.symbol)
 
-        # For RSI, fetch prices for the last rsi_period + 1 days
-        rsi_days = params.rsi_period + 1
-        rsi_prices_dict = get_close_prices_for_symbol(params.symbol, f"{rsi_days}d", "1d")
-        rsi_prices = [p["price"] for p in rsi_prices_dict] if rsi_prices_dict else prices
+        rsi_prices = planner.prices("rsi") or prices
 
         response = CoreMetricsResponse(
             return_=calculate_return(prices),
@@ -51,6 +58,8 @@ def core_metrics_controller(params: CoreMetricsQueryParams):
         )
         set_cache(cache_key, response.model_dump())
         return response
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception(f"Error in core metrics calculation: {e}")
         raise HTTPException(status_code=500, detail="Internal server error in core metrics calculation.")
@@ -0,0 +1,156 @@
+import os
+import threading
+from typing import Dict, List, Optional
+import numpy as np
+from fastapi import HTTPException
+from app.models.schemas import AlignmentEnum, CorrelationMatrixQueryParams, CorrelationMatrixResponse
+from app.helpers.guards import validate_interval, validate_symbol_list
+from app.services.financial_data import get_close_matrix_for_symbols
+from app.services.analysis import (
+    align_closes, calculate_returns_matrix, calculate_correlation_matrix,
+    calculate_own_returns, calculate_pairwise_correlation_matrix
+)
+from app.services.price_store import period_start
+from app.services.ticker_index import get_ticker_index
+from app.services.executor import run_cpu_bound
+from app.services.logging_service import LoggingService
+from app.services.cache import cache, get_cache_entry, set_cache
+from app.services.response_cache import recompute, refresh_in_background
+
+MAX_MATRIX_SIZE = int(os.getenv("MAX_MATRIX_SIZE", "50"))
+BENCHMARKS = {"^GSPC"}
+MATRICES = ("correlation", "covariance", "beta")
+# Most recently cached symbol sets remembered per parameter combination
+MATRIX_REGISTRY_MAX_SETS = 32
+
+# Serializes this process's read-modify-write of the registry entry
+_registry_lock = threading.Lock()
+
+
+def _matrix_key(symbols: List[str], params: CorrelationMatrixQueryParams) -> str:
+    return f"corrmatrix:{params.period_months}:{params.interval}:{params.alignment}:{','.join(symbols)}"
+
+
+def _registry_key(params: CorrelationMatrixQueryParams) -> str:
+    # Symbol sets with a cached pairwise matrix for these parameters, used to serve submatrices
+    return f"corrmatrix-sets:{params.period_months}:{params.interval}:{params.alignment}"
+
+
+def _register(symbols: List[str], params: CorrelationMatrixQueryParams):
+    """Remember the exact symbol list a matrix was stored under, newest first."""
+    key = _registry_key(params)
+    with _registry_lock:
+        # Read past cache_bypass, so a prefetch refresh does not reset the registry to one entry
+        registry = [cached for cached in cache.get(key) or [] if cached != symbols]
+        set_cache(key, [symbols] + registry[:MATRIX_REGISTRY_MAX_SETS - 1])
+
+
+def _to_rows(matrix: np.ndarray) -> List[List[Optional[float]]]:
+    return [[None if np.isnan(v) else float(v) for v in row] for row in matrix]
+
+
+def _submatrix(data: Dict, symbols: List[str]) -> Dict:
+    idx = [data["symbols"].index(symbol) for symbol in symbols]
+    if "pair_observations" in data:
+        # Pairwise matrices report their smallest pair sample
+        pairs = data["pair_observations"]
+        observations = min((pairs[i][j] for i in idx for j in idx if i != j), default=0)
+    else:
+        observations = data["observations"]
+    result = {"symbols": symbols, "observations": observations}
+    for name in MATRICES:
+        result[name] = [[data[name][i][j] for j in idx] for i in idx]
+    return result
+
+
+def _cached_matrix(symbols: List[str], params: CorrelationMatrixQueryParams) -> Optional[Dict]:
+    """The matrix stored for exactly these (sorted) symbols; a stale one is returned while it is recomputed."""
+    data, stale = get_cache_entry(_matrix_key(symbols, params))
+    if stale:
+        refresh_in_background(_matrix_key(symbols, params), recompute, _compute_and_store, symbols, params)
+    return data
+
+
+def _from_cache(symbols: List[str], params: CorrelationMatrixQueryParams) -> Optional[Dict]:
+    wanted = sorted(symbols)
+    data = _cached_matrix(wanted, params)
+    if data is not None or params.alignment != AlignmentEnum.pairwise:
+        # inner and ffill align all symbols jointly, so a superset's matrix holds different numbers
+        return data
+    for cached_symbols in cache.get(_registry_key(params)) or []:
+        if set(wanted) <= set(cached_symbols):
+            data = _cached_matrix(cached_symbols, params)
+            if data is not None:
+                return data
+    return None
+
+
+def _compute(symbols: List[str], params: CorrelationMatrixQueryParams) -> Optional[Dict]:
+    closes = get_close_matrix_for_symbols(symbols, period_start(f"{params.period_months}mo"), params.interval)
+    closes = closes.dropna(axis=1, how="all")
+    if params.alignment == AlignmentEnum.pairwise:
+        return _compute_pairwise(closes)
+    aligned = align_closes(closes, params.alignment)
+    if aligned.shape[1] < 2 or len(aligned) < 3:
+        return None
+    returns = calculate_returns_matrix(aligned.to_numpy(dtype=float))
+    matrices = run_cpu_bound(calculate_correlation_matrix, returns)
+    data = {"symbols": list(aligned.columns), "observations": int(returns.shape[0])}
+    for name in MATRICES:
+        data[name] = _to_rows(matrices[name])
+    return data
+
+
+def _compute_pairwise(closes) -> Optional[Dict]:
+    if closes.shape[1] < 2 or len(closes) < 3:
+        return None
+    returns = calculate_own_returns(closes.to_numpy(dtype=float))
+    matrices = run_cpu_bound(calculate_pairwise_correlation_matrix, returns)
+    data = {"symbols": list(closes.columns), "pair_observations": matrices["observations"].tolist()}
+    for name in MATRICES:
+        data[name] = _to_rows(matrices[name])
+    data["observations"] = _submatrix(data, data["symbols"])["observations"]
+    return data
+
+
+def _compute_and_store(symbols: List[str], params: CorrelationMatrixQueryParams) -> Optional[Dict]:
+    data = _compute(symbols, params)
+    if data is not None:
+        set_cache(_matrix_key(symbols, params), data)
+        if params.alignment == AlignmentEnum.pairwise:
+            _register(symbols, params)
+    return data
+
+
+def correlation_matrix_controller(params: CorrelationMatrixQueryParams):
+    logger = LoggingService.get_logger("correlation_matrix_controller")
+    validate_interval(params.interval)
+    requested = validate_symbol_list(params.symbols, MAX_MATRIX_SIZE)
+    index = get_ticker_index()
+    errors = {
+        symbol: f"Symbol '{symbol}' is not a valid/allowed ticker."
+        for symbol in requested if symbol not in index and symbol not in BENCHMARKS
+    }
+    symbols = [symbol for symbol in requested if symbol not in errors]
+    if len(symbols) < 2:
+        raise HTTPException(status_code=422, detail="At least two valid symbols are required for a correlation matrix.")
+
+    data = _from_cache(symbols, params)
+    try:
+        if data is not None:
+            logger.info("Information for /correlation-matrix retrieved from cache.")
+        else:
+            data = _compute_and_store(sorted(symbols), params)
+            if data is None:
+                raise HTTPException(status_code=404, detail="Not enough overlapping price data for a correlation matrix.")
+
+        for symbol in symbols:
+            if symbol not in data["symbols"]:
+                errors[symbol] = "No price data found for symbol."
+        available = [symbol for symbol in symbols if symbol in data["symbols"]]
+        return CorrelationMatrixResponse(**_submatrix(data, available), errors=errors)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception(f"Error in correlation matrix calculation: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error in correlation matrix calculation.")
@@ -3,11 +3,16 @@ from app.models.schemas import (
     CorrelationMetricsQueryParams, CorrelationMetricsResponse
 )
 from app.helpers.guards import validate_interval
-from app.services.financial_data import get_close_prices_for_symbol
+from app.services.financial_data import get_close_matrix_for_symbols
+from app.services.analysis import align_closes, calculate_returns_matrix
+from app.services.price_store import period_start
 from app.services.logging_service import LoggingService
-from app.services.cache import get_cache, set_cache
+from app.services.cache import get_cache, set_cache, set_negative_cache, is_negative
 import numpy as np
 
+NO_DATA_DETAIL = "Not enough overlapping price data for correlation/beta calculation."
+
+
 def correlation_metrics_controller(params: CorrelationMetricsQueryParams):
     logger = LoggingService.get_logger("correlation_metrics_controller")
     validate_interval(params.interval)
@@ -15,24 +20,21 @@ def correlation_metrics_controller(params: CorrelationMetricsQueryParams):
         raise HTTPException(status_code=422, detail="Only S&P 500 (^GSPC) is allowed as benchmark.")
     cache_key = f"corr:{params.symbol}:{params.benchmark}:{params.period_months}:{params.interval}"
     data = get_cache(cache_key)
-    if data:
+    if data is not None:
+        if is_negative(data):
+            raise HTTPException(status_code=404, detail=NO_DATA_DETAIL)
         logger.info("Information for /correlation-metrics retrieved from cache.")
         return CorrelationMetricsResponse(**data)
     try:
         period = f"{params.period_months}mo"
-        prices_dict = get_close_prices_for_symbol(params.symbol, period, params.interval)
-        benchmark_prices_dict = get_close_prices_for_symbol(params.benchmark, period, params.interval)
-        if not prices_dict or not benchmark_prices_dict or len(prices_dict) != len(benchmark_prices_dict):
-            raise HTTPException(status_code=404, detail="Not enough or mismatched price data for correlation/beta calculation.")
+        closes = get_close_matrix_for_symbols([params.symbol, params.benchmark], period_start(period), params.interval)
+        # Align both series on bar timestamps instead of assuming equal lengths
+        aligned = align_closes(closes, "inner")
+        if len(aligned) < 3:
+            set_negative_cache(cache_key)
+            raise HTTPException(status_code=404, detail=NO_DATA_DETAIL)
 
-        prices = np.array([p["price"] for p in prices_dict])
-        benchmark_prices = np.array([p["price"] for p in benchmark_prices_dict])
-        returns = np.diff(prices) / prices[:-1]
-        benchmark_returns = np.diff(benchmark_prices) / benchmark_prices[:-1]
-        if len(returns) != len(benchmark_returns):
-            min_len = min(len(returns), len(benchmark_returns))
-            returns = returns[-min_len:]
-            benchmark_returns = benchmark_returns[-min_len:]
+        returns, benchmark_returns = calculate_returns_matrix(aligned.to_numpy(dtype=float)).T
 
         correlation = float(np.corrcoef(returns, benchmark_returns)[0, 1])
         beta = float(np.cov(returns, benchmark_returns)[0, 1] / np.var(benchmark_returns))
@@ -43,6 +45,8 @@ def correlation_metrics_controller(params: CorrelationMetricsQueryParams):
         )
         set_cache(cache_key, response.model_dump())
         return response
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception(f"Error in correlation/beta metrics calculation: {e}")
         raise HTTPException(status_code=500, detail="Internal server error in correlation/beta metrics calculation.")
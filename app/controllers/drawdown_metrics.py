@@ -1,12 +1,42 @@
 from fastapi import HTTPException
 from app.models.schemas import (
-    DrawdownMetricsQueryParams, DrawdownMetricsResponse
+    DrawdownMetricsQueryParams, DrawdownMetricsResponse, DrawdownEpisode, UnderwaterCurve
 )
 from app.helpers.guards import validate_symbol, validate_interval
-from app.services.financial_data import get_close_prices_for_symbol
+from app.services.analysis import drawdown_episodes, top_drawdown_episodes
+from app.services.financial_data import get_close_series_for_symbol
+from app.services.metric_state import drawdown_state
+from app.services.executor import run_cpu_bound
+from app.services.price_store import period_start
 from app.services.logging_service import LoggingService
-from app.services.cache import get_cache, set_cache
-import numpy as np
+from app.services.cache import get_cache, set_cache, set_negative_cache, is_negative
+
+NO_DATA_DETAIL = "Not enough price data for drawdown analysis."
+
+
+def _episodes_response(prices, dates, count: int) -> DrawdownMetricsResponse:
+    found = drawdown_episodes(prices)
+    last = len(prices) - 1
+    episodes = []
+    for i in top_drawdown_episodes(found, count):
+        peak, trough, recovery = int(found["peak"][i]), int(found["trough"][i]), int(found["recovery"][i])
+        episodes.append(DrawdownEpisode(
+            peak_date=dates[peak],
+            trough_date=dates[trough],
+            recovery_date=dates[recovery] if recovery >= 0 else None,
+            depth_pct=abs(float(found["depth"][i])) * 100,
+            drawdown_bars=trough - peak,
+            recovery_bars=recovery - trough if recovery >= 0 else None,
+            duration_bars=(recovery if recovery >= 0 else last) - peak,
+        ))
+    # Same figures the incremental state reports: the first deepest episode, or no drawdown at all
+    worst = episodes[0] if episodes else None
+    return DrawdownMetricsResponse(
+        max_drawdown_pct=worst.depth_pct if worst else 0.0,
+        recovery_days=worst.recovery_bars if worst else 0,
+        episodes=episodes,
+        underwater=UnderwaterCurve(dates=dates, drawdown_pct=(found["underwater"] * 100).tolist()),
+    )
 
 
 def drawdown_metrics_controller(params: DrawdownMetricsQueryParams):
@@ -14,38 +44,41 @@ def drawdown_metrics_controller(params: DrawdownMetricsQueryParams):
     validate_symbol(params.symbol)
     validate_interval(params.interval)
     cache_key = f"drawdown:{params.symbol}:{params.period_months}:{params.interval}"
+    if params.episodes:
+        cache_key += f":episodes{params.episodes}"
     data = get_cache(cache_key)
-    if data:
+    if data is not None:
+        if is_negative(data):
+            raise HTTPException(status_code=404, detail=NO_DATA_DETAIL)
         logger.info("Information for /drawdown-metrics retrieved from cache.")
         return DrawdownMetricsResponse(**data)
     try:
-        period = f"{params.period_months}mo"
-        prices_dict = get_close_prices_for_symbol(params.symbol, period, params.interval)
-        if not prices_dict or len(prices_dict) < 2:
-            raise HTTPException(status_code=404, detail="Not enough price data for drawdown analysis.")
-
-        prices = np.array([p["price"] for p in prices_dict])
-        running_max = np.maximum.accumulate(prices)
-        drawdowns = (prices - running_max) / running_max
-        max_drawdown = float(drawdowns.min())
-        max_drawdown_pct = abs(max_drawdown) * 100
+        if params.episodes:
+            # Episode history needs the whole series, analysed in one vectorized pass
+            series = get_close_series_for_symbol(params.symbol, f"{params.period_months}mo", params.interval)
+            if len(series.prices) < 2:
+                set_negative_cache(cache_key)
+                raise HTTPException(status_code=404, detail=NO_DATA_DETAIL)
+            dates = series.dates("m" if params.interval == "1h" else "D")
+            response = run_cpu_bound(_episodes_response, series.prices, dates, params.episodes)
+            set_cache(cache_key, response.model_dump())
+            return response
 
-        # Recovery days: days from max drawdown to recovery above previous peak
-        drawdown_idx = np.argmin(drawdowns)
-        peak_idx = np.argmax(prices[:drawdown_idx+1])
-        recovery_idx = None
-        for i in range(drawdown_idx, len(prices)):
-            if prices[i] >= running_max[peak_idx]:
-                recovery_idx = i
-                break
-        recovery_days = (recovery_idx - drawdown_idx) if recovery_idx is not None else None
+        # Answered from the checkpointed drawdown state; only bars newer than the checkpoint are read
+        start = period_start(f"{params.period_months}mo")
+        state = drawdown_state(params.symbol, params.interval, start, kind=f"drawdown:{params.period_months}mo")
+        if state is None:
+            set_negative_cache(cache_key)
+            raise HTTPException(status_code=404, detail=NO_DATA_DETAIL)
 
         response = DrawdownMetricsResponse(
-            max_drawdown_pct=float(max_drawdown_pct),
-            recovery_days=int(recovery_days) if recovery_days is not None else None
+            max_drawdown_pct=abs(state.max_drawdown) * 100,
+            recovery_days=state.recovery_bars
         )
         set_cache(cache_key, response.model_dump())
         return response
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception(f"Error in drawdown metrics calculation: {e}")
         raise HTTPException(status_code=500, detail="Internal server error in drawdown metrics calculation.")
@@ -0,0 +1,67 @@
+from typing import Dict, List
+import numpy as np
+from fastapi import HTTPException
+from app.models.schemas import IndicatorsQueryParams, IndicatorsResponse
+from app.helpers.guards import validate_symbol, validate_interval, validate_indicator_set
+from app.services.financial_data import get_ohlc_series_for_symbol
+from app.services.indicators import compute_indicators, warmup_bars
+from app.services.price_store import OhlcSeries, period_start
+from app.services.series_planner import bars_lookback
+from app.services.executor import run_cpu_bound
+from app.services.logging_service import LoggingService
+from app.services.cache import get_cache, set_cache, set_negative_cache, is_negative
+
+NO_DATA_DETAIL = "No price data found for symbol."
+
+
+def _to_list(values: np.ndarray) -> List:
+    return [None if value != value else value for value in values.tolist()]
+
+
+def _compute(names: List[str], series: OhlcSeries, first_idx: int, params: IndicatorsQueryParams) -> Dict[str, Dict[str, List]]:
+    lines = compute_indicators(
+        names, series.open, series.high, series.low, series.close,
+        rsi_period=params.rsi_period, ema_span=params.ema_span, window=params.window,
+    )
+    return {name: {line: _to_list(values[first_idx:]) for line, values in named.items()} for name, named in lines.items()}
+
+
+def indicators_controller(params: IndicatorsQueryParams):
+    logger = LoggingService.get_logger("indicators_controller")
+    validate_symbol(params.symbol)
+    validate_interval(params.interval)
+    names = validate_indicator_set(params.set)
+    cache_key = (
+        f"indicators:{params.symbol}:{params.period_months}:{params.interval}:{','.join(sorted(names))}"
+        f":{params.rsi_period}:{params.ema_span}:{params.window}"
+    )
+    data = get_cache(cache_key)
+    if data is not None:
+        if is_negative(data):
+            raise HTTPException(status_code=404, detail=NO_DATA_DETAIL)
+        logger.info("Information for /indicators retrieved from cache.")
+        return IndicatorsResponse(**data)
+    try:
+        # One fetch covering the returned window plus the warm-up the smoothed indicators need
+        start = period_start(f"{params.period_months}mo")
+        warmup = warmup_bars(names, params.rsi_period, params.ema_span, params.window)
+        series = get_ohlc_series_for_symbol(params.symbol, start - bars_lookback(warmup, params.interval), params.interval)
+        first_idx = int(np.searchsorted(series.timestamps, int(start.timestamp())))
+        if first_idx >= len(series.close):
+            set_negative_cache(cache_key)
+            raise HTTPException(status_code=404, detail=NO_DATA_DETAIL)
+
+        indicators = run_cpu_bound(_compute, names, series, first_idx, params)
+        unit = "m" if params.interval == "1h" else "D"
+        response = IndicatorsResponse(
+            dates=series.dates(unit)[first_idx:],
+            close=series.close[first_idx:].tolist(),
+            indicators=indicators,
+        )
+        set_cache(cache_key, response.model_dump())
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception(f"Error in indicators calculation: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error in indicators calculation.")
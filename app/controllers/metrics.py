@@ -0,0 +1,81 @@
+from fastapi import Response
+from app.services.cache import cache
+from app.services.executor import pool_stats
+from app.services.metrics import CONTENT_TYPE, histogram_samples, registry
+from app.services.price_stream import stream_hub
+from app.services.response_cache import response_store
+from app.services.sentiment_scoring import pending_chunks, score_memo
+from app.services.upstream import gateway
+
+BREAKER_STATES = ("closed", "half_open", "open")
+
+
+def _cache_families():
+    # Namespaces are key prefixes: prices, coremetrics, drawdown, sentiment, response, ...
+    namespaces = cache.stats.snapshot()
+    yield "cache_events", "counter", "Cache events per key namespace.", [
+        ("_total", {"namespace": namespace, "event": event}, count)
+        for namespace, counters in namespaces.items()
+        for event, count in counters.items()
+    ]
+    stores = {"data": cache.l1, "response": response_store, "sentiment_memo": score_memo}
+    usage = {name: store.usage() for name, store in stores.items()}
+    yield "cache_entries", "gauge", "Entries held per in-memory cache.", [
+        ("", {"cache": name}, stats["entries"]) for name, stats in usage.items()
+    ]
+    yield "cache_bytes", "gauge", "Approximate bytes held per in-memory cache.", [
+        ("", {"cache": name}, stats["bytes"]) for name, stats in usage.items()
+    ]
+
+
+def _upstream_families():
+    operations = gateway.metrics.snapshot()
+    for field, help in (
+        ("calls", "Upstream calls requested, by operation."),
+        ("attempts", "Upstream attempts made, retries included."),
+        ("attempt_errors", "Upstream attempts that raised."),
+        ("retries", "Upstream attempts retried after an error."),
+        ("failures", "Upstream calls that failed after all retries."),
+        ("rejected", "Upstream calls rejected by the breaker or the rate limit."),
+        ("fallbacks", "Upstream calls answered with the last good result."),
+    ):
+        yield f"upstream_{field}", "counter", help, [
+            ("_total", {"operation": operation}, counters[field]) for operation, counters in operations.items()
+        ]
+    samples = []
+    for operation, counters in operations.items():
+        cumulative = list(counters["latency_buckets"].values())
+        # The gateway keeps cumulative buckets; attempts slower than the last bound go to +Inf
+        per_bucket = [count - previous for count, previous in zip(cumulative, [0, *cumulative])]
+        per_bucket.append(counters["attempts"] - cumulative[-1])
+        samples.extend(histogram_samples({"operation": operation}, list(counters["latency_buckets"]), per_bucket, counters["latency_sum"]))
+    yield "upstream_attempt_duration_seconds", "histogram", "Duration of upstream attempts, by operation.", samples
+    state = gateway.breaker.state
+    yield "upstream_breaker_state", "gauge", "1 for the circuit breaker's current state.", [
+        ("", {"state": name}, int(name == state)) for name in BREAKER_STATES
+    ]
+
+
+def _runtime_families():
+    pools = pool_stats()
+    yield "pool_queue_depth", "gauge", "Tasks waiting for a worker thread, per pool.", [
+        ("", {"pool": name}, stats["queued"]) for name, stats in pools.items()
+    ]
+    yield "pool_threads", "gauge", "Worker threads started, per pool.", [
+        ("", {"pool": name}, stats["threads"]) for name, stats in pools.items()
+    ]
+    yield "sentiment_pool_pending_chunks", "gauge", "Chunks queued or running in the VADER process pool.", [
+        ("", {}, pending_chunks())
+    ]
+    active = stream_hub.active_symbols()
+    yield "stream_symbols", "gauge", "Symbols with a live price poller.", [("", {}, len(active))]
+    yield "stream_subscriptions", "gauge", "Subscriber/symbol pairs across live price streams.", [("", {}, sum(active.values()))]
+
+
+registry.add_collector(_cache_families)
+registry.add_collector(_upstream_families)
+registry.add_collector(_runtime_families)
+
+
+def metrics_controller() -> Response:
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
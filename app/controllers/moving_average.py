@@ -1,40 +1,46 @@
 from fastapi import HTTPException
-from app.models.schemas import (
-    MovingAverageQueryParams, MovingAverageResponse
-)
+from app.models.schemas import MovingAverageQueryParams, ResponseFormatEnum
 from app.helpers.guards import validate_symbol, validate_interval
-from app.services.financial_data import get_close_prices_for_symbol
-from app.services.analysis import calculate_moving_average
+from app.helpers.responses import json_response
+from app.services.financial_data import get_close_series_for_symbol
+from app.services.analysis import moving_average_array
 from app.services.logging_service import LoggingService
 from app.services.cache import get_cache, set_cache
+from app.services.executor import run_cpu_bound
+
+
+def _render(data: dict, params: MovingAverageQueryParams):
+    if params.format == ResponseFormatEnum.columnar:
+        return json_response(data)
+    if data["moving_average"] is None:
+        return json_response({"moving_average": None})
+    return json_response({"moving_average": [
+        {"price": price, "date": date} for date, price in zip(data["dates"], data["moving_average"])
+    ]})
 
 
 def moving_average_controller(params: MovingAverageQueryParams):
     logger = LoggingService.get_logger("moving_average_controller")
     validate_symbol(params.symbol)
     validate_interval(params.interval)
-    cache_key = f"movingavg:{params.symbol}:{params.period_months}:{params.interval}:{params.window}"
+    # Cached columnar, whichever format is requested
+    cache_key = f"movingavg:{params.symbol}:{params.period_months}:{params.interval}:{params.window}:columnar"
     data = get_cache(cache_key)
-    if data:
+    if data is not None:
         logger.info("Information for /moving-average retrieved from cache.")
-        return MovingAverageResponse(**data)
+        return _render(data, params)
     try:
         period = f"{params.period_months}mo"
-        price_points = get_close_prices_for_symbol(params.symbol, period, params.interval)
-        price_values = [pt["price"] for pt in price_points]
-        price_dates = [pt["date"] for pt in price_points]
-        ma = calculate_moving_average(price_values, params.window)
-        points = None
-        if ma is not None:
+        series = get_close_series_for_symbol(params.symbol, period, params.interval)
+        data = {"dates": None, "moving_average": None}
+        if len(series.prices) >= params.window:
+            ma = run_cpu_bound(moving_average_array, series.prices, params.window)
             # Align moving average values with the last N dates
-            relevant_dates = price_dates[-len(ma):] if len(price_dates) >= len(ma) else []
-            points = [
-                {"price": float(p), "date": d}
-                for p, d in zip(ma, relevant_dates)
-            ]
-        response = MovingAverageResponse(moving_average=points)
-        set_cache(cache_key, response.model_dump())
-        return response
+            data = {"dates": series.dates()[-len(ma):], "moving_average": ma.tolist()}
+        set_cache(cache_key, data)
+        return _render(data, params)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception(f"Error in moving average calculation: {e}")
         raise HTTPException(status_code=500, detail="Internal server error in moving average calculation.")
@@ -0,0 +1,46 @@
+import asyncio
+import os
+import orjson
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from app.models.schemas import PriceStreamQueryParams
+from app.helpers.guards import validate_symbol_list
+from app.services.price_stream import stream_hub
+from app.services.ticker_index import get_ticker_index
+from app.services.logging_service import LoggingService
+
+STREAM_MAX_SYMBOLS = int(os.getenv("STREAM_MAX_SYMBOLS", "20"))
+# Comment lines keep idle connections open through proxies and let us notice disconnects
+STREAM_HEARTBEAT_SECONDS = 15
+
+
+async def _events(symbols):
+    logger = LoggingService.get_logger("price_stream_controller")
+    subscriber = stream_hub.subscribe(symbols)
+    logger.info(f"Stream opened for {','.join(symbols)}")
+    try:
+        yield b"retry: 5000\n\n"
+        # Starlette cancels this generator when the client disconnects, which runs the teardown below
+        while True:
+            try:
+                update = await asyncio.wait_for(subscriber.queue.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            yield b"event: price\ndata: " + orjson.dumps(update) + b"\n\n"
+    finally:
+        stream_hub.unsubscribe(subscriber, symbols)
+        logger.info(f"Stream closed for {','.join(symbols)} ({subscriber.dropped} updates dropped)")
+
+
+def price_stream_controller(params: PriceStreamQueryParams) -> StreamingResponse:
+    symbols = validate_symbol_list(params.symbols, STREAM_MAX_SYMBOLS)
+    index = get_ticker_index()
+    unknown = [symbol for symbol in symbols if symbol not in index]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Symbols not valid/allowed: {', '.join(unknown)}.")
+    return StreamingResponse(
+        _events(symbols),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -4,7 +4,6 @@ from app.helpers.guards import validate_symbol
 from app.services.financial_data import get_recomendations_for_symbol
 from app.services.logging_service import LoggingService
 from app.services.cache import get_cache, set_cache
-import pandas as pd
 import numpy as np
 
 def convert_numpy_types(obj):
@@ -13,11 +12,12 @@ def convert_numpy_types(obj):
     return obj
 
 def recommendations_controller(params: RecommendationsQueryParams):
+    import pandas as pd
     logger = LoggingService.get_logger("recommendations_controller")
     validate_symbol(params.symbol)
     cache_key = f"recommendations:{params.symbol}"
     data = get_cache(cache_key)
-    if data:
+    if data is not None:
         logger.info("Information for /recommendations retrieved from cache.")
         return data
     try:
@@ -33,6 +33,8 @@ def recommendations_controller(params: RecommendationsQueryParams):
             return data
         set_cache(cache_key, result)
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception(f"Error in getting recommendations: {e}")
         raise HTTPException(status_code=500, detail="Internal server error in sentiment analysis.")
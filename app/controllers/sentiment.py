@@ -8,7 +8,7 @@ def sentiment_controller(params: SentimentQueryParams):
     logger = LoggingService.get_logger("sentiment_controller")
     cache_key = f"sentiment:{params.symbol}"
     data = get_cache(cache_key)
-    if data:
+    if data is not None:
         logger.info("Information for /sentiment retrieved from cache.")
         return SentimentAnalysisResult(**data)
     try:
@@ -16,6 +16,8 @@ def sentiment_controller(params: SentimentQueryParams):
         response = SentimentAnalysisResult(mean_compound_last_24h=result["mean_compound_last_24h"], articles_last_24h=result["articles_last_24h"])
         set_cache(cache_key, response.model_dump())
         return response
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception(f"Error in sentiment analysis: {e}")
         raise HTTPException(status_code=500, detail="Internal server error in sentiment analysis.")
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException
+from app.models.schemas import SentimentTrendQueryParams, SentimentTrendResponse, SentimentTrendPoint
+from app.helpers.guards import validate_symbol
+from app.services import news_store
+from app.services.logging_service import LoggingService
+from app.services.cache import get_cache, set_cache
+
+WINDOW_DAYS = {"7d": 7, "30d": 30}
+BUCKET_SECONDS = {"1h": 3600, "1d": 86400}
+
+
+def sentiment_trend_controller(params: SentimentTrendQueryParams):
+    logger = LoggingService.get_logger("sentiment_trend_controller")
+    validate_symbol(params.symbol)
+    cache_key = f"sentimenttrend:{params.symbol}:{params.window.value}:{params.bucket.value}"
+    data = get_cache(cache_key)
+    if data is not None:
+        logger.info("Information for /sentiment/trend retrieved from cache.")
+        return SentimentTrendResponse(**data)
+    try:
+        # Answered from the news store, upstream is only asked for the latest articles
+        news_store.sync_news(params.symbol)
+        since = datetime.now(timezone.utc) - timedelta(days=WINDOW_DAYS[params.window.value])
+        buckets = news_store.read_sentiment_buckets(params.symbol, since, BUCKET_SECONDS[params.bucket.value])
+        points = [
+            SentimentTrendPoint(
+                time=datetime.fromtimestamp(bucket, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                articles=count,
+                mean_compound=mean,
+            )
+            for bucket, count, mean in buckets
+        ]
+        articles = sum(point.articles for point in points)
+        mean_compound = sum(point.mean_compound * point.articles for point in points) / articles if articles else None
+        response = SentimentTrendResponse(points=points, articles=articles, mean_compound=mean_compound)
+        set_cache(cache_key, response.model_dump())
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception(f"Error in sentiment trend analysis: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error in sentiment trend analysis.")
@@ -0,0 +1,15 @@
+from fastapi import HTTPException
+from app.services.logging_service import LoggingService
+from app.models.schemas import TickerSearchQueryParams, TickerSearchResponse, TickerSearchResult
+from app.services.ticker_index import get_ticker_index
+
+logger = LoggingService.get_logger("ticker_search_controller")
+
+def ticker_search_controller(params: TickerSearchQueryParams):
+    try:
+        total, hits = get_ticker_index().search.search(params.q, params.limit, params.offset)
+        results = [TickerSearchResult(**hit._asdict()) for hit in hits]
+        return TickerSearchResponse(query=params.q, total=total, offset=params.offset, limit=params.limit, results=results)
+    except Exception as e:
+        logger.exception(f"Error searching tickers for '{params.q}': {e}")
+        raise HTTPException(status_code=500, detail="Internal server error searching tickers.")
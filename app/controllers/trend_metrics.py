@@ -1,12 +1,16 @@
+from datetime import datetime, timezone
 from fastapi import HTTPException
 from app.models.schemas import (
     TrendMetricsQueryParams, TrendMetricsResponse
 )
 from app.helpers.guards import validate_symbol, validate_interval
-from app.services.financial_data import get_close_prices_for_symbol
-from app.services.analysis import calculate_moving_average
+from app.services.metric_state import rolling_window_state
+from app.services.series_planner import bars_lookback
 from app.services.logging_service import LoggingService
-from app.services.cache import get_cache, set_cache
+from app.services.cache import get_cache, set_cache, set_negative_cache, is_negative
+
+NO_DATA_DETAIL = "Not enough price data found for trend metrics."
+TREND_BARS = 20
 
 
 def trend_metrics_controller(params: TrendMetricsQueryParams):
@@ -14,29 +18,31 @@ def trend_metrics_controller(params: TrendMetricsQueryParams):
     validate_symbol(params.symbol)
     cache_key = f"trend:{params.symbol}"
     data = get_cache(cache_key)
-    if data:
+    if data is not None:
+        if is_negative(data):
+            raise HTTPException(status_code=404, detail=NO_DATA_DETAIL)
         logger.info("Information for /trend-metrics retrieved from cache.")
         return TrendMetricsResponse(**data)
     try:
-        # Always fetch 21 days for 20-day trend metrics
-        prices_dict = get_close_prices_for_symbol(params.symbol, "21d", "1d")
-        if not prices_dict or len(prices_dict) < 21:
-            raise HTTPException(status_code=404, detail="Not enough price data found for trend metrics.")
+        # The last 21 daily closes (current bar plus the 20 before it), kept as rolling state
+        lookback_start = datetime.now(timezone.utc) - bars_lookback(TREND_BARS + 1, "1d")
+        state = rolling_window_state(params.symbol, "1d", TREND_BARS + 1, lookback_start)
+        if state is None:
+            set_negative_cache(cache_key)
+            raise HTTPException(status_code=404, detail=NO_DATA_DETAIL)
 
-        prices = [p["price"] for p in prices_dict]
-        current_price = prices[-1]
-        price_20_days_ago = prices[-21]
-        sma_20_list = calculate_moving_average(prices, 20)
-        sma_20 = sma_20_list[-1] if sma_20_list else None
-        sma_gap = current_price - sma_20 if sma_20 is not None else None
-        momentum_20d = current_price - price_20_days_ago if price_20_days_ago is not None else None
+        current_price = state.closes[-1]
+        price_20_days_ago = state.closes[0]
+        sma_20 = (state.total - price_20_days_ago) / TREND_BARS
 
         response = TrendMetricsResponse(
-            momentum_20d=momentum_20d,
-            sma_gap=sma_gap
+            momentum_20d=current_price - price_20_days_ago,
+            sma_gap=current_price - sma_20
         )
         set_cache(cache_key, response.model_dump())
         return response
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception(f"Error in trend metrics calculation: {e}")
         raise HTTPException(status_code=500, detail="Internal server error in trend metrics calculation.")
@@ -0,0 +1,5 @@
+from app.services.upstream import gateway
+
+
+def upstream_stats_controller():
+    return gateway.stats()
@@ -1,14 +1,28 @@
-from http.client import HTTPException
-from pathlib import Path
-import sqlite3
-from app.models.schemas import IntervalEnum, MAWindowEnum, MAX_PERIOD_MONTHS, MIN_PERIOD_MONTHS
+from typing import List
+from fastapi import HTTPException
+from app.models.schemas import IndicatorEnum, IntervalEnum, MAWindowEnum, MAX_PERIOD_MONTHS, MIN_PERIOD_MONTHS
+from app.services.ticker_index import get_ticker_index
 
 def validate_symbol(symbol: str):
-    allowed = get_allowed_tickers()
-    if symbol not in allowed:
+    if symbol not in get_ticker_index():
         raise HTTPException(status_code=422, detail=f"Symbol '{symbol}' is not a valid/allowed ticker.")
     return symbol
 
+def validate_symbol_list(symbols: str, max_size: int) -> List[str]:
+    parsed = list(dict.fromkeys(s.strip() for s in symbols.split(",") if s.strip()))
+    if not parsed:
+        raise HTTPException(status_code=422, detail="At least one symbol is required.")
+    if len(parsed) > max_size:
+        raise HTTPException(status_code=422, detail=f"At most {max_size} symbols are allowed per request.")
+    return parsed
+
+def validate_indicator_set(indicators: str) -> List[str]:
+    parsed = list(dict.fromkeys(s.strip().lower() for s in indicators.split(",") if s.strip()))
+    allowed = [e.value for e in IndicatorEnum]
+    if not parsed or any(name not in allowed for name in parsed):
+        raise HTTPException(status_code=422, detail=f"set must be a comma separated list of {allowed}.")
+    return parsed
+
 def validate_period_months(period_months: int):
     if not (MIN_PERIOD_MONTHS <= period_months <= MAX_PERIOD_MONTHS):
         raise HTTPException(status_code=422, detail=f"period_months must be between {MIN_PERIOD_MONTHS} and {MAX_PERIOD_MONTHS}.")
@@ -25,10 +39,4 @@ def validate_interval(interval: str):
     return interval
 
 def get_allowed_tickers():
-    db_file = Path(__file__).parent.parent / 'database.db'
-    conn = sqlite3.connect(str(db_file))
-    c = conn.cursor()
-    c.execute('SELECT symbol FROM stock_symbols')
-    rows = c.fetchall()
-    conn.close()
-    return set(row[0] for row in rows)
\ No newline at end of file
+    return get_ticker_index().members
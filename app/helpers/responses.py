@@ -0,0 +1,12 @@
+from typing import Any
+import orjson
+from fastapi import Response
+
+
+def json_response(content: Any, status_code: int = 200) -> Response:
+    """Serialize straight to JSON bytes with orjson (NumPy arrays included), skipping response_model validation."""
+    return Response(
+        content=orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY),
+        status_code=status_code,
+        media_type="application/json",
+    )
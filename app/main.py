@@ -1,4 +1,5 @@
 
+import threading
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -6,29 +7,51 @@ from app.routers import general
 from app.services.logging_service import LoggingService
 from app.startup.vader_startup import init_vader_sia
 from app.scripts.init_stocks_db import initiate_db as init_stocks_db_main
-from app.db import get_db_connection
+from app.db import close_db_connections
+from app.services.executor import shutdown_pools
+from app.services.cache import cache
+from app.services.response_cache import response_store
+from app.services.ticker_index import reload_ticker_index
+from app.services.prefetcher import start_prefetcher, stop_prefetcher
+from app.services.sentiment_scoring import shutdown_sentiment_pool
+from app.services.price_stream import stream_hub
+from app.services.metrics import RequestMetricsMiddleware
 
 logger = LoggingService.get_logger(__name__)
 
 # --- startup code ---
+def _warm_vader():
+    try:
+        init_vader_sia()
+        logger.info("VADER sentiment analyzer loaded")
+    except Exception as e:
+        logger.exception(f"Failed to initialize VADER: {e}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting up FastAPI application")
     try:
         init_stocks_db_main()
         logger.info("database initialized.")
+        reload_ticker_index()
     except Exception as e:
         logger.exception(f"Failed to initialize database: {e}")
-    
-    try:
-        init_vader_sia()
-        logger.info("VADER sentiment analyzer loaded")
-    except Exception as e:
-        logger.exception(f"Failed to initialize VADER: {e}")
-    # Register DB connection
-    app.state.db_connection = get_db_connection()
+
+    # Loading nltk and the lexicon is only needed by sentiment endpoints, do it without delaying startup
+    threading.Thread(target=_warm_vader, name="vader-warmup", daemon=True).start()
+    cache.l1.start_sweeper()
+    response_store.start_sweeper()
+    start_prefetcher()
     yield
     logger.info("Shutting down FastAPI application")
+    stream_hub.close()
+    stop_prefetcher()
+    cache.l1.stop_sweeper()
+    response_store.stop_sweeper()
+    shutdown_sentiment_pool()
+    # Let running tasks finish before their SQLite connections are closed under them
+    shutdown_pools(wait=True)
+    close_db_connections()
 
 app = FastAPI(
     title="Financial Analysis Backend",
@@ -43,6 +66,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(RequestMetricsMiddleware)
 
 # Routers
 app.include_router(general.router, prefix="", tags=["General"])
\ No newline at end of file
@@ -1,7 +1,7 @@
 from typing import Optional
 from fastapi import Query
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List
 from enum import Enum
 
 class IntervalEnum(str, Enum):
@@ -15,6 +15,31 @@ class MAWindowEnum(int, Enum):
     long = 50
     very_long = 200
 
+class ResponseFormatEnum(str, Enum):
+    rows = "rows"
+    columnar = "columnar"
+
+class AlignmentEnum(str, Enum):
+    inner = "inner"
+    ffill = "ffill"
+    pairwise = "pairwise"
+
+class IndicatorEnum(str, Enum):
+    ema = "ema"
+    rsi = "rsi"
+    macd = "macd"
+    bb = "bb"
+    atr = "atr"
+    vol = "vol"
+
+class SentimentWindowEnum(str, Enum):
+    week = "7d"
+    month = "30d"
+
+class SentimentBucketEnum(str, Enum):
+    hour = "1h"
+    day = "1d"
+
 MAX_PERIOD_MONTHS = 60
 MIN_PERIOD_MONTHS = 1
 
@@ -28,6 +53,30 @@ class SymbolRequestClass(BaseModel):
 class SentimentQueryParams(SymbolRequestClass):
     pass
 
+class BatchSentimentQueryParams(BaseModel):
+    symbols: str = Query(..., description="Comma separated stock ticker symbols (e.g., 'AAPL,MSFT,NVDA').")
+
+class BatchSentimentResponse(BaseModel):
+    results: Dict[str, SentimentAnalysisResult]
+    errors: Dict[str, str]
+
+class PriceStreamQueryParams(BaseModel):
+    symbols: str = Query(..., description="Comma separated stock ticker symbols to stream (e.g., 'AAPL,MSFT,NVDA').")
+
+class SentimentTrendQueryParams(SymbolRequestClass):
+    window: SentimentWindowEnum = Query(SentimentWindowEnum.week, description="Lookback window. Options: '7d', '30d'.")
+    bucket: SentimentBucketEnum = Query(SentimentBucketEnum.hour, description="Bucket size. Options: '1h' (hourly), '1d' (daily).")
+
+class SentimentTrendPoint(BaseModel):
+    time: str
+    articles: int
+    mean_compound: float
+
+class SentimentTrendResponse(BaseModel):
+    points: List[SentimentTrendPoint]
+    articles: int
+    mean_compound: Optional[float]
+
 class RecommendationsQueryParams(SymbolRequestClass):
     pass
 
@@ -43,12 +92,14 @@ class PricesQueryParams(BaseModel):
     symbol: str = Query(..., description="Stock ticker symbol (e.g., 'AAPL').")
     period_months: int = Query(1, ge=MIN_PERIOD_MONTHS, le=MAX_PERIOD_MONTHS, description=f"Number of months of historical data to use (min {MIN_PERIOD_MONTHS}, max {MAX_PERIOD_MONTHS}).")
     interval: IntervalEnum = Query(IntervalEnum.day, description="Data interval for price sampling. Options: '1d' (daily), '1h' (hourly), '1wk' (weekly).")
+    format: ResponseFormatEnum = Query(ResponseFormatEnum.rows, description="Response layout. 'rows' returns a list of {price, date} points, 'columnar' returns {dates: [...], prices: [...]}.")
 
 # --- Query Schemas ---
 class DrawdownMetricsQueryParams(BaseModel):
     symbol: str = Query(..., description="Stock ticker symbol (e.g., 'AAPL').")
     period_months: int = Query(12, ge=MIN_PERIOD_MONTHS, le=MAX_PERIOD_MONTHS, description=f"Number of months of historical data to use (min {MIN_PERIOD_MONTHS}, max {MAX_PERIOD_MONTHS}).")
     interval: IntervalEnum = Query(IntervalEnum.day, description="Data interval for price sampling. Options: '1d' (daily), '1wk' (weekly).")
+    episodes: int = Query(0, ge=0, le=50, description="Number of deepest drawdown episodes to include (0 = none). Also includes the underwater curve.")
     
 class CoreMetricsQueryParams(BaseModel):
     symbol: str = Query(..., description="Stock ticker symbol (e.g., 'AAPL' for Apple Inc.).")
@@ -56,6 +107,12 @@ class CoreMetricsQueryParams(BaseModel):
     interval: IntervalEnum = Query(IntervalEnum.day, description="Data interval for price sampling. Options: '1d' (daily), '1h' (hourly), '1wk' (weekly).")
     rsi_period: int = Query(14, description="Number of periods (days) to use for RSI calculation. Standard is 14.")
 
+class BatchCoreMetricsQueryParams(BaseModel):
+    symbols: str = Query(..., description="Comma separated stock ticker symbols (e.g., 'AAPL,MSFT,NVDA').")
+    period_months: int = Query(1, ge=MIN_PERIOD_MONTHS, le=MAX_PERIOD_MONTHS, description=f"Number of months of historical data to use for main metrics (min {MIN_PERIOD_MONTHS}, max {MAX_PERIOD_MONTHS}).")
+    interval: IntervalEnum = Query(IntervalEnum.day, description="Data interval for price sampling. Options: '1d' (daily), '1h' (hourly), '1wk' (weekly).")
+    rsi_period: int = Query(14, ge=1, description="Number of periods (days) to use for RSI calculation. Standard is 14.")
+
 class TrendMetricsQueryParams(BaseModel):
     symbol: str = Query(..., description="Stock ticker symbol (e.g., 'AAPL' for Apple Inc.).")
 
@@ -65,12 +122,28 @@ class CorrelationMetricsQueryParams(BaseModel):
     period_months: int = Query(6, ge=MIN_PERIOD_MONTHS, le=MAX_PERIOD_MONTHS, description=f"Number of months of historical data to use (min {MIN_PERIOD_MONTHS}, max {MAX_PERIOD_MONTHS}).")
     interval: IntervalEnum = Query(IntervalEnum.day, description="Data interval for price sampling. Options: '1d' (daily), '1h' (hourly), '1wk' (weekly).")
 
+class CorrelationMatrixQueryParams(BaseModel):
+    symbols: str = Query(..., description="Comma separated ticker symbols (e.g., 'AAPL,MSFT,^GSPC').")
+    period_months: int = Query(6, ge=MIN_PERIOD_MONTHS, le=MAX_PERIOD_MONTHS, description=f"Number of months of historical data to use (min {MIN_PERIOD_MONTHS}, max {MAX_PERIOD_MONTHS}).")
+    interval: IntervalEnum = Query(IntervalEnum.day, description="Data interval for price sampling. Options: '1d' (daily), '1h' (hourly), '1wk' (weekly).")
+    alignment: AlignmentEnum = Query(AlignmentEnum.inner, description="How series are aligned on timestamps. 'inner' keeps bars where every symbol traded, 'ffill' carries the last close over gaps, 'pairwise' uses the bars both symbols of each pair traded.")
+
 
 class MovingAverageQueryParams(BaseModel):
     symbol: str = Query(..., description="Stock ticker symbol (e.g., 'AAPL').")
     period_months: int = Query(1, ge=MIN_PERIOD_MONTHS, le=MAX_PERIOD_MONTHS, description=f"Number of months of historical data to use (min {MIN_PERIOD_MONTHS}, max {MAX_PERIOD_MONTHS}).")
     interval: IntervalEnum = Query(IntervalEnum.day, description="Data interval for price sampling. Options: '1d' (daily), '1h' (hourly), '1wk' (weekly).")
     window: MAWindowEnum = Query(MAWindowEnum.standard, description="Window size for moving average calculation. Options: 10, 20, 50, 200.")
+    format: ResponseFormatEnum = Query(ResponseFormatEnum.rows, description="Response layout. 'rows' returns a list of {price, date} points, 'columnar' returns {dates: [...], moving_average: [...]}.")
+
+class IndicatorsQueryParams(BaseModel):
+    symbol: str = Query(..., description="Stock ticker symbol (e.g., 'AAPL').")
+    set: str = Query("rsi,macd,bb", description="Comma separated indicators. Options: 'ema', 'rsi', 'macd', 'bb' (Bollinger bands), 'atr', 'vol' (rolling volatility).")
+    period_months: int = Query(6, ge=MIN_PERIOD_MONTHS, le=MAX_PERIOD_MONTHS, description=f"Number of months of historical data to return (min {MIN_PERIOD_MONTHS}, max {MAX_PERIOD_MONTHS}).")
+    interval: IntervalEnum = Query(IntervalEnum.day, description="Data interval for price sampling. Options: '1d' (daily), '1h' (hourly), '1wk' (weekly).")
+    rsi_period: int = Query(14, ge=2, le=200, description="RSI period (Wilder smoothing).")
+    ema_span: int = Query(20, ge=2, le=200, description="EMA span.")
+    window: int = Query(20, ge=2, le=200, description="Window for Bollinger bands and rolling volatility.")
 
 
 # --- Company Info Query Schema ---
@@ -90,6 +163,11 @@ class CompanyInfoResponse(BaseModel):
 class AvailableTickersQueryParams(BaseModel):
     starts_with: Optional[str] = Query(None, min_length=1, max_length=5, description="Filter tickers by initial letters")
 
+class TickerSearchQueryParams(BaseModel):
+    q: str = Query(..., min_length=1, max_length=64, description="Free text matched against symbol, company name, sector and industry (e.g., 'apple', 'semiconductor').")
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of results to return.")
+    offset: int = Query(0, ge=0, le=500, description="Number of ranked results to skip, for paging.")
+
 # --- Response Models ---
 class CoreMetricsResponse(BaseModel):
     return_: Optional[float]
@@ -99,6 +177,17 @@ class CoreMetricsResponse(BaseModel):
     return_3m: Optional[float]
     pe_ratio: Optional[float]
 
+class BatchCoreMetrics(BaseModel):
+    return_: Optional[float]
+    volatility: Optional[float]
+    rsi: Optional[float]
+    return_1m: Optional[float]
+    return_3m: Optional[float]
+
+class BatchCoreMetricsResponse(BaseModel):
+    results: Dict[str, BatchCoreMetrics]
+    errors: Dict[str, str]
+
 class MovingAveragePoint(BaseModel):
     price: float
     date: str
@@ -106,6 +195,10 @@ class MovingAveragePoint(BaseModel):
 class MovingAverageResponse(BaseModel):
     moving_average: Optional[list[MovingAveragePoint]]
 
+class MovingAverageColumnarResponse(BaseModel):
+    dates: Optional[list[str]]
+    moving_average: Optional[list[float]]
+
 class TrendMetricsResponse(BaseModel):
     momentum_20d: Optional[float]
     sma_gap: Optional[float]
@@ -114,13 +207,60 @@ class CorrelationMetricsResponse(BaseModel):
     correlation: Optional[float]
     beta: Optional[float]
 
+class CorrelationMatrixResponse(BaseModel):
+    symbols: List[str]
+    correlation: List[List[Optional[float]]]
+    covariance: List[List[Optional[float]]]
+    beta: List[List[Optional[float]]]
+    observations: int
+    errors: Dict[str, str]
+
+
+class DrawdownEpisode(BaseModel):
+    peak_date: str
+    trough_date: str
+    recovery_date: Optional[str]
+    depth_pct: float
+    # Bars from peak to trough, trough to recovery (None while open), and peak to recovery or last bar
+    drawdown_bars: int
+    recovery_bars: Optional[int]
+    duration_bars: int
+
+class UnderwaterCurve(BaseModel):
+    dates: List[str]
+    drawdown_pct: List[float]
 
 class DrawdownMetricsResponse(BaseModel):
     max_drawdown_pct: Optional[float]
     recovery_days: Optional[int]
+    episodes: Optional[List[DrawdownEpisode]] = None
+    underwater: Optional[UnderwaterCurve] = None
     
+class IndicatorsResponse(BaseModel):
+    dates: List[str]
+    close: List[float]
+    indicators: Dict[str, Dict[str, List[Optional[float]]]]
+
 class PricesResponse(BaseModel):
     prices: list[PricePoint]
 
+class PricesColumnarResponse(BaseModel):
+    dates: list[str]
+    prices: list[float]
+
 class AvailableTickersResponse(BaseModel):
-    tickers: list[AvailableTicker]
\ No newline at end of file
+    tickers: list[AvailableTicker]
+
+class TickerSearchResult(BaseModel):
+    symbol: str
+    name: str
+    sector: Optional[str] = None
+    industry: Optional[str] = None
+    score: float
+
+class TickerSearchResponse(BaseModel):
+    query: str
+    total: int
+    offset: int
+    limit: int
+    results: list[TickerSearchResult]
@@ -1,22 +1,39 @@
-from fastapi import APIRouter, Depends
+from typing import Union
+from fastapi import APIRouter, Depends, Request
 from app.models.schemas import (
     CompanyInfoQueryParams, SentimentQueryParams, RecommendationsQueryParams, CoreMetricsQueryParams,
     TrendMetricsQueryParams, CorrelationMetricsQueryParams, DrawdownMetricsQueryParams,
     CoreMetricsResponse, TrendMetricsResponse, CorrelationMetricsResponse, DrawdownMetricsResponse,
-    MovingAverageQueryParams, MovingAverageResponse, PricesResponse, PricesQueryParams
+    MovingAverageQueryParams, MovingAverageResponse, MovingAverageColumnarResponse,
+    PricesResponse, PricesColumnarResponse, PricesQueryParams,
+    BatchCoreMetricsQueryParams, BatchCoreMetricsResponse, CorrelationMatrixQueryParams, CorrelationMatrixResponse,
+    BatchSentimentQueryParams, BatchSentimentResponse, SentimentTrendQueryParams, SentimentTrendResponse,
+    IndicatorsQueryParams, IndicatorsResponse, PriceStreamQueryParams,
+    TickerSearchQueryParams, TickerSearchResponse
 )
 from app.controllers.prices import prices_controller
+from app.controllers.price_stream import price_stream_controller
 from app.controllers.sentiment import sentiment_controller
+from app.controllers.batch_sentiment import batch_sentiment_controller
+from app.controllers.sentiment_trend import sentiment_trend_controller
 from app.controllers.core_metrics import core_metrics_controller
+from app.controllers.batch_core_metrics import batch_core_metrics_controller
 from app.controllers.moving_average import moving_average_controller
+from app.controllers.indicators import indicators_controller
 from app.controllers.trend_metrics import trend_metrics_controller
 from app.controllers.correlation_metrics import correlation_metrics_controller
+from app.controllers.correlation_matrix import correlation_matrix_controller
 from app.controllers.drawdown_metrics import drawdown_metrics_controller
 from app.controllers.recommendations import recommendations_controller
 from app.controllers.available_tickers import available_tickers_controller
+from app.controllers.ticker_search import ticker_search_controller
 from app.controllers.company_about import get_company_about
 from app.models.schemas import AvailableTickersQueryParams
 from app.controllers.parameter_options import parameter_options_controller
+from app.controllers.cache_stats import cache_stats_controller
+from app.controllers.upstream_stats import upstream_stats_controller
+from app.controllers.metrics import metrics_controller
+from app.services.response_cache import cached_response
 
 router = APIRouter()
 
@@ -25,52 +42,101 @@ async def get_valid_parameter_options():
     return parameter_options_controller()
 
 # --- Regular Prices ---
-@router.get("/prices", response_model=PricesResponse)
-async def get_prices(params: PricesQueryParams = Depends()):
-    return prices_controller(params)
+@router.get("/prices", response_model=Union[PricesResponse, PricesColumnarResponse])
+async def get_prices(request: Request, params: PricesQueryParams = Depends()):
+    return await cached_response(request, prices_controller, params)
+
+# --- Live Price Stream (Server-Sent Events) ---
+@router.get("/stream/prices")
+async def stream_prices(params: PriceStreamQueryParams = Depends()):
+    return price_stream_controller(params)
 
 # --- Sentiment Analysis ---
 @router.get("/sentiment")
-async def sentiment(params: SentimentQueryParams = Depends()):
-    return sentiment_controller(params)
+async def sentiment(request: Request, params: SentimentQueryParams = Depends()):
+    return await cached_response(request, sentiment_controller, params)
+
+@router.get("/sentiment/batch", response_model=BatchSentimentResponse)
+async def batch_sentiment(request: Request, params: BatchSentimentQueryParams = Depends()):
+    return await cached_response(request, batch_sentiment_controller, params)
+
+@router.get("/sentiment/trend", response_model=SentimentTrendResponse)
+async def sentiment_trend(request: Request, params: SentimentTrendQueryParams = Depends()):
+    return await cached_response(request, sentiment_trend_controller, params)
 
 # --- Unified Core Metrics Endpoint ---
 @router.get("/core-metrics", response_model=CoreMetricsResponse)
-async def get_core_metrics(params: CoreMetricsQueryParams = Depends()):
-    return core_metrics_controller(params)
+async def get_core_metrics(request: Request, params: CoreMetricsQueryParams = Depends()):
+    return await cached_response(request, core_metrics_controller, params)
+
+# --- Batch Core Metrics Endpoint ---
+@router.get("/batch/core-metrics", response_model=BatchCoreMetricsResponse)
+async def get_batch_core_metrics(request: Request, params: BatchCoreMetricsQueryParams = Depends()):
+    return await cached_response(request, batch_core_metrics_controller, params)
 
 # --- Moving Average Endpoint ---
-@router.get("/moving-average", response_model=MovingAverageResponse)
-async def get_moving_average(params: MovingAverageQueryParams = Depends()):
-    return moving_average_controller(params)
+@router.get("/moving-average", response_model=Union[MovingAverageResponse, MovingAverageColumnarResponse])
+async def get_moving_average(request: Request, params: MovingAverageQueryParams = Depends()):
+    return await cached_response(request, moving_average_controller, params)
+
+# --- Technical Indicators Endpoint ---
+@router.get("/indicators", response_model=IndicatorsResponse)
+async def get_indicators(request: Request, params: IndicatorsQueryParams = Depends()):
+    return await cached_response(request, indicators_controller, params)
     
 # --- Trend Metrics Endpoint ---
 @router.get("/trend-metrics", response_model=TrendMetricsResponse)
-async def get_trend_metrics(params: TrendMetricsQueryParams = Depends()):
-    return trend_metrics_controller(params)
+async def get_trend_metrics(request: Request, params: TrendMetricsQueryParams = Depends()):
+    return await cached_response(request, trend_metrics_controller, params)
     
 # --- Correlation & Beta Metrics Endpoint ---
 @router.get("/correlation-metrics", response_model=CorrelationMetricsResponse)
-async def get_correlation_metrics(params: CorrelationMetricsQueryParams = Depends()):
-    return correlation_metrics_controller(params)
+async def get_correlation_metrics(request: Request, params: CorrelationMetricsQueryParams = Depends()):
+    return await cached_response(request, correlation_metrics_controller, params)
 
+# --- Correlation & Beta Matrix Endpoint ---
+@router.get("/correlation-matrix", response_model=CorrelationMatrixResponse)
+async def get_correlation_matrix(request: Request, params: CorrelationMatrixQueryParams = Depends()):
+    return await cached_response(request, correlation_matrix_controller, params)
     
 # --- Drawdown Analysis Endpoint ---
 @router.get("/drawdown-metrics", response_model=DrawdownMetricsResponse)
-async def get_drawdown_metrics(params: DrawdownMetricsQueryParams = Depends()):
-    return drawdown_metrics_controller(params)
+async def get_drawdown_metrics(request: Request, params: DrawdownMetricsQueryParams = Depends()):
+    return await cached_response(request, drawdown_metrics_controller, params)
 
 # --- Available Tickers ---
 @router.get("/available-tickers")
-async def get_available_tickers(params: AvailableTickersQueryParams = Depends()):
-    return available_tickers_controller(params)
+async def get_available_tickers(request: Request, params: AvailableTickersQueryParams = Depends()):
+    return await cached_response(request, available_tickers_controller, params)
+
+# --- Ticker Search ---
+# Answered straight from the in-memory index: one lookup costs less than a response
+# cache hit, and caching every typeahead prefix would only evict useful entries
+@router.get("/ticker-search", response_model=TickerSearchResponse)
+async def ticker_search(params: TickerSearchQueryParams = Depends()):
+    return ticker_search_controller(params)
     
 # --- Recommendations  ---
 @router.get("/recommendations")
-async def recommendations(params: RecommendationsQueryParams = Depends()):
-    return recommendations_controller(params)
+async def recommendations(request: Request, params: RecommendationsQueryParams = Depends()):
+    return await cached_response(request, recommendations_controller, params)
 
 # --- Company About Endpoint ---
 @router.get("/company-about")
-async def company_about(params: CompanyInfoQueryParams = Depends()):
-    return get_company_about(params)
\ No newline at end of file
+async def company_about(request: Request, params: CompanyInfoQueryParams = Depends()):
+    return await cached_response(request, get_company_about, params)
+
+# --- Cache Statistics ---
+@router.get("/cache-stats")
+async def cache_stats():
+    return cache_stats_controller()
+
+# --- Upstream Statistics ---
+@router.get("/upstream-stats")
+async def upstream_stats():
+    return upstream_stats_controller()
+
+# --- Prometheus Metrics ---
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    return metrics_controller()
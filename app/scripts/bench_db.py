@@ -0,0 +1,140 @@
+"""
+Concurrent read benchmark: one shared connection behind a lock (the previous
+model) against per-thread WAL connections from app.db, with and without a
+writer upserting bars in the background.
+
+Runs on a temporary database filled with synthetic daily bars, so the real
+app/database.db is never touched.
+
+    python -m app.scripts.bench_db [--symbols 50] [--bars 2500] [--queries 2000]
+"""
+import argparse
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from app.db import connect
+from app.services import price_store
+
+THREAD_COUNTS = (1, 4, 8, 16)
+READ_SQL = "SELECT ts, close FROM price_bars WHERE symbol = ? AND interval = ? AND ts >= ? ORDER BY ts ASC"
+WRITE_SQL = (
+    "INSERT OR REPLACE INTO price_bars (symbol, interval, ts, open, high, low, close, volume) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+DAY = 86400
+
+
+def _populate(path: Path, symbols: int, bars: int) -> int:
+    conn = sqlite3.connect(str(path))
+    price_store.create_price_tables(conn)
+    first_ts = int(time.time()) // DAY * DAY - bars * DAY
+    rng = random.Random(7)
+    for s in range(symbols):
+        price = 100.0
+        rows = []
+        for i in range(bars):
+            price *= 1 + rng.gauss(0, 0.01)
+            rows.append((f"SYM{s}", "1d", first_ts + i * DAY, price, price, price, price, 1e6))
+        conn.executemany(WRITE_SQL, rows)
+    conn.commit()
+    conn.close()
+    return first_ts
+
+
+class SharedConnection:
+    """The previous model: one connection for every thread, serialized by a lock."""
+
+    def __init__(self, path: Path):
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.lock = threading.Lock()
+
+    def read(self, params):
+        with self.lock:
+            return self.conn.execute(READ_SQL, params).fetchall()
+
+    def write(self, rows):
+        with self.lock:
+            self.conn.executemany(WRITE_SQL, rows)
+            self.conn.commit()
+
+
+class PerThreadConnections:
+    """app.db's model: a WAL connection per thread, no lock on reads."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.local = threading.local()
+        self.write_lock = threading.Lock()
+
+    def _conn(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self.local.conn = connect(self.path)
+        return conn
+
+    def read(self, params):
+        return self._conn().execute(READ_SQL, params).fetchall()
+
+    def write(self, rows):
+        conn = self._conn()
+        with self.write_lock:
+            conn.executemany(WRITE_SQL, rows)
+            conn.commit()
+
+
+def _run(db, threads: int, queries: int, symbols: int, window_start: int, with_writer: bool) -> float:
+    stop = threading.Event()
+
+    def writer():
+        rng = random.Random(1)
+        while not stop.is_set():
+            s = rng.randrange(symbols)
+            db.write([(f"SYM{s}", "1d", window_start + DAY * rng.randrange(200), 1, 1, 1, 1, 1)])
+            time.sleep(0.001)
+
+    def reader(seed: int):
+        rng = random.Random(seed)
+        for _ in range(queries // threads):
+            db.read((f"SYM{rng.randrange(symbols)}", "1d", window_start))
+
+    background = threading.Thread(target=writer) if with_writer else None
+    if background:
+        background.start()
+    workers = [threading.Thread(target=reader, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    if background:
+        background.join()
+    return queries / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--bars", type=int, default=2500)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Separate files: a database switched to WAL stays in WAL mode
+        shared_path, wal_path = Path(tmp) / "shared.db", Path(tmp) / "wal.db"
+        first_ts = _populate(shared_path, args.symbols, args.bars)
+        shutil.copyfile(shared_path, wal_path)
+        # One year of daily bars per read, the typical /prices window
+        window_start = first_ts + (args.bars - 252) * DAY
+        print(f"{args.symbols} symbols x {args.bars} bars, {args.queries} reads of 252 bars per run")
+        for with_writer in (False, True):
+            print("with a concurrent writer" if with_writer else "reads only")
+            for threads in THREAD_COUNTS:
+                shared = _run(SharedConnection(shared_path), threads, args.queries, args.symbols, window_start, with_writer)
+                pooled = _run(PerThreadConnections(wal_path), threads, args.queries, args.symbols, window_start, with_writer)
+                print(f"  {threads:>2} threads  shared+lock {shared:>9.0f} q/s   per-thread WAL {pooled:>9.0f} q/s")
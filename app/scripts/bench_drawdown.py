@@ -0,0 +1,68 @@
+"""
+Microbenchmark: vectorized drawdown episode analysis on long hourly histories,
+against a bar-by-bar Python episode scan and the previous worst-drawdown-only
+implementation (running max plus a Python recovery loop).
+
+    python -m app.scripts.bench_drawdown
+"""
+import timeit
+import numpy as np
+from app.services.analysis import drawdown_episodes, top_drawdown_episodes, underwater_curve
+
+# Regular US session: 7 hourly bars per trading day, 252 trading days per year
+BARS_PER_YEAR = 7 * 252
+YEARS = (5, 10, 30)
+
+
+def _synthetic_closes(n: int, seed: int = 11) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0.00002, 0.004, n)))
+
+
+def _episodes_loop(prices: np.ndarray) -> list:
+    episodes, current = [], None
+    peak, peak_idx = prices[0], 0
+    for i, price in enumerate(prices.tolist()):
+        if price >= peak:
+            if current:
+                current[3] = i
+                episodes.append(current)
+                current = None
+            peak, peak_idx = price, i
+        else:
+            depth = price / peak - 1
+            if current is None:
+                current = [peak_idx, i, depth, -1]
+            elif depth < current[2]:
+                current[1], current[2] = i, depth
+    if current:
+        episodes.append(current)
+    return episodes
+
+
+def _worst_drawdown_previous(prices: np.ndarray):
+    running_max = np.maximum.accumulate(prices)
+    drawdowns = (prices - running_max) / running_max
+    drawdown_idx = np.argmin(drawdowns)
+    peak_idx = np.argmax(prices[:drawdown_idx + 1])
+    for i in range(drawdown_idx, len(prices)):
+        if prices[i] >= running_max[peak_idx]:
+            return i - drawdown_idx
+    return None
+
+
+def _report(label: str, stmt, number: int):
+    best = min(timeit.repeat(stmt, number=number, repeat=5)) / number
+    print(f"  {label:<40}{best * 1e3:>10.3f} ms")
+
+
+if __name__ == "__main__":
+    for years in YEARS:
+        n = years * BARS_PER_YEAR
+        prices = _synthetic_closes(n)
+        found = drawdown_episodes(prices)
+        print(f"{years}y hourly ({n} bars, {len(found['depth'])} episodes)")
+        _report("underwater_curve", lambda: underwater_curve(prices), 200)
+        _report("drawdown_episodes + top 10", lambda: top_drawdown_episodes(drawdown_episodes(prices), 10), 100)
+        _report("episode scan (Python loop)", lambda: _episodes_loop(prices), 5)
+        _report("worst drawdown only (previous)", lambda: _worst_drawdown_previous(prices), 5)
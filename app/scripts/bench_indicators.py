@@ -0,0 +1,71 @@
+"""
+Microbenchmark: the NumPy indicator engine on multi-year hourly arrays, against
+pandas (ewm/rolling) and plain Python loops for the recursive indicators.
+
+    python -m app.scripts.bench_indicators
+"""
+import timeit
+import numpy as np
+import pandas as pd
+from app.services import indicators
+
+# Regular US session: 7 hourly bars per trading day, 252 trading days per year
+BARS_PER_YEAR = 7 * 252
+YEARS = (2, 5, 10)
+
+
+def _synthetic_bars(n: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    spread = np.abs(rng.normal(0, 0.003, n)) * close
+    return close + spread, close - spread, close
+
+
+def _wilder_rsi_loop(prices: np.ndarray, period: int = 14) -> list:
+    deltas = np.diff(prices).tolist()
+    gain = sum(d for d in deltas[:period] if d > 0) / period
+    loss = -sum(d for d in deltas[:period] if d < 0) / period
+    out = [100.0 - 100.0 / (1.0 + gain / loss) if loss else 100.0]
+    for d in deltas[period:]:
+        gain = (gain * (period - 1) + max(d, 0.0)) / period
+        loss = (loss * (period - 1) + max(-d, 0.0)) / period
+        out.append(100.0 - 100.0 / (1.0 + gain / loss) if loss else 100.0)
+    return out
+
+
+def _pandas_all(high, low, close):
+    s = pd.Series(close)
+    delta = s.diff()
+    up = delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    down = (-delta.clip(upper=0)).ewm(alpha=1 / 14, adjust=False).mean()
+    rsi = 100 - 100 / (1 + up / down)
+    macd = s.ewm(span=12, adjust=False).mean() - s.ewm(span=26, adjust=False).mean()
+    signal = macd.ewm(span=9, adjust=False).mean()
+    middle = s.rolling(20).mean()
+    std = s.rolling(20).std(ddof=0)
+    prev = s.shift()
+    tr = pd.concat([pd.Series(high - low), (pd.Series(high) - prev).abs(), (pd.Series(low) - prev).abs()], axis=1).max(axis=1)
+    atr = tr.ewm(alpha=1 / 14, adjust=False).mean()
+    vol = s.pct_change().rolling(20).std(ddof=0)
+    return rsi, macd, signal, middle + 2 * std, atr, vol
+
+
+def _report(label: str, stmt, number: int):
+    best = min(timeit.repeat(stmt, number=number, repeat=5)) / number
+    print(f"  {label:<36}{best * 1e3:>10.3f} ms")
+
+
+if __name__ == "__main__":
+    names = list(indicators.INDICATORS)
+    for years in YEARS:
+        n = years * BARS_PER_YEAR
+        high, low, close = _synthetic_bars(n)
+        print(f"{years}y hourly ({n} bars)")
+        _report("ema(span=20)", lambda: indicators.ema(close, 20), 200)
+        _report("pandas ewm(span=20)", lambda: pd.Series(close).ewm(span=20, adjust=False).mean(), 200)
+        _report("rsi (Wilder)", lambda: indicators.rsi(close), 200)
+        _report("rsi (Python loop)", lambda: _wilder_rsi_loop(close), 5)
+        _report("bollinger_bands", lambda: indicators.bollinger_bands(close), 200)
+        _report("atr", lambda: indicators.atr(high, low, close), 200)
+        _report("compute_indicators (all six)", lambda: indicators.compute_indicators(names, close, high, low, close), 50)
+        _report("same set with pandas", lambda: _pandas_all(high, low, close), 20)
@@ -0,0 +1,87 @@
+"""
+Cold start benchmark: how long `import app.main` takes in a fresh interpreter,
+and how long a fresh uvicorn process takes to answer its first request with a 200.
+
+    python -m app.scripts.bench_startup --runs 5
+
+With --max-import-seconds / --max-first-response-seconds it exits non-zero when
+the median exceeds the budget, so it can guard against regressions in CI.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.parent
+# Touches the ticker index, so it only answers once the universe is loaded
+FIRST_REQUEST_PATH = "/available-tickers?starts_with=A"
+
+
+def _import_seconds() -> float:
+    code = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _first_response_seconds(timeout: float) -> float:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}{FIRST_REQUEST_PATH}"
+    env = {**os.environ, "PREFETCH_ENABLED": "false"}
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError, OSError):
+                pass
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+            time.sleep(0.01)
+        raise TimeoutError(f"No 200 from {FIRST_REQUEST_PATH} within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def _report(label: str, samples):
+    print(f"{label:<28}median {statistics.median(samples):>7.3f}s   min {min(samples):>7.3f}s   max {max(samples):>7.3f}s")
+    return statistics.median(samples)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--max-import-seconds", type=float)
+    parser.add_argument("--max-first-response-seconds", type=float)
+    args = parser.parse_args()
+
+    import_median = _report("import app.main", [_import_seconds() for _ in range(args.runs)])
+    first_median = _report("process start -> first 200", [_first_response_seconds(args.timeout) for _ in range(args.runs)])
+
+    failed = False
+    if args.max_import_seconds is not None and import_median > args.max_import_seconds:
+        print(f"import time over budget ({args.max_import_seconds}s)")
+        failed = True
+    if args.max_first_response_seconds is not None and first_median > args.max_first_response_seconds:
+        print(f"time to first response over budget ({args.max_first_response_seconds}s)")
+        failed = True
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,37 @@
+"""
+Microbenchmark: symbol validation against the in-memory ticker index versus
+reading the stock_symbols table on every call (the previous behaviour).
+
+    python -m app.scripts.bench_ticker_index
+"""
+import sqlite3
+import timeit
+from pathlib import Path
+from app.helpers.guards import validate_symbol
+from app.services.ticker_index import get_ticker_index, reload_ticker_index
+
+DB_FILE = Path(__file__).parent.parent / 'database.db'
+
+
+def _validate_from_table(symbol: str):
+    conn = sqlite3.connect(str(DB_FILE))
+    c = conn.cursor()
+    c.execute('SELECT symbol FROM stock_symbols')
+    allowed = set(row[0] for row in c.fetchall())
+    conn.close()
+    return symbol in allowed
+
+
+def _report(label: str, stmt, number: int):
+    best = min(timeit.repeat(stmt, number=number, repeat=5)) / number
+    print(f"{label:<40}{best * 1e6:>12.2f} us/call")
+
+
+if __name__ == "__main__":
+    reload_ticker_index()
+    index = get_ticker_index()
+    print(f"{len(index)} symbols in the universe")
+    _report("table scan per call (old)", lambda: _validate_from_table("MSFT"), 200)
+    _report("validate_symbol (index)", lambda: validate_symbol("MSFT"), 200_000)
+    _report("index.prefix('MS', 20)", lambda: index.prefix("MS", 20), 200_000)
+    _report("reload_ticker_index()", reload_ticker_index, 200)
@@ -0,0 +1,84 @@
+"""
+Typeahead benchmark for /ticker-search: replays every keystroke of a set of
+queries (symbols, company names, sectors and industries, some with typos)
+against the search index over the full stock_symbols universe, and reports
+per-keystroke latency percentiles.
+
+    python -m app.scripts.bench_ticker_search [--repeat 20] [--budget-ms 2.0]
+
+Exits non-zero when the p99 exceeds the budget.
+"""
+import argparse
+import random
+import sys
+import time
+from app.services.ticker_index import get_ticker_index, reload_ticker_index
+
+# Hand-written queries: plain names, typos, multi word, sectors
+QUERIES = (
+    "apple", "appel", "microsoft", "micro soft", "nvidia", "nvdia", "alphabet", "goog",
+    "berkshire hathaway", "brk.b", "jp morgan", "johnson & johnson", "jonson", "exxon mobil",
+    "coca cola", "semiconductor", "semiconducter", "health care equipment", "banks",
+    "oil gas", "software", "reit", "utilities", "consumer staples", "airlines",
+)
+# Generated queries per run, sampled from the universe itself
+SAMPLED_NAMES = 100
+SAMPLED_SYMBOLS = 100
+
+
+def _keystrokes(query: str):
+    return [query[:i] for i in range(1, len(query) + 1)]
+
+
+def _percentile(sorted_values, p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))]
+
+
+def _measure(search, queries, repeat: int, limit: int):
+    latencies = []
+    for _ in range(repeat):
+        for query in queries:
+            for prefix in _keystrokes(query):
+                started = time.perf_counter()
+                search(prefix, limit)
+                latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return latencies
+
+
+def _report(label: str, latencies) -> float:
+    p99 = _percentile(latencies, 0.99) * 1e3
+    print(
+        f"{label:<22}{len(latencies):>8} keystrokes  "
+        f"p50 {_percentile(latencies, 0.5) * 1e3:>7.3f} ms  "
+        f"p99 {p99:>7.3f} ms  max {latencies[-1] * 1e3:>7.3f} ms"
+    )
+    return p99
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=2.0, help="Maximum p99 latency per keystroke.")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    reload_ticker_index()
+    index = get_ticker_index()
+    print(f"{len(index)} symbols, index built in {(time.perf_counter() - started) * 1e3:.1f} ms")
+
+    rng = random.Random(7)
+    symbols = list(index.symbols)
+    names = [index.names[symbol].lower() for symbol in rng.sample(symbols, min(SAMPLED_NAMES, len(symbols)))]
+    tickers = [symbol.lower() for symbol in rng.sample(symbols, min(SAMPLED_SYMBOLS, len(symbols)))]
+
+    search = index.search.search
+    worst = max(
+        _report("hand-written queries", _measure(search, QUERIES, args.repeat, args.limit)),
+        _report("company names", _measure(search, names, args.repeat, args.limit)),
+        _report("symbols", _measure(search, tickers, args.repeat, args.limit)),
+    )
+    if worst > args.budget_ms:
+        print(f"p99 {worst:.3f} ms exceeds the {args.budget_ms} ms budget")
+        sys.exit(1)
@@ -1,12 +1,12 @@
 import csv
-import sqlite3
 from pathlib import Path
+from app.db import DB_FILE, get_db_connection
 from app.services.logging_service import LoggingService
+from app.services.ticker_index import reload_ticker_index
 logger = LoggingService.get_logger(__name__)
 
 
-def create_db(db_path: str):
-    conn = sqlite3.connect(db_path)
+def create_db(conn):
     c = conn.cursor()
     c.execute('''
         CREATE TABLE IF NOT EXISTS stock_symbols (
@@ -18,11 +18,8 @@ def create_db(db_path: str):
         )
     ''')
     conn.commit()
-    conn.close()
   
-def insert_symbols_from_csv(db_path: str, csv_path: str):
-    import yfinance as yf
-    conn = sqlite3.connect(db_path)
+def insert_symbols_from_csv(conn, csv_path: str):
     c = conn.cursor()
     with open(csv_path, newline='', encoding='utf-8') as csvfile:
         reader = csv.DictReader(csvfile)
@@ -34,14 +31,14 @@ def insert_symbols_from_csv(db_path: str, csv_path: str):
             if symbol and name:
                 c.execute('INSERT OR IGNORE INTO stock_symbols (symbol, name, sector, industry) VALUES (?, ?, ?, ?)', (symbol, name, sector, industry))
     conn.commit()
-    conn.close()
 
 def initiate_db():
-    db_file = Path(__file__).parent.parent / 'database.db'
-    if not db_file.exists():
-        create_db(str(db_file))
+    if not DB_FILE.exists():
+        conn = get_db_connection()
+        create_db(conn)
         csv_path = Path(__file__).parent / 'stocks.csv'
-        insert_symbols_from_csv(str(db_file), str(csv_path))
-        logger.info(f"Database created at {db_file} with symbols from CSV.")
+        insert_symbols_from_csv(conn, str(csv_path))
+        logger.info(f"Database created at {DB_FILE} with symbols from CSV.")
+        reload_ticker_index()
     else:
         logger.info(f"Database already exists. No action taken.")
\ No newline at end of file
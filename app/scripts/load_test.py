@@ -0,0 +1,85 @@
+"""
+Concurrent mixed-traffic load test against a running backend.
+
+Run it once against the build before a change and once after, then compare the
+per-endpoint latency percentiles:
+
+    python -m app.scripts.load_test --base-url http://127.0.0.1:8000 --concurrency 32 --requests 500
+"""
+import argparse
+import random
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+SYMBOLS = ["AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "JPM", "XOM"]
+
+ENDPOINTS = [
+    ("/prices", "symbol={symbol}&period_months=12&interval=1d"),
+    ("/core-metrics", "symbol={symbol}&period_months=6&interval=1d"),
+    ("/moving-average", "symbol={symbol}&period_months=12&interval=1d&window=50"),
+    ("/drawdown-metrics", "symbol={symbol}&period_months=24&interval=1d"),
+    ("/trend-metrics", "symbol={symbol}"),
+    ("/correlation-metrics", "symbol={symbol}&period_months=6&interval=1d"),
+    ("/sentiment", "symbol={symbol}"),
+    ("/available-tickers", "starts_with={prefix}"),
+    ("/valid-parameter-options", ""),
+]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+def _one_request(base_url: str, timeout: float):
+    path, query = random.choice(ENDPOINTS)
+    symbol = random.choice(SYMBOLS)
+    url = f"{base_url}{path}?{query.format(symbol=symbol, prefix=symbol[0])}"
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except Exception:
+        status = 0
+    return path, status, time.perf_counter() - start
+
+
+def run(base_url: str, concurrency: int, total: int, timeout: float):
+    latencies = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for path, status, elapsed in pool.map(lambda _: _one_request(base_url, timeout), range(total)):
+            latencies[path].append(elapsed)
+            latencies["ALL"].append(elapsed)
+            statuses[path][status] += 1
+    wall = time.perf_counter() - started
+
+    print(f"{total} requests, concurrency {concurrency}, {wall:.2f}s wall, {total / wall:.1f} req/s")
+    print(f"{'endpoint':<26}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  statuses")
+    for path in sorted(latencies, key=lambda p: (p == "ALL", p)):
+        values = latencies[path]
+        print(
+            f"{path:<26}{len(values):>6}"
+            f"{_percentile(values, 50) * 1000:>10.1f}"
+            f"{_percentile(values, 95) * 1000:>10.1f}"
+            f"{_percentile(values, 99) * 1000:>10.1f}"
+            f"  {dict(statuses[path]) if path != 'ALL' else ''}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mixed-traffic load test for the backend.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+    run(args.base_url.rstrip("/"), args.concurrency, args.requests, args.timeout)
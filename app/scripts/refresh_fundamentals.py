@@ -0,0 +1,16 @@
+"""
+Fill the fundamentals store for the whole `stock_symbols` universe, e.g. before
+a first deployment; symbols fetched within the last day are skipped.
+
+    python -m app.scripts.refresh_fundamentals [SYMBOL ...]
+"""
+import sys
+from app.services.fundamentals import refresh_fundamentals
+from app.services.ticker_index import get_ticker_index
+from app.services.upstream import background_calls
+
+if __name__ == "__main__":
+    symbols = sys.argv[1:] or list(get_ticker_index().symbols)
+    with background_calls():
+        refreshed = refresh_fundamentals(symbols)
+    print(f"Refreshed fundamentals for {refreshed} of {len(symbols)} symbols")
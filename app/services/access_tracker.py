@@ -0,0 +1,68 @@
+import math
+import threading
+import time
+from typing import Callable, List, NamedTuple, Tuple
+
+# Popularity halves every 30 minutes without requests
+HALF_LIFE_SECONDS = 30 * 60
+MAX_TRACKED_KEYS = 5000
+
+
+class TrackedRequest(NamedTuple):
+    func: Callable
+    args: Tuple
+    score: float
+    last_seen: float
+    built_at: float
+
+
+class AccessTracker:
+    """
+    Exponentially decayed request counts per response cache key, together with
+    what is needed to recompute the response (controller and its params).
+    """
+
+    def __init__(self, half_life: float = HALF_LIFE_SECONDS, max_keys: int = MAX_TRACKED_KEYS):
+        self._decay = math.log(2) / half_life
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def _decayed(self, score: float, last_seen: float, now: float) -> float:
+        return score * math.exp(-self._decay * (now - last_seen))
+
+    def record(self, key: str, func: Callable, args: Tuple, built: bool = False):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            score = self._decayed(entry.score, entry.last_seen, now) if entry else 0.0
+            built_at = now if built or entry is None else entry.built_at
+            self._entries[key] = TrackedRequest(func, args, score + 1.0, now, built_at)
+            if len(self._entries) > self.max_keys:
+                self._prune(now)
+
+    def mark_built(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                self._entries[key] = entry._replace(built_at=time.time())
+
+    def _prune(self, now: float):
+        # Drop the least popular quarter
+        ranked = sorted(self._entries.items(), key=lambda item: self._decayed(item[1].score, item[1].last_seen, now))
+        for key, _ in ranked[:len(ranked) // 4]:
+            del self._entries[key]
+
+    def most_popular(self, limit: int, min_score: float = 0.0) -> List[Tuple[str, TrackedRequest]]:
+        now = time.time()
+        with self._lock:
+            scored = [
+                (key, entry._replace(score=self._decayed(entry.score, entry.last_seen, now)))
+                for key, entry in self._entries.items()
+            ]
+        scored = [item for item in scored if item[1].score >= min_score]
+        scored.sort(key=lambda item: item[1].score, reverse=True)
+        return scored[:limit]
+
+
+access_tracker = AccessTracker()
@@ -1,56 +1,28 @@
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 import numpy as np
-import pandas as pd
 from app.services.logging_service import LoggingService
-from app.startup.vader_startup import init_vader_sia
-from app.services.financial_data import get_financial_news_for_symbol
+from app.services import news_store
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = LoggingService.get_logger(__name__)
 
 def sentiment_analysis_last24h(symbol: str) -> Dict:
-    
-    vader = init_vader_sia()
-    news = get_financial_news_for_symbol(symbol)
-
-    cleaned_news = []
-    output_summary = []
-
-    now = datetime.now(timezone.utc)
-    one_day_ago = now - timedelta(days=1)
-
-    for i in news:
-        content = i.get("content", {})
-        pubDate_str = content.get("pubDate")
-        if not pubDate_str:
-            continue
-
-        pubDate = datetime.fromisoformat(pubDate_str.replace("Z", "+00:00"))
-        if pubDate < one_day_ago:
-            continue
-
-        summary = content.get("summary", "")
-        if summary:
-            scores = vader.polarity_scores(summary)
-        else:
-            scores = {"neg": 0, "neu": 1, "pos": 0, "compound": 0}
-
-        output_summary.append({
-            "title": content.get("title", "No title"),
-            "summary": summary,
-            "previewUrl": content.get("canonicalUrl", ""),
-            "vader_compound": scores["compound"]
-        })
+    news_store.sync_news(symbol)
+    return summarize_sentiment(news_store.read_articles(symbol, datetime.now(timezone.utc) - timedelta(days=1)))
 
+def summarize_sentiment(articles: List[Dict]) -> Dict:
     mean_compound = (
-        sum(item["vader_compound"] for item in output_summary) / len(output_summary)
-        if output_summary
+        sum(item["vader_compound"] for item in articles) / len(articles)
+        if articles
         else 0.0
     )
 
     return {
         "mean_compound_last_24h": mean_compound,
-        "articles_last_24h": output_summary,
+        "articles_last_24h": articles,
     }
 
 # --- Core Metrics Functions ---
@@ -79,6 +51,143 @@ def calculate_rsi(prices: List[float], period: int = 14) -> Optional[float]:
     return float(rsi)
 
 def calculate_moving_average(prices: List[float], window: int = 20) -> Optional[List[float]]:
-    if not prices or len(prices) < window:
+    if prices is None or len(prices) < window:
         return None
-    return list(pd.Series(prices).rolling(window=window).mean().dropna())
+    return moving_average_array(np.asarray(prices, dtype=float), window).tolist()
+
+def moving_average_array(prices: np.ndarray, window: int = 20) -> np.ndarray:
+    """Simple moving average over a float array, one value per full window (O(n) via cumulative sums)."""
+    cumsum = np.cumsum(np.concatenate(([0.0], prices)))
+    return (cumsum[window:] - cumsum[:-window]) / window
+
+# --- Batch (column-wise) Core Metrics ---
+# Same formulas as above, applied to a (dates x symbols) matrix in one pass.
+# Missing bars are NaN; a column with too little data yields NaN.
+def _ffill_columns(prices: np.ndarray) -> np.ndarray:
+    rows = np.arange(prices.shape[0])[:, None]
+    idx = np.where(np.isnan(prices), 0, rows)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return prices[idx, np.arange(prices.shape[1])]
+
+def calculate_return_matrix(prices: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(prices)
+    cols = np.arange(prices.shape[1])
+    first = prices[valid.argmax(axis=0), cols]
+    last = prices[prices.shape[0] - 1 - valid[::-1].argmax(axis=0), cols]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = (last - first) / first
+    returns[valid.sum(axis=0) < 2] = np.nan
+    return returns
+
+def calculate_volatility_matrix(prices: np.ndarray) -> np.ndarray:
+    if prices.shape[0] < 2:
+        return np.full(prices.shape[1], np.nan)
+    returns = np.diff(prices, axis=0) / prices[:-1]
+    counts = (~np.isnan(returns)).sum(axis=0)
+    with np.errstate(invalid="ignore"):
+        mean = np.nansum(returns, axis=0) / counts
+        volatility = np.sqrt(np.nansum((returns - mean) ** 2, axis=0) / counts)
+    volatility[counts < 1] = np.nan
+    return volatility
+
+def calculate_rsi_matrix(prices: np.ndarray, period: int = 14) -> np.ndarray:
+    if prices.shape[0] < period + 1:
+        return np.full(prices.shape[1], np.nan)
+    window = _ffill_columns(prices)[-(period + 1):]
+    deltas = np.diff(window, axis=0)
+    up = np.where(deltas > 0, deltas, 0).sum(axis=0) / period
+    down = -np.where(deltas < 0, deltas, 0).sum(axis=0) / period
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - (100.0 / (1.0 + up / down))
+    rsi[down == 0] = 100.0
+    rsi[np.isnan(window).any(axis=0)] = np.nan
+    return rsi
+
+# --- Correlation / Beta ---
+def align_closes(closes: "pd.DataFrame", policy: str = "inner") -> "pd.DataFrame":
+    """
+    Align close series (one column per symbol, indexed by bar timestamp) on their timestamps.
+    inner: keep only bars where every symbol traded. ffill: carry the last close over gaps.
+    """
+    if policy == "ffill":
+        closes = closes.ffill()
+    return closes.dropna(how="any")
+
+def calculate_returns_matrix(closes: np.ndarray) -> np.ndarray:
+    return np.diff(closes, axis=0) / closes[:-1]
+
+def calculate_correlation_matrix(returns: np.ndarray) -> Dict[str, np.ndarray]:
+    """Correlation, covariance and beta (beta[i, j] = beta of column i against column j) in one pass."""
+    covariance = np.cov(returns, rowvar=False)
+    variance = np.diag(covariance)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        std = np.sqrt(variance)
+        correlation = covariance / np.outer(std, std)
+        beta = covariance / variance[None, :]
+    return {"correlation": correlation, "covariance": covariance, "beta": beta}
+
+def calculate_own_returns(closes: np.ndarray) -> np.ndarray:
+    """Each column's return against its own previous bar; NaN where the column has no bar."""
+    return closes[1:] / _ffill_columns(closes)[:-1] - 1.0
+
+def calculate_pairwise_correlation_matrix(returns: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Like calculate_correlation_matrix, but every pair only uses the bars where both
+    columns have a return (NaN elsewhere), so an entry does not depend on which
+    other columns are in the matrix. Also returns the observation count per pair.
+    """
+    present = (~np.isnan(returns)).astype(float)
+    values = np.nan_to_num(returns)
+    count = present.T @ present
+    # sums[i, j]: sum of column i over the bars where column j is present too
+    sums = values.T @ present
+    squares = (values ** 2).T @ present
+    products = values.T @ values
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = (products - sums * sums.T / count) / (count - 1)
+        variance = (squares - sums ** 2 / count) / (count - 1)
+        correlation = covariance / np.sqrt(variance * variance.T)
+        beta = covariance / variance.T
+    covariance[count < 2] = np.nan
+    return {"correlation": correlation, "covariance": covariance, "beta": beta, "observations": count.astype(np.int64)}
+
+# --- Drawdowns ---
+def underwater_curve(prices: np.ndarray) -> np.ndarray:
+    """Fractional distance below the running peak at every bar (0 at a new high, negative below it)."""
+    running_max = np.maximum.accumulate(prices)
+    return prices / running_max - 1.0
+
+def drawdown_episodes(prices: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Every peak -> trough -> recovery episode in one vectorized pass, as parallel
+    arrays of bar indices ordered by time. An episode starts at the last bar at
+    its peak and recovers at the first bar back at that peak; recovery is -1
+    while the episode is still open. The trough is the first bar at the
+    episode's deepest point.
+    """
+    underwater = underwater_curve(prices)
+    below = underwater < 0
+    edges = np.diff(below.astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if not len(starts):
+        empty = np.empty(0, dtype=np.int64)
+        return {"underwater": underwater, "peak": empty, "trough": empty, "recovery": empty, "depth": np.empty(0)}
+
+    depth = np.minimum.reduceat(underwater, starts)
+    # The segment of each bar below water, used to find the first bar at each segment's minimum
+    segment = np.cumsum(edges[:-1] == 1) - 1
+    at_depth = np.flatnonzero(below & (underwater == depth[segment]))
+    _, first = np.unique(segment[at_depth], return_index=True)
+    recovery = np.where(ends < len(prices), ends, -1)
+    return {
+        "underwater": underwater,
+        "peak": starts - 1,
+        "trough": at_depth[first],
+        "recovery": recovery,
+        "depth": depth,
+    }
+
+def top_drawdown_episodes(episodes: Dict[str, np.ndarray], count: int) -> np.ndarray:
+    """Indices of the `count` deepest episodes, deepest first (earlier episode first on ties)."""
+    return np.argsort(episodes["depth"], kind="stable")[:count]
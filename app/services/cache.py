@@ -1,34 +1,371 @@
+import contextvars
+import os
 import threading
 import time
-from typing import Any, Optional
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+import orjson
+from app.services.logging_service import LoggingService
+
+logger = LoggingService.get_logger(__name__)
+
+# L2 is enabled when REDIS_URL is set; without it the cache stays process local
+CACHE_L2_ENABLED = os.getenv("CACHE_L2_ENABLED", "true" if os.getenv("REDIS_URL") else "false").lower() == "true"
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "findash:")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "20000"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+CACHE_SWEEP_INTERVAL_SECONDS = int(os.getenv("CACHE_SWEEP_INTERVAL_SECONDS", "60"))
+# A data cache entry is fresh for its namespace's soft TTL. get_cache treats it as a miss
+# after that, get_cache_entry hands it out as stale until the hard TTL removes it.
+CACHE_SOFT_TTL = int(os.getenv("CACHE_SOFT_TTL", "600"))
+CACHE_HARD_TTL = int(os.getenv("CACHE_HARD_TTL", "3600"))
+NEGATIVE_CACHE_TTL = 120
+# Stored for lookups that legitimately have no data, so they are not refetched on every request
+NEGATIVE_RESULT = {"__negative__": True}
+# After a Redis error, L2 is skipped for this many seconds instead of timing out on every request
+L2_RETRY_AFTER_SECONDS = 30
+
+
+class NamespacePolicy(NamedTuple):
+    soft_ttl: int
+    hard_ttl: int
+
+
+DEFAULT_NAMESPACE_POLICY = NamespacePolicy(CACHE_SOFT_TTL, CACHE_HARD_TTL)
+
+# Per key namespace (the prefix before the first ':'); anything not listed uses DEFAULT_NAMESPACE_POLICY
+NAMESPACE_POLICIES: Dict[str, NamespacePolicy] = {
+    "sentiment": NamespacePolicy(300, 1800),
+    "sentimenttrend": NamespacePolicy(300, 1800),
+    "recommendations": NamespacePolicy(3600, 24 * 3600),
+}
+
+
+def load_policy_overrides(env_var: str, policies: Dict[str, NamedTuple], default: NamedTuple):
+    """
+    Apply a JSON object of {name: {field: value}} from env_var to policies. Invalid
+    JSON, unknown fields and non-integer values are logged and skipped instead of
+    failing at import.
+    """
+    raw = os.getenv(env_var)
+    if not raw:
+        return
+    try:
+        overrides = orjson.loads(raw)
+    except orjson.JSONDecodeError as e:
+        logger.error(f"Ignoring {env_var}, not valid JSON: {e}")
+        return
+    if not isinstance(overrides, dict):
+        logger.error(f"Ignoring {env_var}, expected a JSON object")
+        return
+    for name, fields in overrides.items():
+        if not isinstance(fields, dict):
+            logger.error(f"Ignoring {env_var} entry for {name}, expected an object of fields")
+            continue
+        valid = {}
+        for field, value in fields.items():
+            if field not in default._fields:
+                logger.error(f"Ignoring unknown field '{field}' for {name} in {env_var}; valid fields: {', '.join(default._fields)}")
+            elif not isinstance(value, int) or isinstance(value, bool) or value < 0:
+                logger.error(f"Ignoring {field}={value!r} for {name} in {env_var}, expected seconds as a non-negative integer")
+            else:
+                valid[field] = value
+        policies[name] = policies.get(name, default)._replace(**valid)
+
+
+# CACHE_NAMESPACE_POLICIES='{"coremetrics": {"soft_ttl": 120}}'
+load_policy_overrides("CACHE_NAMESPACE_POLICIES", NAMESPACE_POLICIES, DEFAULT_NAMESPACE_POLICY)
+
+
+def namespace_policy(key: str) -> NamespacePolicy:
+    return NAMESPACE_POLICIES.get(key.split(":", 1)[0], DEFAULT_NAMESPACE_POLICY)
+
+
+class CacheStats:
+    """Per-namespace counters, the namespace is the key prefix before the first ':'."""
+
+    FIELDS = ("hits", "stale_hits", "misses", "l2_hits", "evictions", "expirations")
 
-class InMemoryCache:
     def __init__(self):
-        self._cache = {}
         self._lock = threading.Lock()
+        self._counters = {}
+
+    def record(self, key: str, event: str, count: int = 1):
+        namespace = key.split(":", 1)[0]
+        with self._lock:
+            counters = self._counters.get(namespace)
+            if counters is None:
+                counters = self._counters[namespace] = dict.fromkeys(self.FIELDS, 0)
+            counters[event] += count
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {namespace: dict(counters) for namespace, counters in self._counters.items()}
+
+
+class InMemoryCache:
+    """
+    LRU/TTL cache bounded by entry count and (approximate) serialized size.
+
+    Expired entries are dropped on read and by a background sweeper, so keys that
+    are never read again do not pile up.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES, stats: Optional[CacheStats] = None):
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = stats or CacheStats()
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop_sweeper = threading.Event()
 
     def get(self, key: str) -> Optional[Any]:
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        """(value, seconds until it expires or None) for a live entry."""
         with self._lock:
             entry = self._cache.get(key)
             if entry:
-                value, expires_at = entry
-                if expires_at is None or expires_at > time.time():
-                    return value
+                value, expires_at, size = entry
+                now = time.time()
+                if expires_at is None or expires_at > now:
+                    self._cache.move_to_end(key)
+                    return value, expires_at - now if expires_at is not None else None
                 else:
                     # Expired
-                    del self._cache[key]
+                    self._remove(key)
+                    self.stats.record(key, "expirations")
             return None
 
-    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, size: Optional[int] = None):
+        if size is None:
+            size = len(_serialize(value))
         with self._lock:
             expires_at = time.time() + ttl if ttl else None
-            self._cache[key] = (value, expires_at)
+            if key in self._cache:
+                self._remove(key)
+            self._cache[key] = (value, expires_at, size)
+            self._bytes += size
+            self._evict()
+
+    def _remove(self, key: str):
+        _, _, size = self._cache.pop(key)
+        self._bytes -= size
+
+    def _evict(self):
+        # Least recently used entries go first; the newest entry is always kept
+        while len(self._cache) > 1 and (len(self._cache) > self.max_entries or self._bytes > self.max_bytes):
+            key, (_, _, size) = self._cache.popitem(last=False)
+            self._bytes -= size
+            self.stats.record(key, "evictions")
+
+    def sweep(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (_, expires_at, _) in self._cache.items() if expires_at is not None and expires_at <= now]
+            for key in expired:
+                self._remove(key)
+                self.stats.record(key, "expirations")
+        return len(expired)
+
+    def start_sweeper(self, interval: float = CACHE_SWEEP_INTERVAL_SECONDS):
+        if self._sweeper is not None:
+            return
+        self._stop_sweeper.clear()
+
+        def run():
+            while not self._stop_sweeper.wait(interval):
+                removed = self.sweep()
+                if removed:
+                    logger.info(f"Cache sweeper removed {removed} expired entries")
+
+        self._sweeper = threading.Thread(target=run, name="cache-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self, timeout: float = 5.0):
+        sweeper = self._sweeper
+        if sweeper is None:
+            return
+        self._stop_sweeper.set()
+        sweeper.join(timeout)
+        if sweeper.is_alive():
+            # Still mid-sweep: keep the handle, so start_sweeper cannot run a second sweeper next to it
+            logger.warning(f"Cache sweeper did not stop within {timeout}s")
+            return
+        self._sweeper = None
+
+    def usage(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._cache),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def _serialize(value: Any) -> bytes:
+    """
+    Cached values must be JSON data: dicts, lists, strings, numbers, booleans and None.
+    NumPy numbers and arrays are written as numbers and lists, and non-string keys as strings,
+    which is also how they read back from L2. Anything else raises TypeError here, at set
+    time, instead of coming back from Redis as a different type than L1 holds.
+    """
+    return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+class TwoTierCache:
+    """
+    In-process L1 in front of a shared Redis L2.
+
+    Reads fall through to Redis on an L1 miss and fill L1 with the remaining
+    Redis TTL, so both tiers expire together. Writes go to both tiers.
+    """
+
+    def __init__(self, l1: InMemoryCache, l2=None, prefix: str = CACHE_KEY_PREFIX):
+        self.l1 = l1
+        self.l2 = l2
+        self.prefix = prefix
+        self._l2_down_until = 0.0
+
+    def _l2_available(self) -> bool:
+        return self.l2 is not None and time.monotonic() >= self._l2_down_until
+
+    def _l2_failed(self, e: Exception):
+        logger.warning(f"Redis cache unavailable, using in-memory cache only for {L2_RETRY_AFTER_SECONDS}s: {e}")
+        self._l2_down_until = time.monotonic() + L2_RETRY_AFTER_SECONDS
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.l1.stats
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.get_entry(key)
+        self.stats.record(key, "hits" if entry else "misses")
+        return entry[0] if entry else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        """(value, seconds until it expires or None) from L1, else from L2; records L2 hits only."""
+        entry = self.l1.get_entry(key)
+        if entry is not None:
+            return entry
+        entry = self._get_l2(key)
+        if entry is not None:
+            self.stats.record(key, "l2_hits")
+        return entry
+
+    def _get_l2(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        if not self._l2_available():
+            return None
+        try:
+            pipe = self.l2.pipeline(transaction=False)
+            pipe.get(self.prefix + key)
+            pipe.pttl(self.prefix + key)
+            raw, pttl = pipe.execute()
+        except Exception as e:
+            self._l2_failed(e)
+            return None
+        if raw is None:
+            return None
+        value = orjson.loads(raw)
+        ttl = pttl / 1000 if pttl and pttl > 0 else None
+        self.l1.set(key, value, ttl, size=len(raw))
+        return value, ttl
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        raw = _serialize(value)
+        self.l1.set(key, value, ttl, size=len(raw))
+        if not self._l2_available():
+            return
+        try:
+            self.l2.set(self.prefix + key, raw, ex=ttl or None)
+        except Exception as e:
+            self._l2_failed(e)
+
+
+def _default_l2():
+    if not CACHE_L2_ENABLED:
+        return None
+    from app.utils.redis_client import redis_client
+    return redis_client
+
 
 # Singleton instance
-cache = InMemoryCache()
+cache = TwoTierCache(InMemoryCache(), _default_l2())
+
+
+def configure_l2(client):
+    """Swap the L2 client, e.g. for a fakeredis instance in tests. Pass None for L1 only."""
+    cache.l2 = client
+    cache._l2_down_until = 0.0
+
+
+_bypass_reads = contextvars.ContextVar("cache_bypass_reads", default=False)
+
+
+@contextmanager
+def cache_bypass():
+    """Inside this block every lookup misses, so controllers recompute and overwrite their entries."""
+    token = _bypass_reads.set(True)
+    try:
+        yield
+    finally:
+        _bypass_reads.reset(token)
+
+
+def _stale_window(key: str) -> int:
+    policy = namespace_policy(key)
+    return max(0, policy.hard_ttl - policy.soft_ttl)
+
+
+def _lookup(key: str) -> Tuple[Optional[Any], bool]:
+    entry = cache.get_entry(key)
+    if entry is None:
+        return None, False
+    value, remaining = entry
+    # Negative results keep their own short TTL and are never stale
+    return value, remaining is not None and remaining <= _stale_window(key) and not is_negative(value)
+
+
+def get_cache_entry(key: str) -> Tuple[Optional[Any], bool]:
+    """
+    (value, stale). A stale value is past its soft TTL but within its hard TTL;
+    the caller can use it and start a refresh. (None, False) on a miss.
+    """
+    if _bypass_reads.get():
+        return None, False
+    value, stale = _lookup(key)
+    cache.stats.record(key, "misses" if value is None else "stale_hits" if stale else "hits")
+    return value, stale
+
 
 def get_cache(key: str):
-    return cache.get(key)
+    """The value while it is fresh, None once it is past its soft TTL."""
+    if _bypass_reads.get():
+        return None
+    value, stale = _lookup(key)
+    value = None if stale else value
+    cache.stats.record(key, "misses" if value is None else "hits")
+    return value
+
+
+def set_cache(key: str, value: Any, ttl: Optional[int] = None):
+    """Store a value fresh for ttl seconds (default: the namespace's soft TTL), then stale until the hard TTL."""
+    cache.set(key, value, (ttl or namespace_policy(key).soft_ttl) + _stale_window(key))
+
+
+def set_negative_cache(key: str, ttl: Optional[int] = NEGATIVE_CACHE_TTL):
+    cache.set(key, NEGATIVE_RESULT, ttl)
+
+
+def is_negative(value: Any) -> bool:
+    return value == NEGATIVE_RESULT
+
 
-def set_cache(key: str, value: Any, ttl: Optional[int] = 600):
-    cache.set(key, value, ttl)
+def get_cache_stats() -> Dict[str, Any]:
+    return {"l1": cache.l1.usage(), "namespaces": cache.stats.snapshot()}
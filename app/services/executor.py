@@ -0,0 +1,71 @@
+import asyncio
+import contextvars
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict
+from app.services.logging_service import LoggingService
+
+logger = LoggingService.get_logger(__name__)
+
+# Blocking I/O (yfinance HTTP, SQLite) mostly waits, so this pool can be wide.
+IO_POOL_WORKERS = int(os.getenv("IO_POOL_WORKERS", "32"))
+# NumPy releases the GIL inside its array kernels, so analysis threads overlap there, but the
+# Python glue around them does not; more threads than cores only adds contention. Pure-Python
+# work (VADER) gets no parallelism from threads: large batches go to the sentiment process pool.
+CPU_POOL_WORKERS = int(os.getenv("CPU_POOL_WORKERS", str(os.cpu_count() or 2)))
+# Per-symbol upstream calls started from inside a controller. Kept apart from the I/O pool,
+# whose threads would otherwise block waiting on work queued behind themselves.
+FANOUT_POOL_WORKERS = int(os.getenv("FANOUT_POOL_WORKERS", "16"))
+
+_io_pool = ThreadPoolExecutor(max_workers=IO_POOL_WORKERS, thread_name_prefix="io-worker")
+_cpu_pool = ThreadPoolExecutor(max_workers=CPU_POOL_WORKERS, thread_name_prefix="cpu-worker")
+_fanout_pool = ThreadPoolExecutor(max_workers=FANOUT_POOL_WORKERS, thread_name_prefix="fanout-worker")
+
+
+async def run_io(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking controller/service call on the I/O pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(_io_pool, partial(ctx.run, func, *args, **kwargs))
+
+
+async def run_cpu(func: Callable, *args, **kwargs) -> Any:
+    """Run CPU heavy analysis on the CPU pool from async code."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(_cpu_pool, partial(ctx.run, func, *args, **kwargs))
+
+
+def submit_io(func: Callable, *args, **kwargs) -> Future:
+    """Start a blocking call on the I/O pool without waiting for it, e.g. a background refresh."""
+    ctx = contextvars.copy_context()
+    return _io_pool.submit(ctx.run, func, *args, **kwargs)
+
+
+def run_cpu_bound(func: Callable, *args, **kwargs) -> Any:
+    """Run CPU heavy analysis on the CPU pool from a worker thread and wait for the result."""
+    return _cpu_pool.submit(func, *args, **kwargs).result()
+
+
+def submit_io_bound(func: Callable, *args, **kwargs) -> Future:
+    """Start a blocking call on the fan-out pool from a worker thread, so several can run concurrently."""
+    ctx = contextvars.copy_context()
+    return _fanout_pool.submit(ctx.run, func, *args, **kwargs)
+
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    """Configured workers, started threads and queued (not yet started) tasks per pool."""
+    pools = {"io": _io_pool, "cpu": _cpu_pool, "fanout": _fanout_pool}
+    return {
+        name: {"max_workers": pool._max_workers, "threads": len(pool._threads), "queued": pool._work_queue.qsize()}
+        for name, pool in pools.items()
+    }
+
+
+def shutdown_pools(wait: bool = False):
+    """Cancel queued tasks; with wait, also block until the running ones finish."""
+    logger.info("Shutting down worker pools")
+    _io_pool.shutdown(wait=wait, cancel_futures=True)
+    _cpu_pool.shutdown(wait=wait, cancel_futures=True)
+    _fanout_pool.shutdown(wait=wait, cancel_futures=True)
@@ -1,58 +1,77 @@
-import yfinance as yf
+from datetime import datetime
 from typing import List, Dict
+from app.services import price_store
+from app.services.fundamentals import get_fundamentals
+from app.services.price_store import OhlcSeries, PriceSeries
+from app.services.singleflight import coalesced
+from app.services.upstream import gateway
 from app.services.logging_service import LoggingService
 
 logger = LoggingService.get_logger(__name__)
 
+@coalesced("news")
 def get_financial_news_for_symbol(symbol: str) -> Dict:
 
     logger.info(f"getting the {symbol} symbol")
+    import yfinance as yf
     ticker = yf.Ticker(symbol)
     logger.info(f"got the {symbol} symbol")
 
     logger.info(f"fetching the news for the {symbol} symbol")
-    news = ticker.news
+    news = gateway.call("news", lambda: ticker.news, fallback_key=symbol)
     logger.info(f"got the news for the {symbol} symbol")
     
     return news
 
+@coalesced("recommendations")
 def get_recomendations_for_symbol(symbol: str) -> Dict:
     
     logger.info(f"getting the {symbol} symbol")
+    import yfinance as yf
     ticker = yf.Ticker(symbol)
     logger.info(f"got the {symbol} symbol")
 
     logger.info(f"fetching the recommedations for the {symbol} symbol")
-    recommendations = ticker.recommendations
+    recommendations = gateway.call("recommendations", lambda: ticker.recommendations, fallback_key=symbol)
     logger.info(f"got the recommedations for the {symbol} symbol")
     
     return recommendations
 
-def get_close_prices_for_symbol(symbol: str, period: str = "1mo", interval: str = "1d") -> List[dict]:
+@coalesced("prices")
+def get_close_series_for_symbol(symbol: str, period: str = "1mo", interval: str = "1d") -> PriceSeries:
     
     logger.info(f"Fetching close prices for {symbol}, period={period}, interval={interval}")
-    ticker = yf.Ticker(symbol)
-    hist = ticker.history(period=period, interval=interval)
+    series = price_store.get_close_series(symbol, period, interval)
     logger.info(f"Got close prices for {symbol}")
 
-    if hist.empty or 'Close' not in hist:
+    if not len(series.prices):
         logger.warning(f"No close price data found for {symbol}")
-        return []
-    
-    hist = hist.reset_index()
-    
+    return series
+
+def get_close_prices_for_symbol(symbol: str, period: str = "1mo", interval: str = "1d") -> List[dict]:
+    series = get_close_series_for_symbol(symbol, period, interval)
     return [
-        {"date": str(row["Date"])[:10], "price": float(row["Close"])}
-        for _, row in hist.iterrows()
+        {"date": date, "price": price}
+        for date, price in zip(series.dates(), series.prices.tolist())
     ]
 
+def get_ohlc_series_for_symbol(symbol: str, start: datetime, interval: str = "1d") -> OhlcSeries:
+    logger.info(f"Fetching OHLC bars for {symbol} from {start.date()}, interval={interval}")
+    price_store.sync_series(symbol, interval, start)
+    return price_store.read_ohlc_series(symbol, interval, start)
+
+def get_close_matrix_for_symbols(symbols: List[str], start: datetime, interval: str = "1d"):
+    """Closes for many symbols as a (bar timestamp x symbol) DataFrame, fetched with one bulk download."""
+    logger.info(f"Fetching close matrix for {len(symbols)} symbols from {start.date()}, interval={interval}")
+    price_store.sync_many(symbols, interval, start)
+    return price_store.read_close_matrix(symbols, interval, start)
+
 def get_pe_ratio_for_symbol(symbol: str):
     logger.info(f"Fetching P/E ratio for {symbol}")
-    ticker = yf.Ticker(symbol)
     try:
-        pe_ratio = ticker.info.get("trailingPE")
+        pe_ratio = get_fundamentals(symbol).get("trailingPE")
         logger.info(f"Got P/E ratio for {symbol}: {pe_ratio}")
         return pe_ratio
     except Exception as e:
         logger.warning(f"Failed to fetch P/E ratio for {symbol}: {e}")
-        return None
\ No newline at end of file
+        return None
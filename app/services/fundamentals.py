@@ -0,0 +1,148 @@
+"""
+Yahoo's `ticker.info` per symbol, fetched at most once a day.
+
+Reads go memory -> SQLite -> upstream. The `fundamentals` table keeps every
+symbol's last info dict, so after an upstream failure the previous day's data
+is served instead of an error. /company-about, /company-info and the P/E in
+/core-metrics all read from here.
+"""
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+from app.db import db_write_lock as _write_lock, get_db_connection
+from app.services.cache import InMemoryCache, cache
+from app.services.logging_service import LoggingService
+from app.services.singleflight import upstream_flights
+from app.services.upstream import UpstreamUnavailable, gateway
+
+logger = LoggingService.get_logger(__name__)
+
+FUNDAMENTALS_TTL_SECONDS = int(os.getenv("FUNDAMENTALS_TTL_SECONDS", str(24 * 3600)))
+# The daily job refreshes rows older than this. It runs every 24h, so with the full TTL as the
+# cutoff the rows it wrote a few seconds after yesterday's run would still count as fresh.
+FUNDAMENTALS_SCHEDULED_MAX_AGE_SECONDS = max(0, FUNDAMENTALS_TTL_SECONDS - 2 * 3600)
+FUNDAMENTALS_MEMORY_MAX_ENTRIES = int(os.getenv("FUNDAMENTALS_MEMORY_MAX_ENTRIES", "2000"))
+
+# Parsed info dicts for the hottest symbols; entries expire with their SQLite row
+fundamentals_memory = InMemoryCache(FUNDAMENTALS_MEMORY_MAX_ENTRIES, 64 * 1024 * 1024, stats=cache.stats)
+
+_schema_ready = False
+
+
+def create_fundamentals_table(conn):
+    c = conn.cursor()
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS fundamentals (
+            symbol TEXT PRIMARY KEY,
+            info TEXT NOT NULL,
+            fetched_at INTEGER NOT NULL
+        )
+    ''')
+    conn.commit()
+
+
+def _ensure_schema(conn):
+    global _schema_ready
+    if not _schema_ready:
+        with _write_lock:
+            create_fundamentals_table(conn)
+        _schema_ready = True
+
+
+def _read_row(symbol: str) -> Optional[Tuple[Dict, int]]:
+    conn = get_db_connection()
+    _ensure_schema(conn)
+    c = conn.cursor()
+    c.execute("SELECT info, fetched_at FROM fundamentals WHERE symbol = ?", (symbol,))
+    row = c.fetchone()
+    return (json.loads(row[0]), row[1]) if row else None
+
+
+def _write_row(symbol: str, info: Dict, fetched_at: int):
+    conn = get_db_connection()
+    with _write_lock:
+        _ensure_schema(conn)
+        conn.execute(
+            "INSERT OR REPLACE INTO fundamentals (symbol, info, fetched_at) VALUES (?, ?, ?)",
+            (symbol, json.dumps(info, default=str), fetched_at)
+        )
+        conn.commit()
+
+
+def _remember(symbol: str, info: Dict, fetched_at: int):
+    ttl = max(1, fetched_at + FUNDAMENTALS_TTL_SECONDS - int(time.time()))
+    fundamentals_memory.set(f"fundamentals:{symbol}", info, ttl)
+
+
+def _fetch_info(symbol: str) -> Dict:
+    import yfinance as yf
+    logger.info(f"Fetching fundamentals for {symbol}")
+    return gateway.call("info", lambda: yf.Ticker(symbol).info) or {}
+
+
+def _refresh(symbol: str, stored: Optional[Tuple[Dict, int]]) -> Dict:
+    try:
+        info = _fetch_info(symbol)
+    except Exception as e:
+        if stored is None:
+            raise
+        logger.warning(f"Fundamentals refresh for {symbol} failed, serving data from {time.ctime(stored[1])}: {e}")
+        return stored[0]
+    # Kept as JSON data, so a fresh fetch reads the same as one loaded from the database
+    info = json.loads(json.dumps(info, default=str))
+    fetched_at = int(time.time())
+    _write_row(symbol, info, fetched_at)
+    _remember(symbol, info, fetched_at)
+    return info
+
+
+def get_fundamentals(symbol: str) -> Dict:
+    """The info dict for symbol, at most FUNDAMENTALS_TTL_SECONDS old when upstream is reachable; {} when Yahoo has none."""
+    key = f"fundamentals:{symbol}"
+    info = fundamentals_memory.get(key)
+    if info is not None:
+        cache.stats.record(key, "hits")
+        return info
+    cache.stats.record(key, "misses")
+    stored = _read_row(symbol)
+    if stored is not None and time.time() - stored[1] < FUNDAMENTALS_TTL_SECONDS:
+        _remember(symbol, *stored)
+        return stored[0]
+    # Concurrent misses for the same symbol share one upstream call
+    return upstream_flights.do(("fundamentals", symbol), _refresh, symbol, stored)
+
+
+def stale_symbols(symbols: List[str], max_age: int = FUNDAMENTALS_TTL_SECONDS) -> List[str]:
+    """Symbols with no stored info or info older than max_age seconds."""
+    conn = get_db_connection()
+    cutoff = int(time.time()) - max_age
+    _ensure_schema(conn)
+    c = conn.cursor()
+    c.execute("SELECT symbol FROM fundamentals WHERE fetched_at > ?", (cutoff,))
+    fresh = {row[0] for row in c.fetchall()}
+    return [symbol for symbol in symbols if symbol not in fresh]
+
+
+def refresh_fundamentals(symbols: List[str], spacing: float = 0.0, max_age: int = FUNDAMENTALS_TTL_SECONDS) -> int:
+    """
+    Fetch info for every symbol older than max_age, one upstream call each (Yahoo has no bulk
+    info endpoint); the gateway's rate limit paces the calls. Returns how many
+    were refreshed.
+    """
+    stale = stale_symbols(symbols, max_age)
+    logger.info(f"Refreshing fundamentals for {len(stale)} of {len(symbols)} symbols")
+    refreshed = 0
+    for symbol in stale:
+        try:
+            upstream_flights.do(("fundamentals", symbol), _refresh, symbol, None)
+            refreshed += 1
+        except UpstreamUnavailable as e:
+            # Breaker open or rate limit exhausted: the rest would fail the same way
+            logger.warning(f"Fundamentals refresh stopped after {refreshed} symbols: {e.detail}")
+            break
+        except Exception as e:
+            logger.warning(f"Fundamentals refresh for {symbol} failed: {e}")
+        if spacing:
+            time.sleep(spacing)
+    return refreshed
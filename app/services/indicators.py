@@ -0,0 +1,160 @@
+"""
+Technical indicators as O(n) NumPy passes over a single series.
+
+Every function returns arrays aligned with its input (one value per bar). Bars
+before an indicator has enough history are NaN.
+"""
+import math
+from typing import Dict, Iterable
+import numpy as np
+
+# Largest decay (1 - alpha) ** k kept within one block of the EMA filter, so the
+# block-wise closed form below never under- or overflows a float64
+_MAX_DECAY_EXPONENT = 300 * math.log(10)
+
+INDICATORS = ("ema", "rsi", "macd", "bb", "atr", "vol")
+
+
+def ema_filter(values: np.ndarray, alpha: float, initial: float) -> np.ndarray:
+    """
+    y[t] = alpha * x[t] + (1 - alpha) * y[t - 1], with y[-1] = initial.
+
+    The recursion is solved in closed form per block of bars,
+    y[t] = d^(t+1) * (initial + sum_k<=t alpha * x[k] / d^(k+1)), with d = 1 - alpha,
+    which turns it into a cumulative sum. Blocks are sized so d^-k stays finite.
+    """
+    values = np.asarray(values, dtype=float)
+    out = np.empty_like(values)
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[:] = values
+        return out
+    block = max(1, int(_MAX_DECAY_EXPONENT / -math.log(decay)) // 2)
+    state = initial
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        powers = decay ** np.arange(1, len(chunk) + 1)
+        out[start:start + len(chunk)] = powers * (state + np.cumsum(alpha * chunk / powers))
+        state = out[start + len(chunk) - 1]
+    return out
+
+
+def ema(prices: np.ndarray, span: int) -> np.ndarray:
+    """Exponential moving average with alpha = 2 / (span + 1), seeded with the first price."""
+    prices = np.asarray(prices, dtype=float)
+    if len(prices) == 0:
+        return prices.copy()
+    out = ema_filter(prices[1:], 2.0 / (span + 1), prices[0])
+    return np.concatenate(([prices[0]], out))
+
+
+def _wilder(values: np.ndarray, period: int) -> np.ndarray:
+    # Seeded with the simple mean of the first `period` values, then smoothed with alpha = 1 / period
+    out = np.full(len(values), np.nan)
+    if len(values) < period:
+        return out
+    seed = values[:period].mean()
+    out[period - 1] = seed
+    out[period:] = ema_filter(values[period:], 1.0 / period, seed)
+    return out
+
+
+def rsi(prices: np.ndarray, period: int = 14) -> np.ndarray:
+    """Wilder RSI over the whole series."""
+    prices = np.asarray(prices, dtype=float)
+    out = np.full(len(prices), np.nan)
+    if len(prices) < period + 1:
+        return out
+    deltas = np.diff(prices)
+    up = _wilder(np.where(deltas > 0, deltas, 0.0), period)
+    down = _wilder(np.where(deltas < 0, -deltas, 0.0), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = 100.0 - 100.0 / (1.0 + up / down)
+    values[down == 0] = 100.0
+    out[1:] = values
+    out[:period] = np.nan
+    return out
+
+
+def macd(prices: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, np.ndarray]:
+    line = ema(prices, fast) - ema(prices, slow)
+    signal_line = ema(line, signal)
+    return {"macd": line, "signal": signal_line, "histogram": line - signal_line}
+
+
+def _rolling_mean_std(values: np.ndarray, window: int):
+    # Windowed sums from cumulative sums; shifting by the first value keeps the variance well conditioned
+    mean = np.full(len(values), np.nan)
+    std = np.full(len(values), np.nan)
+    if len(values) < window:
+        return mean, std
+    shifted = values - values[0]
+    cumsum = np.cumsum(np.concatenate(([0.0], shifted)))
+    cumsq = np.cumsum(np.concatenate(([0.0], shifted * shifted)))
+    window_mean = (cumsum[window:] - cumsum[:-window]) / window
+    window_var = (cumsq[window:] - cumsq[:-window]) / window - window_mean ** 2
+    mean[window - 1:] = window_mean + values[0]
+    std[window - 1:] = np.sqrt(np.maximum(window_var, 0.0))
+    return mean, std
+
+
+def bollinger_bands(prices: np.ndarray, window: int = 20, num_std: float = 2.0) -> Dict[str, np.ndarray]:
+    middle, std = _rolling_mean_std(np.asarray(prices, dtype=float), window)
+    return {"middle": middle, "upper": middle + num_std * std, "lower": middle - num_std * std}
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Average true range with Wilder smoothing."""
+    high, low, close = (np.asarray(a, dtype=float) for a in (high, low, close))
+    out = np.full(len(close), np.nan)
+    if len(close) < period + 1:
+        return out
+    prev_close = close[:-1]
+    true_range = np.maximum.reduce([
+        high[1:] - low[1:],
+        np.abs(high[1:] - prev_close),
+        np.abs(low[1:] - prev_close),
+    ])
+    out[1:] = _wilder(true_range, period)
+    return out
+
+
+def rolling_volatility(prices: np.ndarray, window: int = 20) -> np.ndarray:
+    """Standard deviation of simple returns over the trailing `window` returns."""
+    prices = np.asarray(prices, dtype=float)
+    out = np.full(len(prices), np.nan)
+    if len(prices) < window + 1:
+        return out
+    returns = np.diff(prices) / prices[:-1]
+    _, out[1:] = _rolling_mean_std(returns, window)
+    return out
+
+
+def compute_indicators(
+    names: Iterable[str], open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+    rsi_period: int = 14, ema_span: int = 20, window: int = 20,
+) -> Dict[str, Dict[str, np.ndarray]]:
+    """Every requested indicator over one OHLC series, as named lines per indicator."""
+    result = {}
+    for name in names:
+        if name == "ema":
+            result[name] = {"ema": ema(close, ema_span)}
+        elif name == "rsi":
+            result[name] = {"rsi": rsi(close, rsi_period)}
+        elif name == "macd":
+            result[name] = macd(close)
+        elif name == "bb":
+            result[name] = bollinger_bands(close, window)
+        elif name == "atr":
+            result[name] = {"atr": atr(high, low, close)}
+        elif name == "vol":
+            result[name] = {"volatility": rolling_volatility(close, window)}
+        else:
+            raise ValueError(f"Unknown indicator: {name}")
+    return result
+
+
+def warmup_bars(names: Iterable[str], rsi_period: int = 14, ema_span: int = 20, window: int = 20) -> int:
+    """Extra history needed before the first returned bar so the smoothed indicators have settled."""
+    needed = {"ema": 3 * ema_span, "rsi": 3 * rsi_period, "macd": 3 * 26 + 9, "bb": window, "atr": 3 * 14, "vol": window + 1}
+    return max((needed[name] for name in names), default=0)
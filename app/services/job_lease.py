@@ -0,0 +1,59 @@
+"""
+Leases on scheduled jobs, kept in the shared SQLite database.
+
+Every worker process runs the same scheduler, so a cron job fires once per
+process. The first process to claim a job's lease runs it; the others find the
+lease held and skip that run. Leases are not released when the job finishes, so
+a process whose trigger fires a little late does not run the job a second time.
+"""
+import os
+import socket
+import time
+from app.db import db_write_lock as _write_lock, get_db_connection
+from app.services.logging_service import LoggingService
+
+logger = LoggingService.get_logger(__name__)
+
+# This process, as recorded in the lease table
+HOLDER = f"{socket.gethostname()}:{os.getpid()}"
+
+_schema_ready = False
+
+
+def create_job_lease_table(conn):
+    c = conn.cursor()
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS job_leases (
+            job TEXT PRIMARY KEY,
+            holder TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        )
+    ''')
+    conn.commit()
+
+
+def _ensure_schema(conn):
+    global _schema_ready
+    if not _schema_ready:
+        with _write_lock:
+            create_job_lease_table(conn)
+        _schema_ready = True
+
+
+def claim_lease(job: str, seconds: float, holder: str = HOLDER) -> bool:
+    """Take the lease on job for the next `seconds` unless another holder has an unexpired one."""
+    conn = get_db_connection()
+    _ensure_schema(conn)
+    now = time.time()
+    with _write_lock:
+        # One statement, so two processes claiming at once cannot both win
+        cursor = conn.execute(
+            """
+            INSERT INTO job_leases (job, holder, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT(job) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at
+            WHERE job_leases.expires_at <= ?
+            """,
+            (job, holder, now + seconds, now)
+        )
+        conn.commit()
+    return cursor.rowcount == 1
@@ -0,0 +1,209 @@
+"""
+Append-only metric state per (symbol, interval), checkpointed to SQLite.
+
+A checkpoint covers every stored bar except the newest one. The newest bar can
+still be revised, because the price store re-fetches it until the next bar
+appears. A request therefore reads only the bars after the checkpoint, folds
+all but the newest into the state in O(1) each, and applies the newest bar to a
+copy. Rebuilding from the full series is only needed when the state is
+anchored at a window start and that start has moved past the first bar.
+"""
+import json
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+import numpy as np
+from app.db import db_write_lock as _write_lock, get_db_connection
+from app.services import price_store
+from app.services.logging_service import LoggingService
+
+logger = LoggingService.get_logger(__name__)
+
+_schema_ready = False
+
+
+def create_metric_state_table(conn):
+    c = conn.cursor()
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS metric_state (
+            symbol TEXT NOT NULL,
+            interval TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            anchor_ts INTEGER,
+            last_ts INTEGER NOT NULL,
+            state TEXT NOT NULL,
+            updated_at INTEGER NOT NULL,
+            PRIMARY KEY (symbol, interval, kind)
+        )
+    ''')
+    conn.commit()
+
+
+def _ensure_schema(conn):
+    global _schema_ready
+    if not _schema_ready:
+        with _write_lock:
+            create_metric_state_table(conn)
+        _schema_ready = True
+
+
+@dataclass
+class DrawdownState:
+    """Running peak, deepest drawdown and its trough/recovery markers (bar indices from the anchor)."""
+    count: int
+    peak: float
+    max_drawdown: float
+    trough_idx: int
+    trough_peak: float
+    recovery_idx: Optional[int]
+
+    @classmethod
+    def from_prices(cls, prices: np.ndarray) -> "DrawdownState":
+        running_max = np.maximum.accumulate(prices)
+        drawdowns = (prices - running_max) / running_max
+        trough_idx = int(np.argmin(drawdowns))
+        trough_peak = float(running_max[trough_idx])
+        recovered = np.flatnonzero(prices[trough_idx:] >= trough_peak)
+        return cls(
+            count=len(prices),
+            peak=float(running_max[-1]),
+            max_drawdown=float(drawdowns[trough_idx]),
+            trough_idx=trough_idx,
+            trough_peak=trough_peak,
+            recovery_idx=trough_idx + int(recovered[0]) if len(recovered) else None,
+        )
+
+    def update(self, price: float):
+        idx = self.count
+        self.count += 1
+        self.peak = max(self.peak, price)
+        drawdown = (price - self.peak) / self.peak
+        if drawdown < self.max_drawdown:
+            self.max_drawdown = drawdown
+            self.trough_idx = idx
+            self.trough_peak = self.peak
+            self.recovery_idx = None
+        elif self.recovery_idx is None and price >= self.trough_peak:
+            self.recovery_idx = idx
+
+    @property
+    def recovery_bars(self) -> Optional[int]:
+        return self.recovery_idx - self.trough_idx if self.recovery_idx is not None else None
+
+
+@dataclass
+class RollingWindowState:
+    """The last `size` closes and their running sum."""
+    size: int
+    closes: deque = field(default_factory=deque)
+    total: float = 0.0
+
+    @classmethod
+    def from_prices(cls, prices: np.ndarray, size: int) -> "RollingWindowState":
+        tail = prices[-size:].tolist()
+        return cls(size, deque(tail), float(sum(tail)))
+
+    def update(self, price: float):
+        if len(self.closes) == self.size:
+            self.total -= self.closes.popleft()
+        self.closes.append(price)
+        self.total += price
+
+
+def _load(symbol: str, interval: str, kind: str) -> Optional[Tuple[Optional[int], int, dict]]:
+    conn = get_db_connection()
+    _ensure_schema(conn)
+    c = conn.cursor()
+    c.execute(
+        "SELECT anchor_ts, last_ts, state FROM metric_state WHERE symbol = ? AND interval = ? AND kind = ?",
+        (symbol, interval, kind)
+    )
+    row = c.fetchone()
+    return (row[0], row[1], json.loads(row[2])) if row else None
+
+
+def _save(symbol: str, interval: str, kind: str, anchor_ts: Optional[int], last_ts: int, state: dict):
+    conn = get_db_connection()
+    with _write_lock:
+        _ensure_schema(conn)
+        conn.execute(
+            "INSERT OR REPLACE INTO metric_state (symbol, interval, kind, anchor_ts, last_ts, state, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (symbol, interval, kind, anchor_ts, last_ts, json.dumps(state), int(time.time()))
+        )
+        conn.commit()
+
+
+def _discard(symbol: str, interval: str):
+    """Drop every checkpoint of a series whose history was replaced; the next request rebuilds it."""
+    conn = get_db_connection()
+    with _write_lock:
+        _ensure_schema(conn)
+        conn.execute("DELETE FROM metric_state WHERE symbol = ? AND interval = ?", (symbol, interval))
+        conn.commit()
+    logger.info(f"Discarded metric state for {symbol} ({interval})")
+
+
+price_store.on_history_rewritten(_discard)
+
+
+def _bars_after(symbol: str, interval: str, last_ts: int) -> List[Tuple[int, float]]:
+    return price_store.read_bars(symbol, interval, datetime.fromtimestamp(last_ts + 1, timezone.utc))
+
+
+def drawdown_state(symbol: str, interval: str, start: datetime, kind: str) -> Optional[DrawdownState]:
+    """Drawdown state over the stored bars since `start`, including the newest bar; None with fewer than 2 bars."""
+    price_store.sync_series(symbol, interval, start)
+    anchor_ts = price_store.first_bar_ts(symbol, interval, start)
+    if anchor_ts is None:
+        return None
+    saved = _load(symbol, interval, kind)
+    bars = _bars_after(symbol, interval, saved[1]) if saved and saved[0] == anchor_ts else None
+    if not bars:
+        series = price_store.read_close_series(symbol, interval, start)
+        if len(series.prices) < 2:
+            return None
+        state = DrawdownState.from_prices(series.prices[:-1])
+        last_ts, newest = int(series.timestamps[-2]), float(series.prices[-1])
+        logger.info(f"Rebuilt {kind} state for {symbol} ({interval}) from {len(series.prices)} bars")
+    else:
+        _, last_ts, fields = saved
+        state = DrawdownState(**fields)
+        for ts, close in bars[:-1]:
+            state.update(close)
+            last_ts = ts
+        newest = bars[-1][1]
+    if not saved or (saved[0], saved[1]) != (anchor_ts, last_ts):
+        _save(symbol, interval, kind, anchor_ts, last_ts, asdict(state))
+    state.update(newest)
+    return state
+
+
+def rolling_window_state(symbol: str, interval: str, size: int, lookback_start: datetime) -> Optional[RollingWindowState]:
+    """
+    The last `size` closes including the newest bar. `lookback_start` must be far
+    enough back to hold `size` bars; None when the store has fewer.
+    """
+    price_store.sync_series(symbol, interval, lookback_start)
+    kind = f"rolling:{size}"
+    saved = _load(symbol, interval, kind)
+    bars = _bars_after(symbol, interval, saved[1]) if saved else None
+    if not bars:
+        series = price_store.read_close_series(symbol, interval, lookback_start)
+        if len(series.prices) < size + 1:
+            return None
+        state = RollingWindowState.from_prices(series.prices[:-1], size)
+        last_ts, newest = int(series.timestamps[-2]), float(series.prices[-1])
+    else:
+        _, last_ts, fields = saved
+        state = RollingWindowState(size, deque(fields["closes"]), fields["total"])
+        for ts, close in bars[:-1]:
+            state.update(close)
+            last_ts = ts
+        newest = bars[-1][1]
+    if not saved or saved[1] != last_ts:
+        _save(symbol, interval, kind, None, last_ts, {"closes": list(state.closes), "total": state.total})
+    state.update(newest)
+    return state
@@ -0,0 +1,199 @@
+"""
+Process metrics in the Prometheus text exposition format.
+
+Hot paths only touch plain counters under an uncontended lock. Everything that
+already keeps its own counters (cache stats, the upstream gateway, worker
+pools) is read by collectors at scrape time instead of being instrumented.
+"""
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRIC_PREFIX = "findash_"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# A sample is (name suffix, labels, value); a family is (name, type, help, samples)
+Sample = Tuple[str, Dict[str, str], float]
+Family = Tuple[str, str, str, List[Sample]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def collect(self) -> Family:
+        with self._lock:
+            samples = [("_total", dict(zip(self.labelnames, key)), value) for key, value in self._values.items()]
+        return self.name, "counter", self.help, samples
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: one non-cumulative count per bucket plus +Inf, and the running sum
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def time(self, *labelvalues: str) -> "_Timer":
+        return _Timer(self, labelvalues)
+
+    def collect(self) -> Family:
+        with self._lock:
+            snapshot = [(key, list(counts), total) for key, (counts, total) in self._series.items()]
+        samples = []
+        for key, counts, total in snapshot:
+            labels = dict(zip(self.labelnames, key))
+            samples.extend(histogram_samples(labels, self.buckets, counts, total))
+        return self.name, "histogram", self.help, samples
+
+
+def histogram_samples(labels: Dict[str, str], buckets: Sequence[float], counts: Sequence[int], total: float) -> List[Sample]:
+    """Bucket/sum/count samples from per-bucket counts; `counts` may omit the +Inf overflow bucket."""
+    samples = []
+    cumulative = 0
+    for bound, count in zip(buckets, counts):
+        cumulative += count
+        samples.append(("_bucket", {**labels, "le": _format_value(float(bound))}, cumulative))
+    cumulative += sum(counts[len(buckets):])
+    samples.append(("_bucket", {**labels, "le": "+Inf"}, cumulative))
+    samples.append(("_sum", labels, total))
+    samples.append(("_count", labels, cumulative))
+    return samples
+
+
+class _Timer:
+    __slots__ = ("histogram", "labelvalues", "started")
+
+    def __init__(self, histogram: Histogram, labelvalues: tuple):
+        self.histogram = histogram
+        self.labelvalues = labelvalues
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labelvalues)
+
+
+class Registry:
+    def __init__(self, prefix: str = METRIC_PREFIX):
+        self.prefix = prefix
+        self._metrics: List = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(self.prefix + name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(self.prefix + name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[Family]]):
+        """Register a callable returning (unprefixed name, type, help, samples) families at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        families = [metric.collect() for metric in self._metrics]
+        for collector in self._collectors:
+            families.extend((self.prefix + name, kind, help, samples) for name, kind, help, samples in collector())
+        lines = []
+        for name, kind, help, samples in families:
+            # In the 0.0.4 format HELP/TYPE must name the samples, and counter samples end in _total
+            # (prometheus_client does the same); otherwise counters are ingested as untyped
+            meta_name = f"{name}_total" if kind == "counter" else name
+            lines.append(f"# HELP {meta_name} {help}")
+            lines.append(f"# TYPE {meta_name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Time to serve a request, by route template.", ("route", "method")
+)
+http_requests = registry.counter(
+    "http_requests", "Requests served, by route template and status code.", ("route", "method", "status")
+)
+sentiment_scoring_duration = registry.histogram(
+    "sentiment_scoring_seconds", "VADER scoring time per batch of uncached texts, by where it ran.", ("mode",)
+)
+sentiment_texts_scored = registry.counter(
+    "sentiment_texts_scored", "Texts scored by VADER (memoized scores excluded), by where it ran.", ("mode",)
+)
+
+# Streams stay open for minutes, their duration says nothing about latency
+UNTIMED_ROUTES = frozenset({"/stream/prices"})
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware timing every HTTP request under its route template, e.g. /core-metrics."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            # Unmatched paths share one label so scanners cannot blow up the series count
+            path = route.path if route is not None else "unmatched"
+            if path not in UNTIMED_ROUTES:
+                http_request_duration.observe(time.perf_counter() - started, path, scope["method"])
+            http_requests.inc(path, scope["method"], str(status))
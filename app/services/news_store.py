@@ -0,0 +1,190 @@
+import json
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from app.db import db_write_lock as _write_lock, get_db_connection
+from app.services.financial_data import get_financial_news_for_symbol
+from app.services.logging_service import LoggingService
+from app.services.sentiment_scoring import score_texts
+from app.services.singleflight import upstream_flights
+
+logger = LoggingService.get_logger(__name__)
+
+# Upstream news is re-checked after this long; in between the store answers on its own
+NEWS_REFRESH_AFTER_SECONDS = 5 * 60
+
+_schema_ready = False
+
+
+def create_news_tables(conn):
+    c = conn.cursor()
+    # An article syndicated across tickers is stored (and scored) once, linked to every symbol
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS news_articles (
+            article_id TEXT PRIMARY KEY,
+            published_at INTEGER NOT NULL,
+            title TEXT,
+            summary TEXT,
+            preview_url TEXT,
+            compound REAL NOT NULL
+        )
+    ''')
+    _migrate_news_symbols(c)
+    # One row per (symbol, article); a re-fetch with a revised pubDate moves the row instead of adding one
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS news_symbols (
+            symbol TEXT NOT NULL,
+            article_id TEXT NOT NULL,
+            published_at INTEGER NOT NULL,
+            PRIMARY KEY (symbol, article_id)
+        ) WITHOUT ROWID
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_news_symbols_published ON news_symbols (symbol, published_at)")
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS news_sync_meta (
+            symbol TEXT PRIMARY KEY,
+            fetched_at INTEGER NOT NULL
+        )
+    ''')
+    conn.commit()
+
+
+def _migrate_news_symbols(c):
+    """Rebuild a news_symbols table that still includes published_at in its key, keeping each article's latest date."""
+    pk = [row[1] for row in sorted(c.execute("PRAGMA table_info(news_symbols)").fetchall(), key=lambda row: row[5]) if row[5]]
+    if "published_at" not in pk:
+        return
+    logger.info("Re-keying news_symbols on (symbol, article_id)")
+    c.execute("ALTER TABLE news_symbols RENAME TO news_symbols_old")
+    c.execute('''
+        CREATE TABLE news_symbols (
+            symbol TEXT NOT NULL,
+            article_id TEXT NOT NULL,
+            published_at INTEGER NOT NULL,
+            PRIMARY KEY (symbol, article_id)
+        ) WITHOUT ROWID
+    ''')
+    c.execute(
+        "INSERT INTO news_symbols (symbol, article_id, published_at) "
+        "SELECT symbol, article_id, MAX(published_at) FROM news_symbols_old GROUP BY symbol, article_id"
+    )
+    c.execute("DROP TABLE news_symbols_old")
+
+
+def _ensure_schema(conn):
+    global _schema_ready
+    if not _schema_ready:
+        with _write_lock:
+            create_news_tables(conn)
+        _schema_ready = True
+
+
+def _parse_article(item: Dict) -> Optional[Tuple]:
+    content = item.get("content", {})
+    pubDate_str = content.get("pubDate")
+    if not pubDate_str:
+        return None
+    canonical_url = content.get("canonicalUrl", "")
+    article_id = item.get("id") or content.get("id") or (canonical_url.get("url") if isinstance(canonical_url, dict) else canonical_url)
+    if not article_id:
+        return None
+    published_at = int(datetime.fromisoformat(pubDate_str.replace("Z", "+00:00")).timestamp())
+    return (article_id, published_at, content.get("title", "No title"), content.get("summary", ""), json.dumps(canonical_url))
+
+
+def ingest_news(news_by_symbol: Dict[str, List[Dict]]):
+    """Store fetched news, scoring only articles that are not in the store yet."""
+    parsed = {symbol: [a for a in map(_parse_article, news) if a] for symbol, news in news_by_symbol.items()}
+    articles = {article[0]: article for news in parsed.values() for article in news}
+    conn = get_db_connection()
+    _ensure_schema(conn)
+    c = conn.cursor()
+    ids = list(articles)
+    seen = set()
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        c.execute(f"SELECT article_id FROM news_articles WHERE article_id IN ({','.join('?' for _ in chunk)})", chunk)
+        seen.update(row[0] for row in c.fetchall())
+
+    unseen = [article for article_id, article in articles.items() if article_id not in seen]
+    compounds = score_texts([article[3] for article in unseen])
+    now = int(time.time())
+    with _write_lock:
+        c = conn.cursor()
+        c.executemany(
+            "INSERT OR IGNORE INTO news_articles (article_id, published_at, title, summary, preview_url, compound) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(*article, compound) for article, compound in zip(unseen, compounds)]
+        )
+        # Articles already stored keep their score but take the latest pubDate
+        c.executemany(
+            "UPDATE news_articles SET published_at = ? WHERE article_id = ? AND published_at != ?",
+            [(articles[article_id][1], article_id, articles[article_id][1]) for article_id in seen]
+        )
+        c.executemany(
+            "INSERT INTO news_symbols (symbol, article_id, published_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (symbol, article_id) DO UPDATE SET published_at = excluded.published_at",
+            [(symbol, article[0], article[1]) for symbol, news in parsed.items() for article in news]
+        )
+        c.executemany(
+            "INSERT OR REPLACE INTO news_sync_meta (symbol, fetched_at) VALUES (?, ?)",
+            [(symbol, now) for symbol in parsed]
+        )
+        conn.commit()
+    if unseen:
+        logger.info(f"Stored {len(unseen)} new articles for {len(parsed)} symbols")
+
+
+def stale_symbols(symbols: List[str]) -> List[str]:
+    """Symbols whose news has not been fetched within NEWS_REFRESH_AFTER_SECONDS."""
+    conn = get_db_connection()
+    cutoff = int(time.time()) - NEWS_REFRESH_AFTER_SECONDS
+    placeholders = ",".join("?" for _ in symbols)
+    _ensure_schema(conn)
+    c = conn.cursor()
+    c.execute(f"SELECT symbol FROM news_sync_meta WHERE symbol IN ({placeholders}) AND fetched_at > ?", (*symbols, cutoff))
+    fresh = {row[0] for row in c.fetchall()}
+    return [symbol for symbol in symbols if symbol not in fresh]
+
+
+def _sync_news(symbol: str):
+    if stale_symbols([symbol]):
+        ingest_news({symbol: get_financial_news_for_symbol(symbol)})
+
+
+def sync_news(symbol: str):
+    """Make sure the store holds the current upstream news for symbol."""
+    upstream_flights.do(("news-store", symbol), _sync_news, symbol)
+
+
+def read_articles(symbol: str, since: datetime) -> List[Dict]:
+    """Stored articles for symbol published since `since`, newest first."""
+    conn = get_db_connection()
+    _ensure_schema(conn)
+    c = conn.cursor()
+    c.execute('''
+        SELECT a.title, a.summary, a.preview_url, a.compound
+        FROM news_symbols s JOIN news_articles a ON a.article_id = s.article_id
+        WHERE s.symbol = ? AND s.published_at >= ?
+        ORDER BY s.published_at DESC
+    ''', (symbol, int(since.timestamp())))
+    rows = c.fetchall()
+    return [
+        {"title": title, "summary": summary, "previewUrl": json.loads(preview_url), "vader_compound": compound}
+        for title, summary, preview_url, compound in rows
+    ]
+
+
+def read_sentiment_buckets(symbol: str, since: datetime, bucket_seconds: int) -> List[Tuple[int, int, float]]:
+    """(bucket start, article count, mean compound) per bucket that has articles, oldest first."""
+    conn = get_db_connection()
+    _ensure_schema(conn)
+    c = conn.cursor()
+    c.execute('''
+        SELECT s.published_at / ? * ? AS bucket, COUNT(*), AVG(a.compound)
+        FROM news_symbols s JOIN news_articles a ON a.article_id = s.article_id
+        WHERE s.symbol = ? AND s.published_at >= ?
+        GROUP BY bucket
+        ORDER BY bucket ASC
+    ''', (bucket_seconds, bucket_seconds, symbol, int(since.timestamp())))
+    return c.fetchall()
@@ -0,0 +1,115 @@
+import os
+import time
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
+from fastapi import HTTPException
+from app.services import price_store
+from app.services.fundamentals import FUNDAMENTALS_SCHEDULED_MAX_AGE_SECONDS, refresh_fundamentals
+from app.services.job_lease import claim_lease
+from app.services.access_tracker import access_tracker
+from app.services.logging_service import LoggingService
+from app.services.response_cache import policy_for, refresh_response
+from app.services.ticker_index import get_ticker_index
+from app.services.upstream import background_calls
+
+logger = LoggingService.get_logger(__name__)
+
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "true").lower() == "true"
+PREFETCH_TICK_SECONDS = int(os.getenv("PREFETCH_TICK_SECONDS", "30"))
+# Upper bound on refreshes per tick and the pause between them, to stay under upstream rate limits
+PREFETCH_MAX_PER_TICK = int(os.getenv("PREFETCH_MAX_PER_TICK", "20"))
+PREFETCH_SPACING_SECONDS = float(os.getenv("PREFETCH_SPACING_SECONDS", "0.5"))
+# Keys below this decayed request count are left to expire
+PREFETCH_MIN_SCORE = float(os.getenv("PREFETCH_MIN_SCORE", "2"))
+# Refresh once an entry has used this fraction of its soft TTL
+PREFETCH_REFRESH_AT = 0.8
+EOD_REFRESH_MONTHS = int(os.getenv("EOD_REFRESH_MONTHS", "12"))
+EOD_BATCH_SIZE = 100
+# The daily jobs run in one process only: the first to claim the lease. Longer than a run, shorter than a day.
+DAILY_JOB_LEASE_SECONDS = 6 * 3600
+
+_scheduler = None
+
+
+def refresh_popular():
+    """Refresh the most requested responses that are about to expire, most popular first."""
+    now = time.time()
+    due = [
+        (key, entry) for key, entry in access_tracker.most_popular(limit=10 * PREFETCH_MAX_PER_TICK, min_score=PREFETCH_MIN_SCORE)
+        if now - entry.built_at >= policy_for(key).soft_ttl * PREFETCH_REFRESH_AT
+    ][:PREFETCH_MAX_PER_TICK]
+    for key, entry in due:
+        try:
+            refresh_response(key, entry.func, *entry.args)
+        except HTTPException as e:
+            logger.info(f"Prefetch of {key} skipped: {e.detail}")
+        except Exception as e:
+            logger.warning(f"Prefetch of {key} failed: {e}")
+        time.sleep(PREFETCH_SPACING_SECONDS)
+    if due:
+        logger.info(f"Prefetched {len(due)} popular responses")
+
+
+def refresh_end_of_day():
+    """Pull the final daily bar for the whole ticker universe in bulk downloads."""
+    symbols = list(get_ticker_index().symbols)
+    start = price_store.period_start(f"{EOD_REFRESH_MONTHS}mo")
+    logger.info(f"End-of-day refresh for {len(symbols)} symbols")
+    for i in range(0, len(symbols), EOD_BATCH_SIZE):
+        chunk = symbols[i:i + EOD_BATCH_SIZE]
+        try:
+            with background_calls():
+                price_store.sync_many(chunk, "1d", start, force=True)
+        except Exception as e:
+            logger.warning(f"End-of-day refresh failed for {chunk[0]}..{chunk[-1]}: {e}")
+        time.sleep(PREFETCH_SPACING_SECONDS)
+
+
+def refresh_fundamentals_universe():
+    """Fetch company info for every symbol whose stored copy predates the previous run."""
+    with background_calls():
+        refreshed = refresh_fundamentals(
+            list(get_ticker_index().symbols), spacing=PREFETCH_SPACING_SECONDS, max_age=FUNDAMENTALS_SCHEDULED_MAX_AGE_SECONDS
+        )
+    logger.info(f"Refreshed fundamentals for {refreshed} symbols")
+
+
+def _once_across_processes(job: str, func):
+    """Wrap a daily job so only the process holding its lease runs it."""
+    def run():
+        if not claim_lease(job, DAILY_JOB_LEASE_SECONDS):
+            logger.info(f"Skipping {job}: another process holds its lease")
+            return
+        func()
+    return run
+
+
+def start_prefetcher():
+    global _scheduler
+    if not PREFETCH_ENABLED or _scheduler is not None:
+        return
+    scheduler = BackgroundScheduler(job_defaults={"coalesce": True, "max_instances": 1})
+    # Per process: it only rebuilds this process's response_store
+    scheduler.add_job(refresh_popular, "interval", seconds=PREFETCH_TICK_SECONDS, id="refresh_popular")
+    # US markets close at 16:00 New York time; give the final bars a moment to settle
+    scheduler.add_job(
+        _once_across_processes("refresh_end_of_day", refresh_end_of_day),
+        CronTrigger(day_of_week="mon-fri", hour=16, minute=30, timezone="America/New_York"),
+        id="refresh_end_of_day",
+    )
+    # After the end-of-day bars, so market cap and P/E reflect the close
+    scheduler.add_job(
+        _once_across_processes("refresh_fundamentals", refresh_fundamentals_universe),
+        CronTrigger(day_of_week="mon-fri", hour=17, minute=0, timezone="America/New_York"),
+        id="refresh_fundamentals",
+    )
+    scheduler.start()
+    _scheduler = scheduler
+    logger.info("Prefetch scheduler started")
+
+
+def stop_prefetcher():
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.shutdown(wait=False)
+        _scheduler = None
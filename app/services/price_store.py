@@ -0,0 +1,425 @@
+import contextvars
+import re
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from app.db import db_write_lock, get_db_connection
+from app.services.logging_service import LoggingService
+from app.services.singleflight import upstream_flights
+from app.services.upstream import gateway
+
+logger = LoggingService.get_logger(__name__)
+
+# How long a stored series is considered current before the tail is re-fetched.
+# The last bar is always re-fetched, because the running bar changes until close.
+REFRESH_AFTER_SECONDS = {
+    "1h": 5 * 60,
+    "1d": 15 * 60,
+    "1wk": 60 * 60,
+}
+DEFAULT_REFRESH_AFTER_SECONDS = 15 * 60
+# Inside force_tail_refresh() the tail is re-fetched once it is this old. The floor keeps the
+# several responses built on one series (prices, indicators, metrics) to one upstream call.
+FORCED_REFRESH_AFTER_SECONDS = 60
+# Bars are split and dividend adjusted, so Yahoo rescales every past close after a
+# corporate action. A re-fetched closed bar whose close moved by more than this
+# fraction means the stored history is on the old scale and is fetched again.
+ADJUSTMENT_TOLERANCE = 1e-4
+
+class PriceSeries(NamedTuple):
+    """Columnar close series: epoch-second bar timestamps and close prices."""
+    timestamps: np.ndarray
+    prices: np.ndarray
+
+    def dates(self, unit: str = "D") -> List[str]:
+        return np.datetime_as_string(self.timestamps.astype("datetime64[s]"), unit=unit).tolist()
+
+
+class OhlcSeries(NamedTuple):
+    """Columnar OHLC bars, aligned on epoch-second bar timestamps."""
+    timestamps: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+
+    def dates(self, unit: str = "D") -> List[str]:
+        return np.datetime_as_string(self.timestamps.astype("datetime64[s]"), unit=unit).tolist()
+
+
+_PERIOD_RE = re.compile(r"^(\d+)(mo|d|wk|y)$")
+
+_write_lock = db_write_lock
+_schema_ready = False
+# Called with (symbol, interval) after a series' history was replaced
+_rewrite_listeners: List[Callable[[str, str], None]] = []
+_force_tail = contextvars.ContextVar("price_store_force_tail", default=False)
+
+
+@contextmanager
+def force_tail_refresh():
+    """Inside this block a series' tail is re-fetched once it is FORCED_REFRESH_AFTER_SECONDS old."""
+    token = _force_tail.set(True)
+    try:
+        yield
+    finally:
+        _force_tail.reset(token)
+
+
+def _refresh_after(interval: str) -> int:
+    if _force_tail.get():
+        return FORCED_REFRESH_AFTER_SECONDS
+    return REFRESH_AFTER_SECONDS.get(interval, DEFAULT_REFRESH_AFTER_SECONDS)
+
+
+def create_price_tables(conn):
+    c = conn.cursor()
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS price_bars (
+            symbol TEXT NOT NULL,
+            interval TEXT NOT NULL,
+            ts INTEGER NOT NULL,
+            open REAL,
+            high REAL,
+            low REAL,
+            close REAL NOT NULL,
+            volume REAL,
+            PRIMARY KEY (symbol, interval, ts)
+        ) WITHOUT ROWID
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS price_series_meta (
+            symbol TEXT NOT NULL,
+            interval TEXT NOT NULL,
+            covered_from INTEGER NOT NULL,
+            last_ts INTEGER,
+            fetched_at INTEGER NOT NULL,
+            PRIMARY KEY (symbol, interval)
+        )
+    ''')
+    conn.commit()
+
+
+def _ensure_schema(conn):
+    global _schema_ready
+    if not _schema_ready:
+        with _write_lock:
+            create_price_tables(conn)
+        _schema_ready = True
+
+
+def period_start(period: str, now: Optional[datetime] = None) -> datetime:
+    """Translate a yfinance style period ("21d", "3mo", "1y", ...) into a UTC start time."""
+    now = now or datetime.now(timezone.utc)
+    match = _PERIOD_RE.match(period)
+    if not match:
+        raise ValueError(f"Unsupported period: {period}")
+    amount, unit = int(match.group(1)), match.group(2)
+    if unit == "d":
+        return now - timedelta(days=amount)
+    if unit == "wk":
+        return now - timedelta(weeks=amount)
+    months = amount * 12 if unit == "y" else amount
+    year, month = divmod(now.month - 1 - months, 12)
+    year += now.year
+    month += 1
+    # Clamp the day so e.g. 31 March - 1 month lands on the last day of February
+    day = min(now.day, _days_in_month(year, month))
+    return now.replace(year=year, month=month, day=day)
+
+
+def _days_in_month(year: int, month: int) -> int:
+    next_month = datetime(year + month // 12, month % 12 + 1, 1)
+    return (next_month - timedelta(days=1)).day
+
+
+def _fetch_bars(symbol: str, interval: str, start: datetime) -> List[tuple]:
+    import yfinance as yf
+    logger.info(f"Fetching bars for {symbol} from {start.date()}, interval={interval}")
+    hist = gateway.call("history", yf.Ticker(symbol).history, start=start, interval=interval)
+    if hist.empty or 'Close' not in hist:
+        logger.warning(f"No bars returned for {symbol} from {start.date()}")
+        return []
+    logger.info(f"Got {len(hist)} bars for {symbol}")
+    return _frame_to_bars(hist)
+
+
+def _frame_to_bars(hist) -> List[tuple]:
+    hist = hist.dropna(subset=['Close'])
+    index = hist.index
+    if index.tz is None:
+        index = index.tz_localize("America/New_York")
+    return list(zip(
+        (int(ts) for ts in index.as_unit("s").asi8),
+        hist['Open'].tolist(),
+        hist['High'].tolist(),
+        hist['Low'].tolist(),
+        hist['Close'].tolist(),
+        hist['Volume'].tolist(),
+    ))
+
+
+def _fetch_bars_bulk(symbols: List[str], interval: str, start: datetime) -> Dict[str, List[tuple]]:
+    """One upstream download for many symbols."""
+    import yfinance as yf
+    logger.info(f"Bulk fetching bars for {len(symbols)} symbols from {start.date()}, interval={interval}")
+    frame = gateway.call(
+        "download", yf.download, symbols, start=start, interval=interval, group_by="ticker",
+        auto_adjust=True, ignore_tz=False, progress=False, threads=True
+    )
+    bars = {}
+    if frame is None or frame.empty:
+        logger.warning(f"Bulk fetch returned no bars from {start.date()}")
+        return bars
+    for symbol in symbols:
+        if symbol not in frame.columns.get_level_values(0):
+            continue
+        hist = frame[symbol]
+        if 'Close' in hist:
+            bars[symbol] = _frame_to_bars(hist)
+    return bars
+
+
+def _read_meta(conn, symbol: str, interval: str) -> Optional[Tuple[int, Optional[int], int]]:
+    c = conn.cursor()
+    c.execute(
+        "SELECT covered_from, last_ts, fetched_at FROM price_series_meta WHERE symbol = ? AND interval = ?",
+        (symbol, interval)
+    )
+    return c.fetchone()
+
+
+def on_history_rewritten(listener: Callable[[str, str], None]):
+    """Register a callback for series whose stored history was replaced, e.g. to drop derived state."""
+    _rewrite_listeners.append(listener)
+
+
+def store_bars(symbol: str, interval: str, bars: List[tuple], covered_from: int, replace: bool = False):
+    """Upsert bars and move the series bookkeeping forward. With replace, the stored bars are dropped first."""
+    conn = get_db_connection()
+    now = int(time.time())
+    with _write_lock:
+        _ensure_schema(conn)
+        c = conn.cursor()
+        if replace:
+            c.execute("DELETE FROM price_bars WHERE symbol = ? AND interval = ?", (symbol, interval))
+        c.executemany(
+            "INSERT OR REPLACE INTO price_bars (symbol, interval, ts, open, high, low, close, volume) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(symbol, interval, *bar) for bar in bars]
+        )
+        last_ts = max((bar[0] for bar in bars), default=None)
+        c.execute('''
+            INSERT INTO price_series_meta (symbol, interval, covered_from, last_ts, fetched_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(symbol, interval) DO UPDATE SET
+                covered_from = MIN(covered_from, excluded.covered_from),
+                last_ts = MAX(COALESCE(last_ts, excluded.last_ts), COALESCE(excluded.last_ts, last_ts)),
+                fetched_at = excluded.fetched_at
+        ''', (symbol, interval, covered_from, last_ts, now))
+        conn.commit()
+    if replace:
+        for listener in _rewrite_listeners:
+            listener(symbol, interval)
+
+
+def _last_closed_bar(conn, symbol: str, interval: str, last_ts: int) -> Optional[Tuple[int, float]]:
+    """The stored bar before last_ts; unlike the newest bar, its close is final."""
+    c = conn.cursor()
+    c.execute(
+        "SELECT ts, close FROM price_bars WHERE symbol = ? AND interval = ? AND ts < ? ORDER BY ts DESC LIMIT 1",
+        (symbol, interval, last_ts)
+    )
+    return c.fetchone()
+
+
+def _readjusted(anchor: Optional[Tuple[int, float]], bars: List[tuple]) -> bool:
+    """Whether the re-fetched copy of the anchor bar no longer matches its stored close."""
+    if anchor is None:
+        return False
+    anchor_ts, stored_close = anchor
+    for bar in bars:
+        if bar[0] == anchor_ts:
+            return abs(bar[4] - stored_close) > ADJUSTMENT_TOLERANCE * abs(stored_close)
+    return False
+
+
+def sync_series(symbol: str, interval: str, start: datetime):
+    """Make sure the store holds bars for [start, now], fetching only what is missing."""
+    # Concurrent requests for the same series share one upstream fetch
+    key = ("bars", symbol, interval)
+    upstream_flights.do(key, _sync_series, symbol, interval, start)
+    if not _covers(symbol, interval, start):
+        # We joined a fetch for a shorter window, fetch the remainder
+        upstream_flights.do(key, _sync_series, symbol, interval, start)
+
+
+def _covers(symbol: str, interval: str, start: datetime) -> bool:
+    conn = get_db_connection()
+    meta = _read_meta(conn, symbol, interval)
+    return meta is not None and meta[0] <= int(start.timestamp())
+
+
+def _sync_series(symbol: str, interval: str, start: datetime):
+    conn = get_db_connection()
+    start_ts = int(start.timestamp())
+    _ensure_schema(conn)
+    meta = _read_meta(conn, symbol, interval)
+
+    if meta is None or meta[0] > start_ts:
+        # Nothing stored yet, or the request reaches further back than what we have
+        bars = _fetch_bars(symbol, interval, start)
+        store_bars(symbol, interval, bars, start_ts)
+        return
+
+    covered_from, last_ts, fetched_at = meta
+    refresh_after = _refresh_after(interval)
+    if time.time() - fetched_at < refresh_after:
+        return
+    # The tail starts one closed bar back, so the overlap shows whether history was re-adjusted
+    anchor = _last_closed_bar(conn, symbol, interval, last_ts) if last_ts else None
+    tail_start = datetime.fromtimestamp(anchor[0] if anchor else last_ts, timezone.utc) if last_ts else start
+    try:
+        bars = _fetch_bars(symbol, interval, tail_start)
+        if _readjusted(anchor, bars):
+            logger.info(f"Stored {symbol} ({interval}) closes no longer match upstream after a split or dividend, re-fetching history")
+            bars = _fetch_bars(symbol, interval, datetime.fromtimestamp(covered_from, timezone.utc))
+            store_bars(symbol, interval, bars, covered_from, replace=True)
+            return
+    except Exception as e:
+        # The stored series is the last good value; serve it slightly stale rather than failing
+        logger.warning(f"Tail refresh for {symbol} ({interval}) failed, serving stored bars: {e}")
+        return
+    store_bars(symbol, interval, bars, covered_from)
+
+
+def sync_many(symbols: List[str], interval: str, start: datetime, force: bool = False):
+    """
+    Bulk version of sync_series: symbols that need a full window share one
+    download, symbols that only need their tail share another. With force the
+    tail is re-fetched even if the series was refreshed recently.
+    """
+    conn = get_db_connection()
+    start_ts = int(start.timestamp())
+    refresh_after = _refresh_after(interval)
+    full, tails = [], {}
+    _ensure_schema(conn)
+    for symbol in symbols:
+        meta = _read_meta(conn, symbol, interval)
+        if meta is None or meta[0] > start_ts:
+            full.append(symbol)
+        elif force or time.time() - meta[2] >= refresh_after:
+            anchor = _last_closed_bar(conn, symbol, interval, meta[1]) if meta[1] else None
+            tails[symbol] = (meta[0], anchor[0] if anchor else meta[1] or start_ts, anchor)
+
+    if full:
+        fetched = _fetch_bars_bulk(full, interval, start)
+        for symbol in full:
+            store_bars(symbol, interval, fetched.get(symbol, []), start_ts)
+    if tails:
+        tail_start = datetime.fromtimestamp(min(tail_ts for _, tail_ts, _ in tails.values()), timezone.utc)
+        try:
+            fetched = _fetch_bars_bulk(list(tails), interval, tail_start)
+        except Exception as e:
+            logger.warning(f"Bulk tail refresh for {len(tails)} symbols failed, serving stored bars: {e}")
+            return
+        readjusted = {}
+        for symbol, (covered_from, _, anchor) in tails.items():
+            bars = fetched.get(symbol, [])
+            if _readjusted(anchor, bars):
+                readjusted[symbol] = covered_from
+            else:
+                store_bars(symbol, interval, bars, covered_from)
+        if readjusted:
+            logger.info(f"Re-fetching history of {len(readjusted)} symbols re-adjusted after a split or dividend")
+            history_start = datetime.fromtimestamp(min(readjusted.values()), timezone.utc)
+            try:
+                fetched = _fetch_bars_bulk(list(readjusted), interval, history_start)
+            except Exception as e:
+                logger.warning(f"Re-fetching re-adjusted history failed, serving stored bars: {e}")
+                return
+            for symbol, covered_from in readjusted.items():
+                if symbol in fetched:
+                    store_bars(symbol, interval, fetched[symbol], covered_from, replace=True)
+
+
+def read_close_matrix(symbols: List[str], interval: str, start: datetime):
+    """Closes as a DataFrame indexed by bar timestamp, one column per symbol."""
+    import pandas as pd
+    conn = get_db_connection()
+    placeholders = ",".join("?" for _ in symbols)
+    _ensure_schema(conn)
+    c = conn.cursor()
+    c.execute(
+        f"SELECT ts, symbol, close FROM price_bars WHERE interval = ? AND symbol IN ({placeholders}) AND ts >= ?",
+        (interval, *symbols, int(start.timestamp()))
+    )
+    rows = c.fetchall()
+    frame = pd.DataFrame(rows, columns=["ts", "symbol", "close"])
+    matrix = frame.pivot(index="ts", columns="symbol", values="close").sort_index()
+    return matrix.reindex(columns=symbols)
+
+
+def read_bars(symbol: str, interval: str, start: datetime) -> List[Tuple[int, float]]:
+    conn = get_db_connection()
+    _ensure_schema(conn)
+    c = conn.cursor()
+    c.execute(
+        "SELECT ts, close FROM price_bars WHERE symbol = ? AND interval = ? AND ts >= ? ORDER BY ts ASC",
+        (symbol, interval, int(start.timestamp()))
+    )
+    return c.fetchall()
+
+
+def first_bar_ts(symbol: str, interval: str, start: datetime) -> Optional[int]:
+    """Timestamp of the first stored bar at or after start (an index seek, not a scan)."""
+    conn = get_db_connection()
+    _ensure_schema(conn)
+    c = conn.cursor()
+    c.execute(
+        "SELECT MIN(ts) FROM price_bars WHERE symbol = ? AND interval = ? AND ts >= ?",
+        (symbol, interval, int(start.timestamp()))
+    )
+    return c.fetchone()[0]
+
+
+def read_close_series(symbol: str, interval: str, start: datetime) -> PriceSeries:
+    rows = read_bars(symbol, interval, start)
+    if not rows:
+        return PriceSeries(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+    timestamps, prices = zip(*rows)
+    return PriceSeries(np.fromiter(timestamps, dtype=np.int64, count=len(rows)), np.fromiter(prices, dtype=np.float64, count=len(rows)))
+
+
+def read_ohlc_series(symbol: str, interval: str, start: datetime) -> OhlcSeries:
+    conn = get_db_connection()
+    _ensure_schema(conn)
+    c = conn.cursor()
+    c.execute(
+        "SELECT ts, open, high, low, close FROM price_bars WHERE symbol = ? AND interval = ? AND ts >= ? ORDER BY ts ASC",
+        (symbol, interval, int(start.timestamp()))
+    )
+    rows = c.fetchall()
+    if not rows:
+        return OhlcSeries(np.empty(0, dtype=np.int64), *(np.empty(0, dtype=np.float64) for _ in range(4)))
+    columns = np.array(rows, dtype=np.float64).T
+    # Bars stored without open/high/low fall back to the close
+    for column in columns[1:4]:
+        np.copyto(column, columns[4], where=np.isnan(column))
+    return OhlcSeries(columns[0].astype(np.int64), columns[1], columns[2], columns[3], columns[4])
+
+
+def get_close_series(symbol: str, period: str, interval: str) -> PriceSeries:
+    """Columnar variant of get_close_bars."""
+    start = period_start(period)
+    sync_series(symbol, interval, start)
+    return read_close_series(symbol, interval, start)
+
+
+def get_close_bars(symbol: str, period: str, interval: str) -> List[Tuple[int, float]]:
+    """(timestamp, close) pairs for the requested window, served from the local store."""
+    start = period_start(period)
+    sync_series(symbol, interval, start)
+    return read_bars(symbol, interval, start)
@@ -0,0 +1,142 @@
+import asyncio
+import os
+import random
+import time
+from typing import Dict, List, NamedTuple, Optional, Set
+from app.services.executor import run_io
+from app.services.logging_service import LoggingService
+from app.services.upstream import gateway
+
+logger = LoggingService.get_logger(__name__)
+
+STREAM_POLL_SECONDS = float(os.getenv("STREAM_POLL_SECONDS", "5"))
+# Per-subscriber buffer; when a slow client falls this far behind the oldest updates are dropped
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "100"))
+# "yahoo" polls Yahoo Finance; "fake" is a local random walk for development and tests
+STREAM_PRICE_SOURCE = os.getenv("STREAM_PRICE_SOURCE", "yahoo")
+# After an upstream error the poller waits this long before trying again
+STREAM_ERROR_BACKOFF_SECONDS = 30
+
+
+class Quote(NamedTuple):
+    symbol: str
+    price: float
+    ts: float
+
+
+class YahooPriceSource:
+    def fetch(self, symbol: str) -> Optional[Quote]:
+        import yfinance as yf
+        price = gateway.call("quote", lambda: yf.Ticker(symbol).fast_info.get("lastPrice"))
+        return Quote(symbol, float(price), time.time()) if price is not None else None
+
+
+class FakePriceSource:
+    """Random walk per symbol, so streaming can be exercised without network access."""
+
+    def __init__(self, seed: Optional[int] = None, volatility: float = 0.002):
+        self._random = random.Random(seed)
+        self._prices: Dict[str, float] = {}
+        self.volatility = volatility
+
+    def fetch(self, symbol: str) -> Optional[Quote]:
+        price = self._prices.get(symbol, 100.0) * (1 + self._random.gauss(0, self.volatility))
+        self._prices[symbol] = price
+        return Quote(symbol, round(price, 4), time.time())
+
+
+class Subscriber:
+    def __init__(self, queue_size: int = STREAM_QUEUE_SIZE):
+        self.queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def offer(self, update: dict):
+        # A price stream only needs the latest values, so a full buffer sheds its oldest update
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(update)
+
+
+class _SymbolFeed:
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.subscribers: Set[Subscriber] = set()
+        self.last: Optional[Quote] = None
+        self.task: Optional[asyncio.Task] = None
+
+
+class StreamHub:
+    """
+    One upstream poller per subscribed symbol, shared by every subscriber.
+
+    Pollers start with the first subscriber of a symbol and are cancelled when
+    the last one leaves. Updates are only broadcast when the price changed.
+    """
+
+    def __init__(self, source=None, poll_seconds: float = STREAM_POLL_SECONDS):
+        self.source = source or (FakePriceSource() if STREAM_PRICE_SOURCE == "fake" else YahooPriceSource())
+        self.poll_seconds = poll_seconds
+        self._feeds: Dict[str, _SymbolFeed] = {}
+
+    def subscribe(self, symbols: List[str]) -> Subscriber:
+        subscriber = Subscriber()
+        for symbol in symbols:
+            feed = self._feeds.get(symbol)
+            if feed is None:
+                feed = self._feeds[symbol] = _SymbolFeed(symbol)
+                feed.task = asyncio.create_task(self._poll(feed), name=f"price-poller-{symbol}")
+                logger.info(f"Started price poller for {symbol}")
+            feed.subscribers.add(subscriber)
+            if feed.last is not None:
+                # Late joiners get the current price right away instead of waiting for the next change
+                subscriber.offer(_snapshot(feed.last))
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber, symbols: List[str]):
+        for symbol in symbols:
+            feed = self._feeds.get(symbol)
+            if feed is None:
+                continue
+            feed.subscribers.discard(subscriber)
+            if not feed.subscribers:
+                feed.task.cancel()
+                del self._feeds[symbol]
+                logger.info(f"Stopped price poller for {symbol}")
+
+    async def _poll(self, feed: _SymbolFeed):
+        while True:
+            try:
+                quote = await run_io(self.source.fetch, feed.symbol)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Price poll for {feed.symbol} failed: {e}")
+                await asyncio.sleep(STREAM_ERROR_BACKOFF_SECONDS)
+                continue
+            if quote is not None and (feed.last is None or quote.price != feed.last.price):
+                update = _delta(quote, feed.last)
+                feed.last = quote
+                for subscriber in list(feed.subscribers):
+                    subscriber.offer(update)
+            await asyncio.sleep(self.poll_seconds)
+
+    def active_symbols(self) -> Dict[str, int]:
+        return {symbol: len(feed.subscribers) for symbol, feed in self._feeds.items()}
+
+    def close(self):
+        for feed in self._feeds.values():
+            feed.task.cancel()
+        self._feeds.clear()
+
+
+def _snapshot(quote: Quote) -> dict:
+    return {"symbol": quote.symbol, "price": quote.price, "change": None, "ts": quote.ts}
+
+
+def _delta(quote: Quote, previous: Optional[Quote]) -> dict:
+    change = quote.price - previous.price if previous is not None else None
+    return {"symbol": quote.symbol, "price": quote.price, "change": change, "ts": quote.ts}
+
+
+stream_hub = StreamHub()
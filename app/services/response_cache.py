@@ -0,0 +1,230 @@
+import gzip
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional
+import orjson
+from fastapi import HTTPException, Request, Response
+from pydantic import BaseModel
+from app.services.cache import InMemoryCache, cache, cache_bypass, load_policy_overrides
+from app.services.access_tracker import access_tracker
+from app.services.executor import run_io, submit_io
+from app.services.logging_service import LoggingService
+from app.services.price_store import force_tail_refresh
+from app.services.upstream import background_calls
+
+logger = LoggingService.get_logger(__name__)
+
+# Soft TTL: after this a response is stale, served as-is while one background refresh replaces it
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "600"))
+# Hard TTL: after this a stale response is no longer served, the request recomputes it
+RESPONSE_CACHE_HARD_TTL = int(os.getenv("RESPONSE_CACHE_HARD_TTL", "3600"))
+# How long past the hard TTL a response is kept to answer requests whose recompute fails; 0 returns the error
+RESPONSE_STALE_IF_ERROR = int(os.getenv("RESPONSE_STALE_IF_ERROR", str(6 * 3600)))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "5000"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+# Browsers/proxies may reuse a response this long, after that they revalidate with If-None-Match
+RESPONSE_MAX_AGE = int(os.getenv("RESPONSE_MAX_AGE", "60"))
+# Smaller bodies are not worth compressing
+GZIP_MIN_BYTES = 1024
+
+
+class EncodedResponse(NamedTuple):
+    body: bytes
+    gzip_body: Optional[bytes]
+    etag: str
+    built_at: float
+
+
+class CachePolicy(NamedTuple):
+    soft_ttl: int
+    hard_ttl: int
+    stale_if_error: int
+
+
+DEFAULT_CACHE_POLICY = CachePolicy(RESPONSE_CACHE_TTL, RESPONSE_CACHE_HARD_TTL, RESPONSE_STALE_IF_ERROR)
+
+# Per endpoint policies; anything not listed uses DEFAULT_CACHE_POLICY
+CACHE_POLICIES: Dict[str, CachePolicy] = {
+    # News moves faster than prices, keep sentiment tighter
+    "/sentiment": CachePolicy(300, 1800, RESPONSE_STALE_IF_ERROR),
+    "/sentiment/batch": CachePolicy(300, 1800, RESPONSE_STALE_IF_ERROR),
+    # Company profiles, analyst ratings and the ticker list change on the scale of days
+    "/company-about": CachePolicy(6 * 3600, 24 * 3600, 7 * 24 * 3600),
+    "/recommendations": CachePolicy(3600, 24 * 3600, 7 * 24 * 3600),
+    "/available-tickers": CachePolicy(3600, 24 * 3600, 7 * 24 * 3600),
+}
+
+
+# RESPONSE_CACHE_POLICIES='{"/core-metrics": {"soft_ttl": 120, "stale_if_error": 0}}'
+load_policy_overrides("RESPONSE_CACHE_POLICIES", CACHE_POLICIES, DEFAULT_CACHE_POLICY)
+
+
+def policy_for(key: str) -> CachePolicy:
+    path = key.removeprefix("response:").split("?", 1)[0]
+    return CACHE_POLICIES.get(path, DEFAULT_CACHE_POLICY)
+
+
+# Final response bytes are process local; the L2 tier holds the underlying data
+response_store = InMemoryCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES, stats=cache.stats)
+
+
+def _encode(result: Any) -> EncodedResponse:
+    if isinstance(result, Response):
+        body = bytes(result.body)
+    elif isinstance(result, BaseModel):
+        body = orjson.dumps(result.model_dump(mode="json"))
+    else:
+        body = orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY)
+    gzip_body = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_BYTES else None
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    return EncodedResponse(body, gzip_body, etag, time.time())
+
+
+def _response_key(request: Request) -> str:
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"response:{request.url.path}?{query}"
+
+
+def _gzip_etag(etag: str) -> str:
+    """A distinct strong validator for the gzip coding of the same body."""
+    return f'{etag[:-1]}-gzip"'
+
+
+def _etag_matches(request: Request, *etags: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or any(etag in candidates for etag in etags)
+
+
+def _accepts_gzip(request: Request) -> bool:
+    """Whether Accept-Encoding allows gzip: an explicit gzip with q > 0, else a '*' with q > 0."""
+    qualities = {}
+    for token in request.headers.get("accept-encoding", "").split(","):
+        coding, *params = [part.strip() for part in token.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+def _to_response(entry: EncodedResponse, request: Request, status: str) -> Response:
+    use_gzip = entry.gzip_body is not None and _accepts_gzip(request)
+    headers = {
+        "ETag": _gzip_etag(entry.etag) if use_gzip else entry.etag,
+        # Stale copies are not worth keeping downstream, a fresh one is on its way
+        "Cache-Control": f"public, max-age={RESPONSE_MAX_AGE if status != 'STALE' else 0}",
+        "Vary": "Accept-Encoding",
+        "X-Cache": status,
+        "Age": str(int(time.time() - entry.built_at)),
+    }
+    # A client may hold either coding; both decode to the same body
+    if _etag_matches(request, entry.etag, _gzip_etag(entry.etag)):
+        return Response(status_code=304, headers=headers)
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=entry.gzip_body, media_type="application/json", headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+async def cached_response(request: Request, func: Callable, *args) -> Response:
+    """
+    Serve the encoded bytes of a controller result, computing them on a miss.
+
+    Hits skip the controller, pydantic and JSON encoding entirely; clients get an
+    ETag and a 304 when their copy is still current. Between the soft and hard
+    TTL of the endpoint's policy the stale bytes are served immediately and a
+    single background refresh replaces them. The X-Cache header says which of
+    HIT, STALE or MISS the response was.
+    """
+    key = _response_key(request)
+    policy = policy_for(key)
+    entry = response_store.get(key)
+    age = time.time() - entry.built_at if entry is not None else None
+    if entry is not None and age < policy.soft_ttl:
+        cache.stats.record(key, "hits")
+        access_tracker.record(key, func, args)
+        return _to_response(entry, request, "HIT")
+    if entry is not None and age < policy.hard_ttl:
+        cache.stats.record(key, "stale_hits")
+        access_tracker.record(key, func, args)
+        refresh_in_background(key, refresh_response, key, func, *args)
+        return _to_response(entry, request, "STALE")
+
+    cache.stats.record(key, "misses")
+    try:
+        fresh = _encode(await run_io(func, *args))
+    except Exception as e:
+        if entry is None or not _is_upstream_failure(e):
+            raise
+        # Past the hard TTL but within the stale-if-error window
+        logger.warning(f"Serving stale {key} ({int(age)}s old) after error: {e}")
+        cache.stats.record(key, "stale_hits")
+        return _to_response(entry, request, "STALE")
+    _store(key, fresh)
+    access_tracker.record(key, func, args, built=True)
+    return _to_response(fresh, request, "MISS")
+
+
+def _is_upstream_failure(e: Exception) -> bool:
+    # A 4xx is an answer about the request (bad symbol, no data), not a failure to produce one
+    return not isinstance(e, HTTPException) or e.status_code >= 500
+
+
+def _store(key: str, entry: EncodedResponse):
+    policy = policy_for(key)
+    ttl = policy.hard_ttl + policy.stale_if_error
+    response_store.set(key, entry, ttl, size=len(entry.body) + len(entry.gzip_body or b""))
+
+
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def refresh_in_background(key: str, refresh: Callable, *args):
+    """
+    Run refresh(*args) on the I/O pool, at most one per key at a time; callers
+    arriving while it runs keep using their stale value.
+    """
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def run():
+        try:
+            refresh(*args)
+        except Exception as e:
+            logger.warning(f"Background refresh of {key} failed, keeping the stale value: {e}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    submit_io(run)
+
+
+def recompute(func: Callable, *args) -> Any:
+    """
+    func(*args) from upstream data: cached data is bypassed, and the price store
+    re-fetches the tail of every series func reads unless it was synced within
+    the last minute.
+    """
+    with cache_bypass(), background_calls(), force_tail_refresh():
+        return func(*args)
+
+
+def refresh_response(key: str, func: Callable, *args):
+    """Recompute a response and replace the cached bytes."""
+    entry = _encode(recompute(func, *args))
+    _store(key, entry)
+    access_tracker.mark_built(key)
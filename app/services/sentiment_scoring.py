@@ -0,0 +1,115 @@
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+from app.services.cache import InMemoryCache, cache
+from app.services.executor import run_cpu_bound
+from app.services.logging_service import LoggingService
+from app.services.metrics import sentiment_scoring_duration, sentiment_texts_scored
+from app.startup.vader_startup import init_vader_sia
+
+logger = LoggingService.get_logger(__name__)
+
+# VADER is pure Python and holds the GIL, so large batches are scored in worker processes
+SENTIMENT_POOL_WORKERS = int(os.getenv("SENTIMENT_POOL_WORKERS", str(os.cpu_count() or 2)))
+SENTIMENT_CHUNK_SIZE = int(os.getenv("SENTIMENT_CHUNK_SIZE", "64"))
+SENTIMENT_MEMO_MAX_ENTRIES = int(os.getenv("SENTIMENT_MEMO_MAX_ENTRIES", "50000"))
+# Fewer texts than this are scored in-process, a round trip to the pool would cost more than it saves
+SENTIMENT_INLINE_MAX = 16
+
+# Scores are deterministic per text, so memoized entries never expire, only get evicted
+score_memo = InMemoryCache(SENTIMENT_MEMO_MAX_ENTRIES, SENTIMENT_MEMO_MAX_ENTRIES * 128, stats=cache.stats)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_worker_sia = None
+
+
+def _init_worker():
+    global _worker_sia
+    _worker_sia = init_vader_sia()
+
+
+def _score_chunk(texts: List[str]) -> List[float]:
+    return [_worker_sia.polarity_scores(text)["compound"] for text in texts]
+
+
+def _score_inline(texts: List[str]) -> List[float]:
+    vader = init_vader_sia()
+    return [vader.polarity_scores(text)["compound"] for text in texts]
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process that already runs scheduler/sweeper threads is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=SENTIMENT_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            logger.info(f"Started sentiment pool with {SENTIMENT_POOL_WORKERS} workers")
+        return _pool
+
+
+def shutdown_sentiment_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def pending_chunks() -> int:
+    """Chunks submitted to the process pool and not finished yet."""
+    with _pool_lock:
+        return len(_pool._pending_work_items) if _pool is not None else 0
+
+
+def _memo_key(text: str) -> str:
+    return f"sentimentscore:{hashlib.blake2b(text.encode(), digest_size=16).hexdigest()}"
+
+
+def score_texts(texts: List[str]) -> List[float]:
+    """
+    VADER compound score per text. Identical texts (e.g. an article syndicated
+    across tickers) are scored once, and scores are memoized by content hash.
+    """
+    keys = [_memo_key(text) if text else None for text in texts]
+    scores: Dict[str, float] = {}
+    pending: Dict[str, str] = {}
+    for key, text in zip(keys, texts):
+        if key is None or key in scores or key in pending:
+            continue
+        score = score_memo.get(key)
+        if score is None:
+            cache.stats.record(key, "misses")
+            pending[key] = text
+        else:
+            cache.stats.record(key, "hits")
+            scores[key] = score
+
+    if pending:
+        values = list(pending.values())
+        mode = "inline" if len(values) < SENTIMENT_INLINE_MAX else "pool"
+        with sentiment_scoring_duration.time(mode):
+            if mode == "inline":
+                computed = run_cpu_bound(_score_inline, values)
+            else:
+                chunks = [values[i:i + SENTIMENT_CHUNK_SIZE] for i in range(0, len(values), SENTIMENT_CHUNK_SIZE)]
+                try:
+                    computed = [score for chunk in _get_pool().map(_score_chunk, chunks) for score in chunk]
+                except BrokenProcessPool:
+                    # A crashed worker breaks the pool for good; start a fresh one on the next batch
+                    shutdown_sentiment_pool()
+                    raise
+        sentiment_texts_scored.inc(mode, amount=len(values))
+        for key, score in zip(pending, computed):
+            score_memo.set(key, score, size=64)
+            scores[key] = score
+
+    return [scores[key] if key else 0 for key in keys]
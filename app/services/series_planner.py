@@ -0,0 +1,56 @@
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from app.services import price_store
+from app.services.logging_service import LoggingService
+
+logger = LoggingService.get_logger(__name__)
+
+
+def bars_lookback(count: int, interval: str) -> timedelta:
+    # Calendar span that comfortably holds `count` bars, allowing for weekends and holidays
+    if interval == "1wk":
+        return timedelta(weeks=count + 2)
+    if interval == "1h":
+        return timedelta(days=count // 7 * 7 // 5 + 5)
+    return timedelta(days=count * 7 // 5 + 10)
+
+
+class SeriesPlanner:
+    """
+    Request-scoped planner for price windows of a single symbol.
+
+    Controllers register every window they need, the planner fetches the widest
+    window once per interval and the individual windows are sliced locally.
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self._windows: Dict[str, Tuple[str, datetime, Optional[int]]] = {}
+        self._bars: Dict[str, List[Tuple[int, float]]] = {}
+
+    def add_period(self, name: str, period: str, interval: str):
+        """Register a calendar window such as "3mo"."""
+        self._windows[name] = (interval, price_store.period_start(period), None)
+
+    def add_bars(self, name: str, count: int, interval: str):
+        """Register a window of the last `count` bars."""
+        start = datetime.now(timezone.utc) - bars_lookback(count, interval)
+        self._windows[name] = (interval, start, count)
+
+    def fetch(self):
+        starts: Dict[str, datetime] = {}
+        for interval, start, _ in self._windows.values():
+            starts[interval] = min(start, starts.get(interval, start))
+        for interval, start in starts.items():
+            logger.info(f"Planned fetch for {self.symbol}: interval={interval} from {start.date()}")
+            price_store.sync_series(self.symbol, interval, start)
+            self._bars[interval] = price_store.read_bars(self.symbol, interval, start)
+
+    def prices(self, name: str) -> List[float]:
+        interval, start, count = self._windows[name]
+        bars = self._bars.get(interval, [])
+        window = bars[bisect_left(bars, (int(start.timestamp()),)):]
+        if count is not None:
+            window = window[-count:]
+        return [close for _, close in window]
@@ -0,0 +1,86 @@
+import inspect
+import threading
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable
+from app.services.logging_service import LoggingService
+
+logger = LoggingService.get_logger(__name__)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one execution.
+
+    The first caller for a key runs the function, every caller arriving while it
+    is in flight waits for it and receives the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, func: Callable, *args, **kwargs) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            logger.info(f"Joining in-flight upstream call for {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+# Shared by every upstream fetcher
+upstream_flights = SingleFlight()
+
+
+def _call_key(signature: inspect.Signature, args: tuple, kwargs: dict) -> tuple:
+    """The arguments by parameter name with defaults filled in, so f("A"), f(symbol="A") and f("A", period=default) match."""
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return tuple(
+        (name, tuple(sorted(value.items())) if signature.parameters[name].kind is inspect.Parameter.VAR_KEYWORD else value)
+        for name, value in bound.arguments.items()
+    )
+
+
+def coalesced(namespace: str):
+    """Decorator: concurrent calls with the same arguments share one upstream request."""
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (namespace, _call_key(signature, args, kwargs))
+            return upstream_flights.do(key, func, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,71 @@
+import threading
+from bisect import bisect_left
+from typing import Iterable, List, Optional, Tuple
+from app.db import get_db_connection
+from app.services.logging_service import LoggingService
+from app.services.ticker_search import TickerSearchIndex
+
+logger = LoggingService.get_logger(__name__)
+
+
+class TickerIndex:
+    """
+    Immutable snapshot of the `stock_symbols` universe.
+
+    Membership checks go through a frozenset, prefix lookups bisect into the
+    sorted symbol tuple, free text queries go to the search index. A reload
+    builds a new index and swaps the reference.
+    """
+
+    __slots__ = ("symbols", "names", "members", "search")
+
+    def __init__(self, rows: Iterable[Tuple[str, str, Optional[str], Optional[str]]]):
+        rows = list(rows)
+        names = {row[0]: row[1] for row in rows}
+        self.symbols: Tuple[str, ...] = tuple(sorted(names))
+        self.names = names
+        self.members = frozenset(self.symbols)
+        self.search = TickerSearchIndex(rows)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.members
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def prefix(self, prefix: str, limit: int) -> List[Tuple[str, str]]:
+        start = bisect_left(self.symbols, prefix)
+        matches = []
+        for symbol in self.symbols[start:start + limit]:
+            if not symbol.startswith(prefix):
+                break
+            matches.append((symbol, self.names[symbol]))
+        return matches
+
+
+_index: Optional[TickerIndex] = None
+_reload_lock = threading.Lock()
+
+
+def load_ticker_index() -> TickerIndex:
+    conn = get_db_connection()
+    c = conn.cursor()
+    c.execute('SELECT symbol, name, sector, industry FROM stock_symbols')
+    return TickerIndex(c.fetchall())
+
+
+def reload_ticker_index() -> TickerIndex:
+    global _index
+    with _reload_lock:
+        index = load_ticker_index()
+        # Readers either see the old or the new index, never a partially built one
+        _index = index
+    logger.info(f"Ticker index loaded with {len(index)} symbols")
+    return index
+
+
+def get_ticker_index() -> TickerIndex:
+    index = _index
+    if index is None:
+        index = reload_ticker_index()
+    return index
@@ -0,0 +1,131 @@
+"""
+Ranked, typo tolerant search over the ticker universe (symbol, name, sector, industry).
+
+Every field is split into lowercase word tokens. Each distinct token is indexed
+twice: in a sorted vocabulary (for prefix matches) and by its trigrams (for
+substring and fuzzy matches). A query token matches a document token as:
+
+    exact       1.0
+    prefix      0.6 .. 1.0, closer to 1 the more of the token it covers
+    substring   0.5
+    fuzzy       0.6 * Dice similarity of the padded trigram sets, above FUZZY_MIN_SIMILARITY
+
+and contributes its best match times the field weight. A document must match
+every query token; its score is the sum over tokens.
+"""
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+FIELD_WEIGHTS = {"symbol": 3.0, "name": 2.0, "industry": 1.0, "sector": 0.8}
+FUZZY_MIN_SIMILARITY = 0.45
+FUZZY_WEIGHT = 0.6
+SUBSTRING_WEIGHT = 0.5
+# Shorter tokens only match by prefix; their trigrams are too unspecific
+MIN_FUZZY_LENGTH = 3
+# A fuzzy match may differ in length by at most this many characters
+MAX_FUZZY_LENGTH_DIFF = 2
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class SearchHit(NamedTuple):
+    symbol: str
+    name: str
+    sector: Optional[str]
+    industry: Optional[str]
+    score: float
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def _trigrams(token: str) -> Set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TickerSearchIndex:
+    def __init__(self, rows: Iterable[Tuple[str, str, Optional[str], Optional[str]]]):
+        self.docs: List[Tuple[str, str, Optional[str], Optional[str]]] = []
+        # token -> {doc id: best field weight the token appears in}
+        postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        for doc_id, (symbol, name, sector, industry) in enumerate(sorted(rows)):
+            self.docs.append((symbol, name, sector, industry))
+            fields = {
+                # The whole symbol as one token too, so "brk.b" and "brkb" both find BRK.B
+                "symbol": tokenize(symbol) + [re.sub(r"[^a-z0-9]", "", symbol.lower())],
+                "name": tokenize(name),
+                "sector": tokenize(sector),
+                "industry": tokenize(industry),
+            }
+            for field, tokens in fields.items():
+                weight = FIELD_WEIGHTS[field]
+                for token in tokens:
+                    if postings[token].get(doc_id, 0.0) < weight:
+                        postings[token][doc_id] = weight
+        self.vocabulary: Tuple[str, ...] = tuple(sorted(postings))
+        self.postings = [postings[token] for token in self.vocabulary]
+        self.token_trigrams = [_trigrams(token) for token in self.vocabulary]
+        trigram_postings: Dict[str, List[int]] = defaultdict(list)
+        for token_id, grams in enumerate(self.token_trigrams):
+            for gram in grams:
+                trigram_postings[gram].append(token_id)
+        self.trigram_postings = dict(trigram_postings)
+
+    def _token_matches(self, query_token: str) -> Dict[int, float]:
+        """Vocabulary token id -> match quality for one query token."""
+        matches = {}
+        start = bisect_left(self.vocabulary, query_token)
+        for token_id in range(start, len(self.vocabulary)):
+            token = self.vocabulary[token_id]
+            if not token.startswith(query_token):
+                break
+            matches[token_id] = 0.6 + 0.4 * len(query_token) / len(token)
+        if len(query_token) < MIN_FUZZY_LENGTH:
+            return matches
+
+        query_grams = _trigrams(query_token)
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in query_grams:
+            for token_id in self.trigram_postings.get(gram, ()):
+                shared[token_id] += 1
+        for token_id, count in shared.items():
+            if token_id in matches:
+                continue
+            token = self.vocabulary[token_id]
+            if query_token in token:
+                matches[token_id] = SUBSTRING_WEIGHT
+                continue
+            if len(token) < MIN_FUZZY_LENGTH or abs(len(token) - len(query_token)) > MAX_FUZZY_LENGTH_DIFF:
+                continue
+            similarity = 2 * count / (len(query_grams) + len(self.token_trigrams[token_id]))
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                matches[token_id] = FUZZY_WEIGHT * similarity
+        return matches
+
+    def search(self, query: str, limit: int = 10, offset: int = 0) -> Tuple[int, List[SearchHit]]:
+        """(total number of matching tickers, one page of hits ranked by score)."""
+        query_tokens = list(dict.fromkeys(tokenize(query)))
+        if not query_tokens:
+            return 0, []
+        scores: Optional[Dict[int, float]] = None
+        for query_token in query_tokens:
+            token_scores: Dict[int, float] = {}
+            for token_id, quality in self._token_matches(query_token).items():
+                for doc_id, weight in self.postings[token_id].items():
+                    score = quality * weight
+                    if score > token_scores.get(doc_id, 0.0):
+                        token_scores[doc_id] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {doc_id: score + token_scores[doc_id] for doc_id, score in scores.items() if doc_id in token_scores}
+            if not scores:
+                return 0, []
+        # Docs are sorted by symbol, so equal scores come out alphabetically
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        page = ranked[offset:offset + limit]
+        return len(ranked), [SearchHit(*self.docs[doc_id], round(score, 4)) for doc_id, score in page]
@@ -0,0 +1,341 @@
+"""
+Gateway for every call to Yahoo Finance.
+
+All upstream calls share one token bucket (rate limit), one semaphore (bounded
+concurrency) and one circuit breaker, because throttling on Yahoo's side hits
+every endpoint at once. Transient failures (throttling, 5xx, timeouts,
+connection errors) are retried with full-jitter exponential backoff, but only
+while retries stay within a budget proportional to recent traffic, so a
+struggling upstream is not hit with a retry storm. Only transient failures
+count towards the breaker; a per-symbol error such as a delisted ticker is
+raised straight to the caller.
+
+When the breaker is open, calls fail fast with UpstreamUnavailable (503), or,
+when the caller passes a fallback key, return the last good result for it.
+"""
+import contextvars
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Optional
+from fastapi import HTTPException
+from app.services.cache import InMemoryCache
+from app.services.logging_service import LoggingService
+
+logger = LoggingService.get_logger(__name__)
+
+UPSTREAM_RATE_PER_SECOND = float(os.getenv("UPSTREAM_RATE_PER_SECOND", "5"))
+UPSTREAM_BURST = int(os.getenv("UPSTREAM_BURST", "10"))
+UPSTREAM_MAX_CONCURRENCY = int(os.getenv("UPSTREAM_MAX_CONCURRENCY", "8"))
+# How long a call may wait for a rate-limit token and a concurrency slot before giving up.
+# Request threads give up sooner than background jobs, so a throttled burst cannot park the I/O pool.
+UPSTREAM_ACQUIRE_TIMEOUT_SECONDS = float(os.getenv("UPSTREAM_ACQUIRE_TIMEOUT_SECONDS", "2"))
+UPSTREAM_BACKGROUND_ACQUIRE_TIMEOUT_SECONDS = float(os.getenv("UPSTREAM_BACKGROUND_ACQUIRE_TIMEOUT_SECONDS", "10"))
+UPSTREAM_MAX_ATTEMPTS = int(os.getenv("UPSTREAM_MAX_ATTEMPTS", "3"))
+UPSTREAM_RETRY_BASE_SECONDS = float(os.getenv("UPSTREAM_RETRY_BASE_SECONDS", "0.5"))
+UPSTREAM_RETRY_MAX_SECONDS = float(os.getenv("UPSTREAM_RETRY_MAX_SECONDS", "8"))
+# Each call earns this fraction of a retry; retries beyond the earned budget are not attempted
+UPSTREAM_RETRY_BUDGET_RATIO = float(os.getenv("UPSTREAM_RETRY_BUDGET_RATIO", "0.2"))
+UPSTREAM_RETRY_BUDGET_MIN = 10
+# Consecutive failed calls (after retries) that open the breaker, and how long it stays open
+UPSTREAM_BREAKER_THRESHOLD = int(os.getenv("UPSTREAM_BREAKER_THRESHOLD", "5"))
+UPSTREAM_BREAKER_OPEN_SECONDS = float(os.getenv("UPSTREAM_BREAKER_OPEN_SECONDS", "30"))
+UPSTREAM_LAST_GOOD_MAX_ENTRIES = int(os.getenv("UPSTREAM_LAST_GOOD_MAX_ENTRIES", "5000"))
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+TRANSIENT_STATUS_CODES = frozenset({408, 425, 429})
+# requests, curl_cffi and yfinance each have their own exception hierarchy, so match on class names
+_TRANSIENT_NAME_MARKERS = ("ratelimit", "timeout", "connection")
+
+_background = contextvars.ContextVar("upstream_background", default=False)
+
+
+@contextmanager
+def background_calls():
+    """Upstream calls inside this block are background work and may wait longer for a token or slot."""
+    token = _background.set(True)
+    try:
+        yield
+    finally:
+        _background.reset(token)
+
+
+def is_transient(error: BaseException) -> bool:
+    """Throttling, 5xx, timeouts and connection failures; anything else will fail the same way on retry."""
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status in TRANSIENT_STATUS_CODES or status >= 500
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    names = [cls.__name__.lower() for cls in type(error).__mro__]
+    if any(marker in name for name in names for marker in _TRANSIENT_NAME_MARKERS):
+        return True
+    return "too many requests" in str(error).lower()
+
+
+class UpstreamUnavailable(HTTPException):
+    """Upstream is rate limited, failing or behind an open breaker, and no fallback was available."""
+
+    def __init__(self, detail: str, retry_after: float = UPSTREAM_BREAKER_OPEN_SECONDS):
+        super().__init__(
+            status_code=503,
+            detail=detail,
+            headers={"Retry-After": str(max(1, int(retry_after)))},
+        )
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return True
+                wait = (1.0 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class RetryBudget:
+    """Retries allowed as a fraction of calls: every call deposits `ratio`, every retry withdraws 1."""
+
+    def __init__(self, ratio: float, minimum: int = UPSTREAM_RETRY_BUDGET_MIN):
+        self.ratio = ratio
+        self.capacity = float(minimum)
+        self._balance = float(minimum)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._balance = min(self.capacity, self._balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._balance >= 1.0:
+                self._balance -= 1.0
+                return True
+            return False
+
+    @property
+    def balance(self) -> float:
+        with self._lock:
+            return self._balance
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `threshold` consecutive failures; open -> half_open after
+    `open_seconds`, when a single probe call is let through. The probe closes the
+    breaker on success and re-opens it on failure.
+    """
+
+    def __init__(self, threshold: int, open_seconds: float):
+        self.threshold = threshold
+        self.open_seconds = open_seconds
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == "closed":
+                return True
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.open_seconds:
+                self._state = "half_open"
+            if self._state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != "closed":
+                logger.info("Upstream circuit breaker closed")
+            self._state = "closed"
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.threshold:
+                if self._state != "open":
+                    logger.warning(f"Upstream circuit breaker opened after {self._failures} consecutive failures")
+                self._state = "open"
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def abandon(self):
+        """An allowed call never reached upstream; let another caller probe instead."""
+        with self._lock:
+            self._probing = False
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self._state != "open":
+                return 1.0
+            return max(1.0, self.open_seconds - (time.monotonic() - self._opened_at))
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.open_seconds:
+                return "half_open"
+            return self._state
+
+
+class UpstreamMetrics:
+    """Per-operation call counters and a cumulative latency histogram of upstream attempts."""
+
+    FIELDS = ("calls", "failures", "attempts", "attempt_errors", "retries", "rejected", "fallbacks")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._operations: Dict[str, dict] = {}
+
+    def _get(self, operation: str) -> dict:
+        counters = self._operations.get(operation)
+        if counters is None:
+            counters = self._operations[operation] = {
+                **dict.fromkeys(self.FIELDS, 0),
+                "latency_sum": 0.0,
+                "latency_buckets": [0] * len(self.buckets),
+            }
+        return counters
+
+    def record(self, operation: str, event: str, count: int = 1):
+        with self._lock:
+            self._get(operation)[event] += count
+
+    def observe(self, operation: str, seconds: float, error: bool):
+        with self._lock:
+            counters = self._get(operation)
+            counters["attempts"] += 1
+            counters["attempt_errors"] += int(error)
+            counters["latency_sum"] += seconds
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    counters["latency_buckets"][i] += 1
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            result = {}
+            for operation, counters in self._operations.items():
+                attempts = counters["attempts"]
+                result[operation] = {
+                    **{field: counters[field] for field in self.FIELDS},
+                    "error_rate": round(counters["attempt_errors"] / attempts, 4) if attempts else 0.0,
+                    "mean_latency_ms": round(counters["latency_sum"] / attempts * 1000, 1) if attempts else None,
+                    "latency_sum": counters["latency_sum"],
+                    "latency_buckets": dict(zip(self.buckets, counters["latency_buckets"])),
+                }
+            return result
+
+
+class UpstreamGateway:
+    def __init__(self):
+        self.bucket = TokenBucket(UPSTREAM_RATE_PER_SECOND, UPSTREAM_BURST)
+        self.slots = threading.BoundedSemaphore(UPSTREAM_MAX_CONCURRENCY)
+        self.retry_budget = RetryBudget(UPSTREAM_RETRY_BUDGET_RATIO)
+        self.breaker = CircuitBreaker(UPSTREAM_BREAKER_THRESHOLD, UPSTREAM_BREAKER_OPEN_SECONDS)
+        self.metrics = UpstreamMetrics()
+        # Last good result per fallback key; no TTL, only bounded by entry count
+        self.last_good = InMemoryCache(max_entries=UPSTREAM_LAST_GOOD_MAX_ENTRIES)
+
+    def call(self, operation: str, func: Callable, *args, fallback_key: Optional[Hashable] = None, **kwargs) -> Any:
+        """
+        Run `func(*args, **kwargs)` against upstream under the gateway's limits.
+
+        With a fallback key, successful results are remembered and returned in
+        place of an error when upstream is unavailable.
+        """
+        self.metrics.record(operation, "calls")
+        self.retry_budget.deposit()
+        try:
+            result = self._call(operation, func, args, kwargs)
+        except Exception:
+            if fallback_key is not None:
+                value = self.last_good.get(self._last_good_key(operation, fallback_key))
+                if value is not None:
+                    self.metrics.record(operation, "fallbacks")
+                    logger.warning(f"Serving last good {operation} result for {fallback_key}")
+                    return value
+            raise
+        if fallback_key is not None:
+            self.last_good.set(self._last_good_key(operation, fallback_key), result, size=0)
+        return result
+
+    def _call(self, operation: str, func: Callable, args: tuple, kwargs: dict) -> Any:
+        attempt = 0
+        acquire_timeout = UPSTREAM_BACKGROUND_ACQUIRE_TIMEOUT_SECONDS if _background.get() else UPSTREAM_ACQUIRE_TIMEOUT_SECONDS
+        while True:
+            # Retries belong to the call the breaker already let through; in half_open that call is
+            # the probe, and asking again would be refused while it is still marked as probing
+            if attempt == 0 and not self.breaker.allow():
+                self.metrics.record(operation, "rejected")
+                raise UpstreamUnavailable("Upstream data provider is unavailable, try again later", self.breaker.retry_after())
+            deadline = time.monotonic() + acquire_timeout
+            if not self.bucket.acquire(acquire_timeout) or not self.slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                self.breaker.abandon()
+                self.metrics.record(operation, "rejected")
+                raise UpstreamUnavailable("Upstream data provider is busy, try again later", 1.0)
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self.metrics.observe(operation, time.perf_counter() - started, error=True)
+                attempt += 1
+                if not is_transient(e):
+                    # Upstream answered; the error is about this request, not upstream's health
+                    self.breaker.abandon()
+                    self.metrics.record(operation, "failures")
+                    raise
+                if attempt >= UPSTREAM_MAX_ATTEMPTS or not self.retry_budget.withdraw():
+                    self.breaker.record_failure()
+                    self.metrics.record(operation, "failures")
+                    logger.warning(f"Upstream {operation} failed after {attempt} attempt(s): {e}")
+                    raise
+                delay = random.uniform(0, min(UPSTREAM_RETRY_MAX_SECONDS, UPSTREAM_RETRY_BASE_SECONDS * 2 ** (attempt - 1)))
+                self.metrics.record(operation, "retries")
+                logger.info(f"Retrying upstream {operation} in {delay:.2f}s after error: {e}")
+            else:
+                self.metrics.observe(operation, time.perf_counter() - started, error=False)
+                self.breaker.record_success()
+                return result
+            finally:
+                self.slots.release()
+            time.sleep(delay)
+
+    @staticmethod
+    def _last_good_key(operation: str, fallback_key: Hashable) -> str:
+        return f"{operation}:{fallback_key}"
+
+    def stats(self) -> dict:
+        return {
+            "breaker": self.breaker.state,
+            "retry_budget": round(self.retry_budget.balance, 2),
+            "last_good": self.last_good.usage(),
+            "operations": self.metrics.snapshot(),
+        }
+
+
+gateway = UpstreamGateway()
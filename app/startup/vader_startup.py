@@ -1,14 +1,36 @@
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-import nltk
+import os
+import threading
 from app.services.logging_service import LoggingService
 
 logger = LoggingService.get_logger(__name__)
 vader_sentiment_intensity_analyzer = None
+_init_lock = threading.Lock()
+
+# Air-gapped deployments set this; the lexicon must then be pre-baked (see Dockerfile)
+NLTK_OFFLINE = os.getenv("NLTK_OFFLINE", "false").lower() == "true"
+VADER_LEXICON_RESOURCE = "sentiment/vader_lexicon.zip"
+
+
+def _ensure_vader_lexicon():
+    import nltk
+    try:
+        nltk.data.find(VADER_LEXICON_RESOURCE)
+        return
+    except LookupError:
+        if NLTK_OFFLINE:
+            raise LookupError(f"VADER lexicon not found in {nltk.data.path} and NLTK_OFFLINE is set")
+    logger.info("VADER lexicon not found locally, downloading")
+    if not nltk.download("vader_lexicon", quiet=True):
+        raise LookupError("VADER lexicon could not be downloaded")
+
 
 def init_vader_sia():
     global vader_sentiment_intensity_analyzer
     if vader_sentiment_intensity_analyzer is None:
-        nltk.download("vader_lexicon", quiet=True)
-        vader_sentiment_intensity_analyzer = SentimentIntensityAnalyzer()
-        logger.info("Using default NLTK VADER lexicon")
+        with _init_lock:
+            if vader_sentiment_intensity_analyzer is None:
+                from nltk.sentiment.vader import SentimentIntensityAnalyzer
+                _ensure_vader_lexicon()
+                vader_sentiment_intensity_analyzer = SentimentIntensityAnalyzer()
+                logger.info("Using default NLTK VADER lexicon")
     return vader_sentiment_intensity_analyzer
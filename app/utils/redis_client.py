@@ -1,4 +1,13 @@
+import os
 import redis
 
-# Singleton Redis client for the app
-redis_client = redis.Redis(host='localhost', port=6379, db=0, decode_responses=True)
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Singleton Redis client for the app. Values are stored as binary (orjson), so responses are not decoded.
+# Short timeouts keep a missing/unhealthy Redis from adding latency to the request path.
+redis_client = redis.Redis.from_url(
+    REDIS_URL,
+    socket_connect_timeout=0.25,
+    socket_timeout=0.5,
+    decode_responses=False,
+)
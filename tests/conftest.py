@@ -0,0 +1,25 @@
+import pytest
+from app import db
+from app.services.cache import InMemoryCache, cache
+from app.services import fundamentals, job_lease, metric_state, news_store, price_store
+
+STORES = (price_store, metric_state, news_store, fundamentals, job_lease)
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """Point every store at an empty database in tmp_path instead of app/database.db."""
+    monkeypatch.setattr(db, "DB_FILE", tmp_path / "test.db")
+    for store in STORES:
+        monkeypatch.setattr(store, "_schema_ready", False)
+    db.close_db_connections()
+    yield tmp_path / "test.db"
+    db.close_db_connections()
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    """An empty L1 and no Redis behind the shared data cache."""
+    monkeypatch.setattr(cache, "l1", InMemoryCache())
+    monkeypatch.setattr(cache, "l2", None)
+    return cache
@@ -0,0 +1,112 @@
+import logging
+import time
+import fakeredis
+import pytest
+from app.services import cache as cache_module
+from app.services.cache import (
+    CACHE_KEY_PREFIX, InMemoryCache, NamespacePolicy, configure_l2, get_cache, get_cache_entry,
+    load_policy_overrides, set_cache, set_negative_cache
+)
+
+
+class BrokenRedis:
+    """An L2 client whose every call fails like an unreachable server."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def pipeline(self, transaction=True):
+        self.calls += 1
+        raise ConnectionError("connection refused")
+
+    def set(self, *args, **kwargs):
+        self.calls += 1
+        raise ConnectionError("connection refused")
+
+
+@pytest.fixture
+def redis_l2(memory_cache):
+    client = fakeredis.FakeStrictRedis()
+    configure_l2(client)
+    return client
+
+
+def test_entries_turn_stale_after_the_soft_ttl(memory_cache, monkeypatch):
+    monkeypatch.setitem(cache_module.NAMESPACE_POLICIES, "ns", NamespacePolicy(soft_ttl=10, hard_ttl=100))
+    set_cache("ns:fresh", {"v": 1})
+    assert get_cache("ns:fresh") == {"v": 1}
+    assert get_cache_entry("ns:fresh") == ({"v": 1}, False)
+    # Stored 20s ago: 80s of its 100s hard TTL left
+    memory_cache.l1.set("ns:stale", {"v": 2}, ttl=80)
+    assert get_cache("ns:stale") is None
+    assert get_cache_entry("ns:stale") == ({"v": 2}, True)
+    assert memory_cache.stats.snapshot()["ns"]["stale_hits"] == 1
+
+
+def test_explicit_ttl_is_the_fresh_period(memory_cache, monkeypatch):
+    monkeypatch.setitem(cache_module.NAMESPACE_POLICIES, "ns", NamespacePolicy(soft_ttl=10, hard_ttl=100))
+    set_cache("ns:key", 1, ttl=500)
+    _, remaining = memory_cache.l1.get_entry("ns:key")
+    assert 589 < remaining <= 590
+
+
+def test_negative_results_are_never_stale(memory_cache):
+    set_negative_cache("coremetrics:ZZZ")
+    value, stale = get_cache_entry("coremetrics:ZZZ")
+    assert cache_module.is_negative(value) and not stale
+
+
+def test_policy_overrides_skip_invalid_fields(monkeypatch, caplog):
+    policies = {"a": NamespacePolicy(1, 2)}
+    monkeypatch.setenv("TEST_POLICIES", '{"a": {"soft_tll": 5, "hard_ttl": 50}, "b": {"soft_ttl": "x"}, "c": 3}')
+    with caplog.at_level(logging.ERROR):
+        load_policy_overrides("TEST_POLICIES", policies, NamespacePolicy(7, 8))
+    assert policies == {"a": NamespacePolicy(1, 50), "b": NamespacePolicy(7, 8)}
+    assert "unknown field 'soft_tll'" in caplog.text
+
+    monkeypatch.setenv("TEST_POLICIES", "{not json")
+    load_policy_overrides("TEST_POLICIES", policies, NamespacePolicy(7, 8))
+    assert "not valid JSON" in caplog.text
+
+
+def test_l1_miss_is_filled_from_l2_with_the_shared_ttl(redis_l2, memory_cache):
+    set_cache("prices:AAA", {"dates": ["2024-01-02"], "prices": [1.5]}, ttl=100)
+    # Another worker: same Redis, empty L1
+    memory_cache.l1 = InMemoryCache()
+    assert get_cache("prices:AAA") == {"dates": ["2024-01-02"], "prices": [1.5]}
+    assert memory_cache.stats.snapshot()["prices"]["l2_hits"] == 1
+
+    _, l1_remaining = memory_cache.l1.get_entry("prices:AAA")
+    redis_remaining = redis_l2.pttl(CACHE_KEY_PREFIX + "prices:AAA") / 1000
+    assert abs(l1_remaining - redis_remaining) < 1
+    assert 3000 < redis_remaining <= 100 + cache_module._stale_window("prices:AAA")
+
+
+def test_l2_outage_falls_back_to_l1(memory_cache):
+    broken = BrokenRedis()
+    configure_l2(broken)
+    set_cache("prices:AAA", [1, 2])
+    assert get_cache("prices:AAA") == [1, 2]
+    assert get_cache("prices:BBB") is None
+    # The failed write marks L2 down; later calls skip it until L2_RETRY_AFTER_SECONDS pass
+    assert broken.calls == 1
+
+
+def test_values_that_are_not_json_fail_at_set(redis_l2, memory_cache):
+    with pytest.raises(TypeError):
+        set_cache("prices:AAA", {"when": object()})
+    assert memory_cache.l1.get_entry("prices:AAA") is None
+    assert redis_l2.get(CACHE_KEY_PREFIX + "prices:AAA") is None
+
+
+def test_stopped_sweeper_has_exited_before_a_restart():
+    store = InMemoryCache()
+    store.start_sweeper(interval=0.01)
+    first = store._sweeper
+    store.stop_sweeper()
+    assert not first.is_alive() and store._sweeper is None
+    store.start_sweeper(interval=0.01)
+    store.set("k", 1, ttl=0.01)
+    time.sleep(0.1)
+    store.stop_sweeper()
+    assert store.usage()["entries"] == 0 and store._sweeper is None
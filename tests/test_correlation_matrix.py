@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.controllers import correlation_matrix
+from app.models.schemas import CorrelationMatrixQueryParams
+
+SYMBOLS = ("AAA", "BBB", "CCC", "DDD")
+
+
+@pytest.fixture
+def closes(memory_cache, monkeypatch):
+    """Synthetic closes with gaps; records every symbol set the controller fetches."""
+    rng = np.random.default_rng(3)
+    frame = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (120, 4)), axis=0)), columns=list(SYMBOLS))
+    frame.iloc[10:25, 1] = np.nan
+    frame.iloc[:40, 2] = np.nan
+    fetched = []
+
+    def get_close_matrix(symbols, start, interval):
+        fetched.append(list(symbols))
+        # Symbols without data come back as all-NaN columns, like read_close_matrix
+        return frame.reindex(columns=symbols)
+
+    monkeypatch.setattr(correlation_matrix, "get_close_matrix_for_symbols", get_close_matrix)
+    monkeypatch.setattr(correlation_matrix, "get_ticker_index", lambda: set(SYMBOLS) | {"EEE"})
+    monkeypatch.setattr(correlation_matrix, "run_cpu_bound", lambda func, *args: func(*args))
+    return fetched
+
+
+def _matrix(symbols, alignment):
+    params = CorrelationMatrixQueryParams(symbols=symbols, period_months=6, interval="1d", alignment=alignment)
+    return correlation_matrix.correlation_matrix_controller(params)
+
+
+def test_pairwise_subset_is_served_from_a_cached_superset(closes, memory_cache):
+    direct = _matrix("AAA,CCC", "pairwise")
+    memory_cache.l1 = type(memory_cache.l1)()
+    closes.clear()
+
+    _matrix("AAA,BBB,CCC,DDD", "pairwise")
+    subset = _matrix("CCC,AAA", "pairwise")
+    assert closes == [["AAA", "BBB", "CCC", "DDD"]]
+    assert subset.symbols == ["CCC", "AAA"]
+    assert subset.observations == direct.observations
+    assert np.allclose(subset.correlation[0][1], direct.correlation[1][0])
+    assert np.allclose(subset.beta[1][0], direct.beta[0][1])
+
+
+@pytest.mark.parametrize("alignment", ["inner", "ffill"])
+def test_joint_alignments_recompute_subsets(closes, alignment):
+    _matrix("AAA,BBB,CCC", alignment)
+    _matrix("AAA,BBB", alignment)
+    assert closes == [["AAA", "BBB", "CCC"], ["AAA", "BBB"]]
+
+
+def test_registry_holds_the_stored_key_when_a_symbol_has_no_data(closes):
+    first = _matrix("AAA,BBB,EEE", "pairwise")
+    assert first.errors == {"EEE": "No price data found for symbol."}
+    _matrix("AAA,BBB", "pairwise")
+    assert closes == [["AAA", "BBB", "EEE"]]
+
+
+def test_registry_is_capped(closes, monkeypatch):
+    monkeypatch.setattr(correlation_matrix, "MATRIX_REGISTRY_MAX_SETS", 2)
+    for symbols in ("AAA,BBB", "AAA,CCC", "AAA,DDD"):
+        _matrix(symbols, "pairwise")
+    params = CorrelationMatrixQueryParams(symbols="AAA", period_months=6, interval="1d", alignment="pairwise")
+    assert correlation_matrix.cache.get(correlation_matrix._registry_key(params)) == [["AAA", "DDD"], ["AAA", "CCC"]]
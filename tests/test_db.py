@@ -0,0 +1,25 @@
+import threading
+from app import db
+
+
+def test_close_leaves_live_threads_connections_open(temp_db):
+    opened, release = threading.Event(), threading.Event()
+    result = {}
+
+    def worker():
+        conn = db.get_db_connection()
+        opened.set()
+        release.wait(5)
+        # Mid-task when close_db_connections ran: its connection must still work
+        result["value"] = conn.execute("SELECT 1").fetchone()[0]
+        result["reopened"] = db.get_db_connection() is not conn
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    opened.wait(5)
+    own = db.get_db_connection()
+    db.close_db_connections()
+    release.set()
+    thread.join(5)
+    assert result == {"value": 1, "reopened": True}
+    assert db.get_db_connection() is not own
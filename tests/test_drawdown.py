@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from app.scripts.bench_drawdown import _episodes_loop
+from app.services.analysis import drawdown_episodes, top_drawdown_episodes
+
+
+def _as_rows(episodes):
+    return [
+        [int(p), int(t), float(d), int(r)]
+        for p, t, d, r in zip(episodes["peak"], episodes["trough"], episodes["depth"], episodes["recovery"])
+    ]
+
+
+def _assert_matches_scan(prices):
+    found, expected = _as_rows(drawdown_episodes(prices)), _episodes_loop(prices)
+    assert [(p, t, r) for p, t, _, r in found] == [(p, t, r) for p, t, _, r in expected]
+    assert np.allclose([row[2] for row in found], [row[2] for row in expected])
+
+
+@pytest.mark.parametrize("prices", [
+    [100, 100, 100],                           # flat: no episode
+    [100, 90, 100, 90, 100],                   # exact recoveries back to the peak
+    [100, 100, 90, 80, 80, 100, 100, 95],      # repeated peak, tied troughs, open last episode
+    [100, 80, 80, 90, 120, 110, 110, 120],
+    [100, 99, 98, 97],                         # below water from the second bar, never recovers
+])
+def test_edge_cases_match_the_bar_by_bar_scan(prices):
+    _assert_matches_scan(np.array(prices, dtype=float))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_series_with_ties_match_the_bar_by_bar_scan(seed):
+    rng = np.random.default_rng(seed)
+    # Integer steps on a coarse grid revisit old peaks and troughs often
+    prices = 1000.0 + np.cumsum(rng.integers(-2, 3, rng.integers(2, 400)))
+    _assert_matches_scan(prices)
+
+
+def test_top_episodes_are_deepest_first_and_stable_on_ties():
+    episodes = drawdown_episodes(np.array([100, 90, 100, 80, 100, 90, 100], dtype=float))
+    assert top_drawdown_episodes(episodes, 2).tolist() == [1, 0]
+    assert top_drawdown_episodes(episodes, 3).tolist() == [1, 0, 2]
@@ -0,0 +1,17 @@
+import time
+from app.services import fundamentals
+
+
+def test_daily_job_refreshes_rows_written_just_after_the_previous_run(temp_db, monkeypatch):
+    # Written by yesterday's 17:00 run a few seconds after it started
+    yesterday = int(time.time()) - 24 * 3600 + 5
+    fundamentals._write_row("AAA", {"longName": "A"}, yesterday)
+    fundamentals._write_row("BBB", {"longName": "B"}, int(time.time()))
+
+    assert fundamentals.stale_symbols(["AAA", "BBB"]) == []
+    assert fundamentals.stale_symbols(["AAA", "BBB"], fundamentals.FUNDAMENTALS_SCHEDULED_MAX_AGE_SECONDS) == ["AAA"]
+
+    fetched = []
+    monkeypatch.setattr(fundamentals, "_fetch_info", lambda symbol: fetched.append(symbol) or {"longName": symbol})
+    refreshed = fundamentals.refresh_fundamentals(["AAA", "BBB"], max_age=fundamentals.FUNDAMENTALS_SCHEDULED_MAX_AGE_SECONDS)
+    assert (refreshed, fetched) == (1, ["AAA"])
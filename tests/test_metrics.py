@@ -0,0 +1,33 @@
+import re
+from app.controllers.metrics import metrics_controller
+from app.services.metrics import Registry, http_requests
+
+HISTOGRAM_SUFFIXES = ("_bucket", "_sum", "_count")
+
+
+def _types(text):
+    return dict(re.findall(r"^# TYPE (\S+) (\S+)$", text, re.M))
+
+
+def test_counter_metadata_names_its_total_samples():
+    registry = Registry(prefix="t_")
+    registry.counter("jobs", "Jobs run.", ("kind",)).inc("a")
+    text = registry.render()
+    assert "# HELP t_jobs_total Jobs run.\n# TYPE t_jobs_total counter\nt_jobs_total{kind=\"a\"} 1\n" in text
+
+
+def test_every_sample_belongs_to_a_typed_family():
+    http_requests.inc("/prices", "GET", "200")
+    text = metrics_controller().body.decode()
+    types = _types(text)
+    assert types["findash_http_requests_total"] == "counter"
+    assert types["findash_cache_events_total"] == "counter"
+    for line in text.splitlines():
+        if line.startswith("#"):
+            continue
+        name = re.match(r"[^{ ]+", line).group(0)
+        if name in types:
+            assert types[name] != "histogram"
+        else:
+            base = next((name[:-len(s)] for s in HISTOGRAM_SUFFIXES if name.endswith(s)), None)
+            assert types.get(base) == "histogram", name
@@ -0,0 +1,39 @@
+import sqlite3
+from datetime import datetime, timezone
+from app.services import news_store
+
+SINCE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _item(article_id, pub_date, summary="Shares rose"):
+    return {"id": article_id, "content": {"pubDate": pub_date, "title": article_id, "summary": summary, "canonicalUrl": {"url": f"https://x/{article_id}"}}}
+
+
+def test_reingested_article_with_a_revised_date_is_counted_once(temp_db, monkeypatch):
+    scored = []
+    monkeypatch.setattr(news_store, "score_texts", lambda texts: scored.extend(texts) or [0.5] * len(texts))
+    news_store.ingest_news({"AAA": [_item("a1", "2024-03-01T10:00:00Z"), _item("a2", "2024-03-01T12:00:00Z")]})
+    news_store.ingest_news({"AAA": [_item("a1", "2024-03-01T11:00:00Z")], "BBB": [_item("a1", "2024-03-01T11:00:00Z")]})
+
+    assert len(scored) == 2
+    assert [a["title"] for a in news_store.read_articles("AAA", SINCE)] == ["a2", "a1"]
+    assert len(news_store.read_articles("BBB", SINCE)) == 1
+    buckets = news_store.read_sentiment_buckets("AAA", SINCE, 3600)
+    revised = int(datetime(2024, 3, 1, 11, tzinfo=timezone.utc).timestamp())
+    assert [(bucket, count) for bucket, count, _ in buckets] == [(revised, 1), (revised + 3600, 1)]
+
+
+def test_old_link_table_is_rekeyed(temp_db):
+    conn = sqlite3.connect(temp_db)
+    conn.execute(
+        "CREATE TABLE news_symbols (symbol TEXT NOT NULL, published_at INTEGER NOT NULL, article_id TEXT NOT NULL, "
+        "PRIMARY KEY (symbol, published_at, article_id)) WITHOUT ROWID"
+    )
+    conn.executemany("INSERT INTO news_symbols VALUES (?, ?, ?)", [("AAA", 100, "a1"), ("AAA", 200, "a1"), ("AAA", 150, "a2")])
+    conn.commit()
+    conn.close()
+
+    news_store.stale_symbols(["AAA"])
+    conn = sqlite3.connect(temp_db)
+    rows = conn.execute("SELECT symbol, article_id, published_at FROM news_symbols ORDER BY article_id").fetchall()
+    assert rows == [("AAA", "a1", 200), ("AAA", "a2", 150)]
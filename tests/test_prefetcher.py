@@ -0,0 +1,20 @@
+from app.services import job_lease, prefetcher
+
+
+def test_daily_job_runs_in_one_process_per_lease(temp_db, monkeypatch):
+    runs = []
+    job = prefetcher._once_across_processes("refresh_end_of_day", lambda: runs.append(1))
+    job()
+    # Another worker's trigger for the same run finds the lease held
+    monkeypatch.setattr(prefetcher, "claim_lease", lambda name, seconds: job_lease.claim_lease(name, seconds, "other-host:1"))
+    job()
+    assert len(runs) == 1
+
+
+def test_expired_lease_can_be_claimed_again(temp_db, monkeypatch):
+    assert job_lease.claim_lease("refresh_fundamentals", 60, "worker-a")
+    assert not job_lease.claim_lease("refresh_fundamentals", 60, "worker-b")
+    assert job_lease.claim_lease("refresh_end_of_day", 60, "worker-b")
+    now = job_lease.time.time()
+    monkeypatch.setattr(job_lease.time, "time", lambda: now + 61)
+    assert job_lease.claim_lease("refresh_fundamentals", 60, "worker-b")
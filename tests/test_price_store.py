@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+from app.db import get_db_connection
+from app.services import metric_state, price_store
+
+DAY = 86400
+START_TS = 1_700_006_400  # a midnight UTC
+START = datetime.fromtimestamp(START_TS, timezone.utc)
+
+
+def _bars(closes, first=0):
+    return [(START_TS + (first + i) * DAY, c, c, c, c, 1e6) for i, c in enumerate(closes)]
+
+
+def _age_series(symbol):
+    conn = get_db_connection()
+    conn.execute("UPDATE price_series_meta SET fetched_at = 0 WHERE symbol = ?", (symbol,))
+    conn.commit()
+
+
+def _closes(symbol):
+    return [close for _, close in price_store.read_bars(symbol, "1d", START)]
+
+
+def test_tail_refresh_appends_when_history_is_unchanged(temp_db, monkeypatch):
+    price_store.store_bars("AAA", "1d", _bars([100, 101, 102, 103]), START_TS)
+    _age_series("AAA")
+    fetches = []
+
+    def fetch(symbol, interval, start):
+        fetches.append(int(start.timestamp()))
+        return _bars([102, 103.5, 104], first=2)
+
+    monkeypatch.setattr(price_store, "_fetch_bars", fetch)
+    price_store.sync_series("AAA", "1d", START)
+    # One fetch, starting at the last closed bar
+    assert fetches == [START_TS + 2 * DAY]
+    assert _closes("AAA") == [100, 101, 102, 103.5, 104]
+
+
+def test_split_refetches_the_covered_window_and_drops_metric_state(temp_db, monkeypatch):
+    price_store.store_bars("AAA", "1d", _bars([1000, 1010, 1020, 1030]), START_TS)
+    _age_series("AAA")
+    metric_state._save("AAA", "1d", "drawdown:1d", START_TS, START_TS + DAY, {"count": 2})
+    # A 10:1 split: Yahoo now returns every past close divided by 10
+    adjusted = _bars([100, 101, 102, 103, 104])
+    fetches = []
+
+    def fetch(symbol, interval, start):
+        fetches.append(int(start.timestamp()))
+        return [bar for bar in adjusted if bar[0] >= start.timestamp()]
+
+    monkeypatch.setattr(price_store, "_fetch_bars", fetch)
+    price_store.sync_series("AAA", "1d", START)
+    assert fetches == [START_TS + 2 * DAY, START_TS]
+    assert _closes("AAA") == [100, 101, 102, 103, 104]
+    assert metric_state._load("AAA", "1d", "drawdown:1d") is None
+
+
+def test_bulk_tail_refresh_refetches_only_readjusted_symbols(temp_db, monkeypatch):
+    price_store.store_bars("AAA", "1d", _bars([100, 101, 102]), START_TS)
+    price_store.store_bars("BBB", "1d", _bars([50, 51, 52]), START_TS)
+    upstream = {"AAA": _bars([100, 101, 102, 103]), "BBB": _bars([49, 50, 51, 52])}
+    fetches = []
+
+    def fetch_bulk(symbols, interval, start):
+        fetches.append(sorted(symbols))
+        return {s: [bar for bar in upstream[s] if bar[0] >= start.timestamp()] for s in symbols}
+
+    monkeypatch.setattr(price_store, "_fetch_bars_bulk", fetch_bulk)
+    price_store.sync_many(["AAA", "BBB"], "1d", START, force=True)
+    assert fetches == [["AAA", "BBB"], ["BBB"]]
+    assert _closes("AAA") == [100, 101, 102, 103]
+    assert _closes("BBB") == [49, 50, 51, 52]
+
+
+def test_forced_refresh_refetches_a_recent_tail(temp_db, monkeypatch):
+    price_store.store_bars("AAA", "1d", _bars([100, 101]), START_TS)
+    conn = get_db_connection()
+    conn.execute("UPDATE price_series_meta SET fetched_at = fetched_at - 120")
+    conn.commit()
+    fetches = []
+    monkeypatch.setattr(price_store, "_fetch_bars", lambda s, i, start: fetches.append(s) or _bars([100, 101.5]))
+
+    price_store.sync_series("AAA", "1d", START)
+    assert fetches == []
+    with price_store.force_tail_refresh():
+        price_store.sync_series("AAA", "1d", START)
+        # Synced moments ago: the next forced sync leaves it alone
+        price_store.sync_series("AAA", "1d", START)
+    assert fetches == ["AAA"]
+    assert _closes("AAA") == [100, 101.5]
@@ -0,0 +1,85 @@
+import asyncio
+from app.services.price_stream import FakePriceSource, StreamHub, Subscriber
+
+
+class CountingSource(FakePriceSource):
+    def __init__(self):
+        super().__init__(seed=1)
+        self.fetches = []
+
+    def fetch(self, symbol):
+        self.fetches.append(symbol)
+        return super().fetch(symbol)
+
+
+async def _until(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.005)
+
+
+def _drain(subscriber, symbol="AAA"):
+    updates = [subscriber.queue.get_nowait() for _ in range(subscriber.queue.qsize())]
+    return [update["price"] for update in updates if update["symbol"] == symbol]
+
+
+def test_subscribers_of_a_symbol_share_one_poller():
+    async def scenario():
+        hub = StreamHub(CountingSource(), poll_seconds=0.01)
+        first = hub.subscribe(["AAA"])
+        second = hub.subscribe(["AAA", "BBB"])
+        pollers = sorted(t.get_name() for t in asyncio.all_tasks() if t.get_name().startswith("price-poller-"))
+        assert pollers == ["price-poller-AAA", "price-poller-BBB"]
+        assert hub.active_symbols() == {"AAA": 2, "BBB": 1}
+        await _until(lambda: first.queue.qsize() >= 3)
+        hub.close()
+        # Both subscribers received the same AAA updates from the one poller
+        assert _drain(first) == _drain(second)
+
+    asyncio.run(scenario())
+
+
+def test_late_joiner_gets_the_current_price():
+    async def scenario():
+        hub = StreamHub(CountingSource(), poll_seconds=0.01)
+        first = hub.subscribe(["AAA"])
+        await _until(lambda: first.queue.qsize() >= 1)
+        late = hub.subscribe(["AAA"])
+        hub.close()
+        update = late.queue.get_nowait()
+        assert update["change"] is None and update["price"] == _drain(first)[-1]
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_drops_the_oldest_updates():
+    async def scenario():
+        subscriber = Subscriber(queue_size=3)
+        for i in range(5):
+            subscriber.offer({"price": i})
+        assert subscriber.dropped == 2
+        assert [subscriber.queue.get_nowait()["price"] for _ in range(3)] == [2, 3, 4]
+
+    asyncio.run(scenario())
+
+
+def test_poller_stops_with_its_last_subscriber():
+    async def scenario():
+        source = CountingSource()
+        hub = StreamHub(source, poll_seconds=0.01)
+        first, second = hub.subscribe(["AAA"]), hub.subscribe(["AAA"])
+        task = hub._feeds["AAA"].task
+        await _until(lambda: len(source.fetches) >= 2)
+
+        hub.unsubscribe(first, ["AAA"])
+        assert hub.active_symbols() == {"AAA": 1} and not task.done()
+        hub.unsubscribe(second, ["AAA"])
+        assert hub.active_symbols() == {}
+        await asyncio.sleep(0)
+        assert task.cancelled()
+        fetched = len(source.fetches)
+        await asyncio.sleep(0.05)
+        assert len(source.fetches) == fetched
+
+    asyncio.run(scenario())
@@ -0,0 +1,39 @@
+import gzip
+import pytest
+from starlette.requests import Request
+from app.services.response_cache import _encode, _to_response
+
+ENTRY = _encode({"prices": list(range(1000))})
+
+
+def _request(**headers):
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/prices", "query_string": b"", "headers": raw})
+
+
+@pytest.mark.parametrize("header, gzipped", [
+    ("gzip", True),
+    ("gzip, deflate, br", True),
+    ("br;q=1.0, gzip;q=0.5", True),
+    ("*", True),
+    ("gzip;q=0", False),
+    ("gzip; q=0.000, identity", False),
+    ("*;q=0.5, gzip;q=0", False),
+    ("x-gzip", False),
+    ("identity", False),
+])
+def test_gzip_is_sent_only_when_accepted(header, gzipped):
+    response = _to_response(ENTRY, _request(accept_encoding=header), "HIT")
+    assert (response.headers.get("content-encoding") == "gzip") is gzipped
+    body = gzip.decompress(response.body) if gzipped else response.body
+    assert body == ENTRY.body
+
+
+def test_each_coding_has_its_own_etag_and_either_revalidates():
+    identity = _to_response(ENTRY, _request(), "HIT")
+    compressed = _to_response(ENTRY, _request(accept_encoding="gzip"), "HIT")
+    assert identity.headers["etag"] != compressed.headers["etag"]
+    for etag in (identity.headers["etag"], compressed.headers["etag"]):
+        assert _to_response(ENTRY, _request(accept_encoding="gzip", if_none_match=etag), "HIT").status_code == 304
+        assert _to_response(ENTRY, _request(if_none_match=f"W/{etag}"), "HIT").status_code == 304
+    assert _to_response(ENTRY, _request(if_none_match='"other"'), "HIT").status_code == 200
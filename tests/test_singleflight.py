@@ -0,0 +1,49 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.services import singleflight
+from app.services.singleflight import coalesced
+
+
+def test_equivalent_calls_share_one_execution(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    joined = []
+    monkeypatch.setattr(singleflight.logger, "info", joined.append)
+    calls = []
+
+    @coalesced("test")
+    def fetch(symbol, period="1mo", interval="1d"):
+        calls.append((symbol, period, interval))
+        started.set()
+        release.wait(5)
+        return len(calls)
+
+    with ThreadPoolExecutor(4) as pool:
+        leader = pool.submit(fetch, "AAA")
+        started.wait(5)
+        followers = [
+            pool.submit(fetch, symbol="AAA"),
+            pool.submit(fetch, "AAA", "1mo"),
+            pool.submit(fetch, "AAA", interval="1d", period="1mo"),
+        ]
+        deadline = time.monotonic() + 5
+        while len(joined) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        results = [leader.result(5)] + [f.result(5) for f in followers]
+    assert calls == [("AAA", "1mo", "1d")]
+    assert results == [1, 1, 1, 1]
+
+
+def test_different_arguments_run_separately():
+    calls = []
+
+    @coalesced("test")
+    def fetch(symbol, period="1mo", **options):
+        calls.append((symbol, period, options))
+        return symbol
+
+    assert fetch("AAA") == "AAA"
+    assert fetch("AAA", period="1y") == "AAA"
+    assert fetch("AAA", prepost=True) == "AAA"
+    assert calls == [("AAA", "1mo", {}), ("AAA", "1y", {}), ("AAA", "1mo", {"prepost": True})]
@@ -0,0 +1,95 @@
+import time
+import pytest
+from app.services import upstream
+from app.services.upstream import CircuitBreaker, UpstreamGateway, UpstreamUnavailable, is_transient
+
+
+class RateLimited(Exception):
+    pass
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.response = type("Response", (), {"status_code": status_code})()
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    monkeypatch.setattr(upstream, "UPSTREAM_RETRY_BASE_SECONDS", 0.0)
+    gateway = UpstreamGateway()
+    gateway.breaker = CircuitBreaker(threshold=1, open_seconds=0.2)
+    return gateway
+
+
+def _failing(times, error=RateLimited):
+    calls = []
+
+    def func():
+        calls.append(1)
+        if len(calls) <= times:
+            raise error("boom")
+        return "ok"
+
+    func.calls = calls
+    return func
+
+
+def _open_then_wait(gateway):
+    with pytest.raises(RateLimited):
+        gateway.call("test", _failing(10))
+    assert gateway.breaker.state == "open"
+    time.sleep(0.25)
+    assert gateway.breaker.state == "half_open"
+
+
+def test_half_open_probe_retries_and_closes(gateway):
+    _open_then_wait(gateway)
+    probe = _failing(1)
+    assert gateway.call("test", probe) == "ok"
+    assert len(probe.calls) == 2
+    assert gateway.breaker.state == "closed"
+
+
+def test_half_open_probe_that_keeps_failing_reopens_instead_of_sticking(gateway):
+    _open_then_wait(gateway)
+    with pytest.raises(RateLimited):
+        gateway.call("test", _failing(10))
+    assert gateway.breaker.state == "open"
+    with pytest.raises(UpstreamUnavailable):
+        gateway.call("test", lambda: "ok")
+    time.sleep(0.25)
+    assert gateway.call("test", lambda: "ok") == "ok"
+    assert gateway.breaker.state == "closed"
+
+
+def test_permanent_errors_are_not_retried_and_leave_the_breaker_closed(gateway):
+    for _ in range(5):
+        func = _failing(10, error=KeyError)
+        with pytest.raises(KeyError):
+            gateway.call("test", func)
+        assert len(func.calls) == 1
+    assert gateway.breaker.state == "closed"
+
+
+def test_permanent_error_releases_the_half_open_probe(gateway):
+    _open_then_wait(gateway)
+    with pytest.raises(KeyError):
+        gateway.call("test", _failing(10, error=KeyError))
+    assert gateway.call("test", lambda: "ok") == "ok"
+    assert gateway.breaker.state == "closed"
+
+
+@pytest.mark.parametrize("error, transient", [
+    (HTTPError(429), True),
+    (HTTPError(503), True),
+    (HTTPError(404), False),
+    (TimeoutError(), True),
+    (ConnectionResetError(), True),
+    (RateLimited(), True),
+    (Exception("Too Many Requests. Rate limited. Try after a while."), True),
+    (KeyError("currentPrice"), False),
+    (ValueError("No data found, symbol may be delisted"), False),
+])
+def test_is_transient(error, transient):
+    assert is_transient(error) is transient